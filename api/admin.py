@@ -1,4 +1,10 @@
+from datetime import datetime, timedelta
+
 from django.contrib import admin
+from django.db.models import Count, Max
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
 from .models import ( 
     CareerApplication,
     ContactMessage,
@@ -6,13 +12,123 @@ from .models import (
     GalleryImage,
     Project,
     CommunityItem,
+    Cpu,
     CpuInquiry,
+    HackathonEvent,
     HackathonTeam,
     HackathonParticipant,
+    Job,
+    ArchivedSubmission,
+    NotificationDelivery,
+    PendingNotification,
+    RequestProfile,
 )
+from .admin_perf import PerformanceAdminMixin, preview
+from .hackathon import rebuild_counters
+from .jobs import enqueue
+
+
+# Changelist parameters that don't narrow the selection.
+CHANGELIST_DISPLAY_PARAMS = {"q", "o", "p", "_changelist_filters"}
+
+
+def _date_range(field, params):
+    """``{"after": ..., "before": ...}`` for the changelist's date hierarchy.
+
+    Mirrors the admin's own drill-down (year, month, day). None when the
+    parameters include filters other than the date hierarchy.
+    """
+    date_params = {f"{field}__{part}" for part in ("year", "month", "day")} if field else set()
+    if set(params) - CHANGELIST_DISPLAY_PARAMS - date_params:
+        return None
+    year = params.get(f"{field}__year") if field else None
+    if not year:
+        return {}
+    month = params.get(f"{field}__month")
+    day = params.get(f"{field}__day")
+    try:
+        start = datetime(int(year), int(month or 1), int(day or 1))
+    except ValueError:
+        return None
+    if day:
+        end = start + timedelta(days=1)
+    elif month:
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        end = start.replace(year=start.year + 1)
+    return {
+        "after": timezone.make_aware(start).isoformat(),
+        "before": timezone.make_aware(end).isoformat(),
+    }
+
+
+class BulkActionsMixin:
+    """Admin actions that hand the selection to a chunked background job."""
+
+    actions = ("bulk_delete", "bulk_archive", "bulk_export")
+
+    def _selection(self, request, queryset):
+        """How the job finds the selected rows again.
+
+        A hand-picked page of rows is passed as ids. "Select all" across
+        pages is passed as the changelist's search and date range, with
+        the highest pk, so a large selection is a few bytes of payload
+        and rows added since aren't included.
+        """
+        if request.POST.get("select_across") != "1":
+            return {"ids": list(queryset.values_list("pk", flat=True))}
+        selection = _date_range(self.date_hierarchy, request.GET)
+        if selection is None:
+            # Filters we can't express as a range: fall back to ids.
+            return {"ids": list(queryset.values_list("pk", flat=True))}
+        if request.GET.get("q"):
+            selection["search"] = request.GET["q"]
+        selection["max_pk"] = queryset.aggregate(max_pk=Max("pk"))["max_pk"] or 0
+        return selection
+
+    def _queue_bulk(self, request, queryset, operation):
+        job = enqueue(
+            "bulk.run",
+            operation=operation,
+            model=self.model._meta.label,
+            **self._selection(request, queryset),
+        )
+        url = reverse("admin:api_job_change", args=[job.pk])
+        self.message_user(
+            request,
+            format_html('Queued {} of the selected rows: <a href="{}">job #{}</a>', operation, url, job.pk),
+        )
+
+    @admin.action(description="Delete selected rows in the background")
+    def bulk_delete(self, request, queryset):
+        self._queue_bulk(request, queryset, "delete")
+
+    @admin.action(description="Archive selected rows in the background")
+    def bulk_archive(self, request, queryset):
+        self._queue_bulk(request, queryset, "archive")
+
+    @admin.action(description="Export selected rows to CSV in the background")
+    def bulk_export(self, request, queryset):
+        self._queue_bulk(request, queryset, "export")
+
+
+@admin.register(Cpu)
+class CpuAdmin(admin.ModelAdmin):
+    list_display = ('name', 'is_active', 'inquiry_count', 'updated_at')
+    list_editable = ('is_active',)
+    list_filter = ('is_active',)
+    search_fields = ('name',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(inquiry_count=Count('inquiries'))
+
+    @admin.display(description='inquiries', ordering='inquiry_count')
+    def inquiry_count(self, obj):
+        return obj.inquiry_count
+
 
 @admin.register(CpuInquiry)
-class CpuInquiryAdmin(admin.ModelAdmin):
+class CpuInquiryAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = (
         'id',
         'full_name',
@@ -24,14 +140,17 @@ class CpuInquiryAdmin(admin.ModelAdmin):
         'created_at'
     )
 
-    list_filter = ('cpu_model', 'created_at')
+    # Filtering by catalog entry lists the small catalog table instead of
+    # every distinct cpu_model string.
+    list_filter = ('cpu', 'created_at')
     search_fields = ('full_name', 'email', 'cpu_model')
     ordering = ('-created_at',)
+    date_hierarchy = 'created_at'
 
     readonly_fields = ()   
 
 @admin.register(CareerApplication)
-class CareerApplicationAdmin(admin.ModelAdmin):
+class CareerApplicationAdmin(BulkActionsMixin, PerformanceAdminMixin, admin.ModelAdmin):
     list_display = (
         'full_name',
         'email',
@@ -41,18 +160,22 @@ class CareerApplicationAdmin(admin.ModelAdmin):
         'applied_at'
     )
     search_fields = ('full_name', 'email', 'skills')
+    ordering = ('-applied_at',)
+    date_hierarchy = 'applied_at'
 
 @admin.register(ContactMessage)
-class ContactMessageAdmin(admin.ModelAdmin):
+class ContactMessageAdmin(BulkActionsMixin, PerformanceAdminMixin, admin.ModelAdmin):
 
     list_display = (
         "name",
         "email",
         "phone",
         "subject",
-        "message",
+        preview("message"),
         "created_at",
     )
+    ordering = ("-created_at",)
+    date_hierarchy = "created_at"
 
     search_fields = (
         "name",
@@ -116,5 +239,170 @@ class CommunityItemAdmin(admin.ModelAdmin):
     class Media:
         js = ("admin/js/community_toggle.js",)
    
-admin.site.register(HackathonTeam)
-admin.site.register(HackathonParticipant)
\ No newline at end of file
+@admin.register(HackathonEvent)
+class HackathonEventAdmin(admin.ModelAdmin):
+    list_display = (
+        "name",
+        "slug",
+        "capacity",
+        "registered_teams",
+        "registered_participants",
+        "remaining_seats",
+        "is_active",
+    )
+    list_filter = ("is_active",)
+    prepopulated_fields = {"slug": ("name",)}
+    readonly_fields = ("registered_teams", "registered_participants")
+    actions = ("rebuild_event_counters",)
+
+    @admin.action(description="Recount registrations from the participant table")
+    def rebuild_event_counters(self, request, queryset):
+        for event in queryset:
+            rebuild_counters(event)
+        self.message_user(request, f"Recounted {queryset.count()} event(s)")
+
+
+@admin.register(HackathonTeam)
+class HackathonTeamAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    list_display = ("team_name", "event", "total_participants", "created_at")
+    list_filter = ("event",)
+    list_select_related = ("event",)
+    search_fields = ("team_name",)
+    ordering = ("-created_at",)
+    date_hierarchy = "created_at"
+
+
+@admin.register(HackathonParticipant)
+class HackathonParticipantAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    list_display = ("full_name", "role", "email", "phone", "branch", "year", "team")
+    list_filter = ("role", "branch", "year")
+    list_select_related = ("team",)
+    search_fields = ("full_name", "email", "team__team_name")
+    raw_id_fields = ("team",)
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "name",
+        "status",
+        "attempts",
+        "max_attempts",
+        "run_after",
+        "progress",
+        "duration_ms",
+        "created_at",
+    )
+    list_filter = ("status", "name")
+    search_fields = ("name", "last_error")
+    ordering = ("-created_at",)
+    readonly_fields = (
+        "locked_by",
+        "locked_at",
+        "last_error",
+        "created_at",
+        "finished_at",
+        "duration_ms",
+        "progress",
+        "download",
+    )
+    actions = ("retry_jobs",)
+
+    @admin.display(description="export")
+    def download(self, obj):
+        url = obj.progress.get("download")
+        return format_html('<a href="{}">Download CSV</a>', url) if url else "-"
+
+    @admin.action(description="Retry selected jobs")
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status="running").update(
+            status="queued",
+            attempts=0,
+            run_after=timezone.now(),
+        )
+        self.message_user(request, f"{updated} job(s) queued again")
+
+
+@admin.register(ArchivedSubmission)
+class ArchivedSubmissionAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    list_display = ("model", "original_id", "created_at", "archived_at")
+    list_filter = ("model",)
+    search_fields = ("=original_id",)
+    ordering = ("-created_at",)
+    date_hierarchy = "created_at"
+    exclude = ("data",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(NotificationDelivery)
+class NotificationDeliveryAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    list_display = ("channel", "backend", "status", "items", "duration_ms", "created_at")
+    list_filter = ("status", "channel", "backend")
+    ordering = ("-created_at",)
+    date_hierarchy = "created_at"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PendingNotification)
+class PendingNotificationAdmin(admin.ModelAdmin):
+    list_display = ("channel", "subject", "created_at")
+    list_filter = ("channel",)
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        "created_at",
+        "method",
+        "path",
+        "status_code",
+        "duration_ms",
+        "sql_count",
+        "sql_ms",
+        "user",
+    )
+    list_filter = ("method", "status_code")
+    search_fields = ("path",)
+    date_hierarchy = "created_at"
+    exclude = ("call_tree", "queries", "serializers")
+    readonly_fields = ("serializer_timings", "query_list", "call_tree_text")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Serializers (inclusive ms)")
+    def serializer_timings(self, obj):
+        return format_html(
+            "<pre>{}</pre>",
+            "\n".join(
+                f"{entry['ms']:9.1f} ms  {entry['calls']:5}x  {entry['serializer']}"
+                for entry in obj.serializers
+            ),
+        )
+
+    @admin.display(description="SQL")
+    def query_list(self, obj):
+        return format_html(
+            "<pre>{}</pre>",
+            "\n".join(f"{query['ms']:9.1f} ms  {query['sql']}" for query in obj.queries),
+        )
+
+    @admin.display(description="Call tree")
+    def call_tree_text(self, obj):
+        return format_html("<pre>{}</pre>", obj.call_tree)
@@ -0,0 +1,90 @@
+"""
+Changelist helpers for admin pages over large submission tables.
+
+``PerformanceAdminMixin`` keeps the number and cost of changelist
+queries flat as a table grows:
+
+* counts come from the planner statistics on Postgres once a table is
+  big enough that the estimate is good enough for the paginator;
+* long text columns are listed through ``preview()``, which selects a
+  truncated prefix and defers the full column;
+* the extra "N total" count query is skipped.
+"""
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models.functions import Left
+from django.utils.functional import cached_property
+
+# Below this many rows an exact COUNT(*) is cheap and exact numbers are nicer.
+ESTIMATE_THRESHOLD = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """Uses pg_class.reltuples instead of COUNT(*) for unfiltered querysets."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        estimate = self._estimate(queryset)
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return estimate
+        return super().count
+
+    @staticmethod
+    def _estimate(queryset):
+        query = getattr(queryset, "query", None)
+        if query is None or query.where or query.distinct:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row and row[0] > 0 else None
+
+
+def preview(field_name, length=80):
+    """list_display entry showing the first ``length`` characters of a text field."""
+    attname = f"{field_name}_preview"
+
+    @admin.display(description=field_name.replace("_", " "))
+    def display(obj):
+        # One character more than shown, to tell truncated values apart.
+        value = getattr(obj, attname, None)
+        if value is None:
+            value = getattr(obj, field_name)[:length + 1]
+        return value[:length] + "…" if len(value) > length else value
+
+    display.preview = (field_name, attname, length)
+    return display
+
+
+class PerformanceChangeList(ChangeList):
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        previews = [
+            item.preview for item in self.list_display
+            if hasattr(item, "preview")
+        ]
+        if previews:
+            queryset = queryset.annotate(**{
+                attname: Left(field_name, length + 1)
+                for field_name, attname, length in previews
+            }).defer(*[field_name for field_name, _, _ in previews])
+        return queryset
+
+
+class PerformanceAdminMixin:
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+    def get_changelist(self, request, **kwargs):
+        return PerformanceChangeList
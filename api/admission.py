@@ -0,0 +1,191 @@
+"""
+Admission control: bounded concurrency per route class, per process.
+
+Each request is matched to the first class in ADMISSION_CLASSES whose
+methods and path pattern fit. A class with a ``limit`` admits that many
+requests at once in this worker process; a request over the limit
+waits up to ``max_wait`` seconds for a slot and is otherwise answered
+503 with ``Retry-After`` before any work is done. Uploads and
+registrations get small limits, so a burst of them can't take every
+thread and cheap reads keep being served.
+
+When the proxy stamps requests with ``X-Request-Start``, a request that
+already queued longer than its class's ``max_queue_age`` is rejected
+straight away: its client has likely given up.
+
+Decisions are counted per class and written to ADMISSION_METRICS_DIR
+by each process, and ``metrics_text()`` sums them for all processes in
+the Prometheus text format.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+
+class RouteClass:
+
+    def __init__(self, name, methods, path, limit=None, max_wait=0.0, retry_after=1,
+                 max_queue_age=None):
+        self.name = name
+        self.methods = frozenset(methods)
+        self.path = re.compile(path)
+        self.limit = limit
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.max_queue_age = max_queue_age
+        self.in_flight = 0
+        self.counts = Counter()
+        self.wait_seconds = 0.0
+        self._condition = threading.Condition()
+
+    def matches(self, request):
+        return request.method in self.methods and self.path.match(request.path_info)
+
+    def acquire(self):
+        """Take a slot, waiting up to max_wait. Returns False if none freed up."""
+        started = time.monotonic()
+        with self._condition:
+            admitted = self.limit is None or self._condition.wait_for(
+                lambda: self.in_flight < self.limit, timeout=self.max_wait
+            )
+            self.wait_seconds += time.monotonic() - started
+            if admitted:
+                self.in_flight += 1
+                self.counts["admitted"] += 1
+            else:
+                self.counts["rejected_busy"] += 1
+            return admitted
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def reject_stale(self):
+        with self._condition:
+            self.counts["rejected_queue_age"] += 1
+
+    def snapshot(self):
+        with self._condition:
+            return {
+                "in_flight": self.in_flight,
+                "limit": self.limit,
+                "wait_seconds": round(self.wait_seconds, 6),
+                **self.counts,
+            }
+
+
+def load_classes():
+    return [RouteClass(**options) for options in settings.ADMISSION_CLASSES]
+
+
+def queue_age(request, now=None):
+    """Seconds since the proxy's ``X-Request-Start`` stamp, or None."""
+    value = request.headers.get("X-Request-Start", "").removeprefix("t=")
+    try:
+        stamp = float(value)
+    except ValueError:
+        return None
+    # Proxies stamp in seconds, milliseconds or microseconds.
+    if stamp > 1e14:
+        stamp /= 1e6
+    elif stamp > 1e11:
+        stamp /= 1e3
+    return max(0.0, (now or time.time()) - stamp)
+
+
+_last_write = 0.0
+_written_in_flight = {}
+_write_lock = threading.Lock()
+
+
+def write_metrics(classes):
+    """Save this process's counters, at most once a second.
+
+    Also right away when a class has gone idle since the last write, so
+    the in-flight gauges don't stay up after a burst.
+    """
+    global _last_write
+    now = time.monotonic()
+    went_idle = any(
+        route.in_flight == 0 and _written_in_flight.get(route.name) for route in classes
+    )
+    if not went_idle and now - _last_write < 1:
+        return
+    with _write_lock:
+        _last_write = now
+        snapshot = {route.name: route.snapshot() for route in classes}
+        _written_in_flight.update(
+            (name, values["in_flight"]) for name, values in snapshot.items()
+        )
+        os.makedirs(settings.ADMISSION_METRICS_DIR, exist_ok=True)
+        path = os.path.join(settings.ADMISSION_METRICS_DIR, f"{os.getpid()}.json")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as handle:
+            json.dump(snapshot, handle)
+        os.replace(temp_path, path)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect():
+    """Counters summed over the live processes; files of exited ones are removed."""
+    totals = {}
+    directory = settings.ADMISSION_METRICS_DIR
+    if not os.path.isdir(directory):
+        return totals
+    for name in os.listdir(directory):
+        pid, _, suffix = name.partition(".")
+        if suffix != "json" or not pid.isdigit():
+            continue
+        path = os.path.join(directory, name)
+        if not _alive(int(pid)):
+            os.remove(path)
+            continue
+        try:
+            with open(path) as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        for route, values in data.items():
+            total = totals.setdefault(route, Counter())
+            for key, value in values.items():
+                if key != "limit":
+                    total[key] += value
+    return totals
+
+
+def metrics_text():
+    lines = []
+    series = [
+        ("admission_requests_total", "counter", "Requests by route class and decision"),
+        ("admission_in_flight", "gauge", "Requests being served"),
+        ("admission_wait_seconds_total", "counter", "Time spent waiting for a slot"),
+    ]
+    totals = collect()
+    for metric, kind, description in series:
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {kind}"]
+        for route, values in sorted(totals.items()):
+            if metric == "admission_requests_total":
+                for decision in ("admitted", "rejected_busy", "rejected_queue_age"):
+                    lines.append(
+                        f'{metric}{{route="{route}",decision="{decision}"}} {values[decision]}'
+                    )
+            elif metric == "admission_in_flight":
+                lines.append(f'{metric}{{route="{route}"}} {values["in_flight"]}')
+            else:
+                lines.append(f'{metric}{{route="{route}"}} {values["wait_seconds"]:.6f}')
+    return "\n".join(lines) + "\n"
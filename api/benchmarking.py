@@ -0,0 +1,118 @@
+"""
+Tiny HTTP load generator for the benchmark management commands.
+
+Uses only the standard library: each client thread keeps one
+keep-alive connection and sends requests back to back for a fixed
+duration.
+"""
+import http.client
+import statistics
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+
+def multipart_body(fields, files):
+    """Encode ``fields`` and ``files`` ({name: (filename, bytes, type)})."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, content, content_type) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+            f'filename="{filename}"\r\nContent-Type: {content_type}\r\n\r\n'.encode()
+            + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class Request:
+    def __init__(self, method, path, body=None, headers=None):
+        self.method = method
+        self.path = path
+        self.body = body
+        self.headers = headers or {}
+
+
+def run_load(base_url, requests, clients=10, duration=10.0):
+    """Cycle through ``requests`` from ``clients`` threads for ``duration`` s.
+
+    Returns requests/s, latency percentiles in ms and counts by outcome.
+    """
+    url = urlsplit(base_url)
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        connection = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+        local_latencies = []
+        local_statuses = {}
+        index = offset
+        while time.monotonic() < deadline:
+            request = requests[index % len(requests)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                connection.request(request.method, request.path, request.body, request.headers)
+                response = connection.getresponse()
+                response.read()
+                outcome = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+                outcome = "error"
+            local_latencies.append((time.perf_counter() - started) * 1000)
+            local_statuses[outcome] = local_statuses.get(outcome, 0) + 1
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            for key, count in local_statuses.items():
+                statuses[key] = statuses.get(key, 0) + count
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+
+    def percentile(p):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 1)
+
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "mean_ms": round(statistics.fmean(latencies), 1) if latencies else None,
+        "statuses": statuses,
+    }
+
+
+def wait_for(base_url, path="/", timeout=30.0):
+    """Block until ``base_url`` answers, or raise TimeoutError."""
+    url = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(url.hostname, url.port, timeout=2)
+            connection.request("GET", path)
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"{base_url} did not start within {timeout}s")
@@ -0,0 +1,131 @@
+"""
+Chunked bulk operations over submission tables.
+
+Rows are walked by primary key one chunk at a time (keyset pagination),
+so no more than ``CHUNK_SIZE`` rows are ever held in memory. Files
+referenced by deleted rows are removed from storage per chunk, after
+the chunk's transaction has committed.
+"""
+import csv
+import io
+import secrets
+import tempfile
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import default_storage, storages
+from django.db import transaction
+from django.utils import timezone
+
+from .transactions import write_transaction
+
+CHUNK_SIZE = 500
+
+# Submission models: label -> (date field, file fields)
+SUBMISSION_MODELS = {
+    "api.CareerApplication": ("applied_at", ["resume"]),
+    "api.ContactMessage": ("created_at", []),
+    "api.CpuInquiry": ("created_at", []),
+}
+
+
+def build_queryset(model_label, ids=None, before=None, after=None, search=None, max_pk=None):
+    """Rows selected either by explicit ``ids`` or a date range.
+
+    ``search`` applies the model admin's changelist search and
+    ``max_pk`` leaves out rows added after the selection was made.
+    """
+    model = apps.get_model(model_label)
+    date_field, _ = SUBMISSION_MODELS[model_label]
+    queryset = model.objects.all()
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    if max_pk is not None:
+        queryset = queryset.filter(pk__lte=max_pk)
+    if search:
+        # Imported here: only "select all" actions from the admin search.
+        from django.contrib import admin
+
+        queryset, _ = admin.site._registry[model].get_search_results(None, queryset, search)
+    if before:
+        queryset = queryset.filter(**{f"{date_field}__lt": before})
+    if after:
+        queryset = queryset.filter(**{f"{date_field}__gte": after})
+    return queryset
+
+
+def iter_chunks(queryset, *fields, chunk_size=CHUNK_SIZE):
+    """Yield lists of ``values()`` dicts ordered by pk, one chunk at a time."""
+    last_pk = None
+    while True:
+        chunk = queryset.order_by("pk")
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        rows = list(chunk.values("pk", *fields)[:chunk_size])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1]["pk"]
+
+
+def delete_files(names):
+    """Remove stored files, ignoring ones that are already gone."""
+    for name in names:
+        if name:
+            default_storage.delete(name)
+
+
+def _file_names(rows, file_fields):
+    return [row[field] for row in rows for field in file_fields if row[field]]
+
+
+def bulk_delete(queryset, progress=None):
+    model_label = queryset.model._meta.label
+    _, file_fields = SUBMISSION_MODELS[model_label]
+    total = queryset.count()
+    done = 0
+
+    for rows in iter_chunks(queryset, *file_fields):
+        names = _file_names(rows, file_fields)
+        with write_transaction():
+            queryset.model.objects.filter(pk__in=[row["pk"] for row in rows]).delete()
+            transaction.on_commit(lambda names=names: delete_files(names))
+        done += len(rows)
+        if progress:
+            progress(done=done, total=total)
+
+    return done
+
+
+def _export_name(model_label):
+    # Unguessable, so knowing when an export ran doesn't find its file.
+    stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+    return f"{model_label.replace('.', '-').lower()}-{stamp}-{secrets.token_urlsafe(16)}.csv"
+
+
+def bulk_export(queryset, progress=None):
+    """Write the selected rows to a CSV in the private "exports" storage.
+
+    The CSV is built in a temporary file and then saved through the
+    storage, so it lands in the bucket's private prefix when media is on
+    S3. Returns the stored name; staff download it through the job
+    (ExportDownloadView).
+    """
+    model = queryset.model
+    fields = [field.attname for field in model._meta.concrete_fields if not field.primary_key]
+    total = queryset.count()
+    done = 0
+
+    with tempfile.TemporaryFile() as handle:
+        text = io.TextIOWrapper(handle, encoding="utf-8", newline="")
+        writer = csv.DictWriter(text, fieldnames=["pk"] + fields)
+        writer.writeheader()
+        for rows in iter_chunks(queryset, *fields):
+            writer.writerows(rows)
+            done += len(rows)
+            if progress:
+                progress(done=done, total=total)
+        text.flush()
+        text.detach()
+        handle.seek(0)
+        return storages["exports"].save(_export_name(model._meta.label), File(handle))
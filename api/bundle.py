@@ -0,0 +1,77 @@
+"""
+The landing page's feeds in one response (/api/bundle/).
+
+Each requested section is fetched with one query and serialized with
+the feed's own serializer. The ETag comes from the feeds' versions
+(FeedVersion, bumped by every change; see api/snapshots.py), so
+revalidations and repeat requests cost one small query instead of
+rendering the sections, and every instance agrees on it.
+"""
+import hashlib
+import json
+
+
+from .models import MOU, CommunityItem, GalleryImage, Project
+from .serializers import (
+    CommunityItemSerializer,
+    GalleryImageSerializer,
+    MOUSerializer,
+    ProjectSerializer,
+)
+from .snapshots import versions
+
+# section: (queryset, serializer), matching the feed's list endpoint
+SECTIONS = {
+    "mous": (lambda: MOU.objects.filter(is_active=True), MOUSerializer),
+    "gallery": (lambda: GalleryImage.objects.order_by("-created_at"), GalleryImageSerializer),
+    "projects": (lambda: Project.objects.all(), ProjectSerializer),
+    "giveback": (
+        lambda: CommunityItem.objects.filter(section="giveback").order_by("-created_at"),
+        CommunityItemSerializer,
+    ),
+}
+
+DEFAULT_LIMIT = 12
+MAX_LIMIT = 100
+
+
+class BundleError(ValueError):
+    pass
+
+
+def parse_sections(value):
+    """``"mous,gallery:20"`` -> ``{"mous": DEFAULT_LIMIT, "gallery": 20}``; empty means all."""
+    if not value:
+        return dict.fromkeys(SECTIONS, DEFAULT_LIMIT)
+    sections = {}
+    for item in filter(None, value.split(",")):
+        name, _, limit = item.partition(":")
+        if name not in SECTIONS:
+            raise BundleError(f"Unknown section {name!r}")
+        try:
+            limit = int(limit) if limit else DEFAULT_LIMIT
+        except ValueError:
+            raise BundleError(f"Invalid limit for {name!r}")
+        if not 1 <= limit <= MAX_LIMIT:
+            raise BundleError(f"Limit for {name!r} must be between 1 and {MAX_LIMIT}")
+        sections[name] = limit
+    return sections
+
+
+def version_tag(sections, host):
+    """ETag for ``sections`` from the feeds' current versions."""
+    current = versions(list(sections))
+    key = json.dumps(
+        [host, sorted((name, limit, current[name]) for name, limit in sections.items())]
+    )
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def build(sections, request):
+    data = {}
+    for name, limit in sections.items():
+        queryset, serializer_class = SECTIONS[name]
+        data[name] = list(serializer_class(
+            queryset()[:limit], many=True, context={"request": request}
+        ).data)
+    return data
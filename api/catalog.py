@@ -0,0 +1,110 @@
+"""
+The CPU catalog, held in memory per process for autocomplete.
+
+Every word of every active entry's name is a key in a sorted list, so a
+prefix query is a binary search plus a short scan: "i7" finds
+"Intel Core i7-12700" without touching the database.
+
+The index is rebuilt when the catalog changes. Saves in this process
+invalidate it on commit; other processes notice within
+CPU_CATALOG_REFRESH seconds, when a lookup compares the table's version
+(last update and row count) with the indexed one.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models import Cpu
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def normalize(text):
+    """Lowercase words separated by single spaces: "Core i7-12700" -> "core i7 12700"."""
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+class Index:
+
+    def __init__(self, rows, version):
+        self.version = version
+        self.ids = {normalize(row["name"]): row["id"] for row in rows}
+        self.entries = [
+            {key: row[key] for key in ("id", "name", "ram_options", "storage_options")}
+            for row in rows
+            if row["is_active"]
+        ]
+        self.names = [normalize(entry["name"]) for entry in self.entries]
+        keys = []
+        for position, name in enumerate(self.names):
+            words = name.split(" ")
+            for start in range(len(words)):
+                keys.append((" ".join(words[start:]), position))
+        keys.sort()
+        self.keys = [key for key, _ in keys]
+        self.positions = [position for _, position in keys]
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Active entries with a word starting with ``query``; name matches first."""
+        prefix = normalize(query)
+        if not prefix:
+            return self.entries[:limit]
+        found = set()
+        index = bisect_left(self.keys, prefix)
+        while index < len(self.keys) and self.keys[index].startswith(prefix):
+            found.add(self.positions[index])
+            index += 1
+        ranked = sorted(found, key=lambda position: (not self.names[position].startswith(prefix), position))
+        return [self.entries[position] for position in ranked[:limit]]
+
+    def match(self, name):
+        """Id of the entry named ``name`` (ignoring case and punctuation), or None."""
+        return self.ids.get(normalize(name))
+
+
+_lock = threading.Lock()
+_index = None
+_checked = float("-inf")
+
+
+def _version():
+    stats = Cpu.objects.aggregate(updated=Max("updated_at"), rows=Count("id"))
+    return stats["updated"], stats["rows"]
+
+
+def get_index():
+    """The current index, checking the table's version at most every CPU_CATALOG_REFRESH seconds."""
+    global _index, _checked
+    if _index is not None and time.monotonic() - _checked < settings.CPU_CATALOG_REFRESH:
+        return _index
+    with _lock:
+        if _index is None or time.monotonic() - _checked >= settings.CPU_CATALOG_REFRESH:
+            # Version first: a change made while reading the rows shows up
+            # as a newer version on the next check.
+            version = _version()
+            if _index is None or _index.version != version:
+                rows = Cpu.objects.order_by("name").values(
+                    "id", "name", "ram_options", "storage_options", "is_active"
+                )
+                _index = Index(list(rows), version)
+            _checked = time.monotonic()
+        return _index
+
+
+def invalidate():
+    """Make the next lookup check the table's version."""
+    global _checked
+    _checked = float("-inf")
+
+
+def search(query, limit=DEFAULT_LIMIT):
+    return get_index().search(query, limit)
+
+
+def match(name):
+    return get_index().match(name)
@@ -0,0 +1,99 @@
+"""
+Uploads sent by the client straight to S3-compatible storage.
+
+``POST /api/uploads/direct/`` checks the file's name, type and size
+against the target field and returns a presigned POST: the URL and form
+fields to send the file with, which storage enforces (exact key, type,
+size limit), plus a signed ``token``. The client then submits the form
+to the usual endpoint with ``<field>_key=<token>`` in place of the file;
+the serializer checks the token, that the object exists and that no
+row references it yet, and the row references the uploaded object as
+is. The bytes never pass through Django.
+
+Needs the S3 storage backend (AWS_STORAGE_BUCKET_NAME) and a bucket CORS
+rule allowing POST from the site's origin.
+"""
+import os
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+
+SALT = "api.direct_uploads"
+
+# target: (model label, field, storage directory, content types, max bytes, staff only)
+TARGETS = {
+    "career.resume": (
+        "api.CareerApplication", "resume", "resume", ("application/pdf",), 5 * 1024 * 1024, False,
+    ),
+    "mou.pdf": (
+        "api.MOU", "pdf", "mous/direct", ("application/pdf",), settings.UPLOAD_MAX_SIZE, True,
+    ),
+}
+
+
+class DirectUploadError(Exception):
+    pass
+
+
+def direct_uploads_enabled():
+    return bool(settings.AWS_STORAGE_BUCKET_NAME)
+
+
+def staff_only(target):
+    return TARGETS[target][5]
+
+
+def presign(target, filename, content_type, size):
+    """Presigned POST for uploading one file for ``target``."""
+    _, _, directory, content_types, max_size, _ = TARGETS[target]
+    if content_type not in content_types:
+        raise DirectUploadError(f"Content type must be one of: {', '.join(content_types)}")
+    if size > max_size:
+        raise DirectUploadError(f"File must be at most {max_size} bytes")
+
+    name = default_storage.get_valid_name(os.path.basename(filename)) or "upload"
+    # A fresh directory per upload, so keys never collide or overwrite.
+    key = f"{directory}/{uuid.uuid4().hex}/{name}"
+    client = default_storage.connection.meta.client
+    post = client.generate_presigned_post(
+        default_storage.bucket_name,
+        key,
+        Fields={"Content-Type": content_type},
+        Conditions=[
+            {"Content-Type": content_type},
+            ["content-length-range", 1, max_size],
+        ],
+        ExpiresIn=settings.DIRECT_UPLOAD_EXPIRES,
+    )
+    return {
+        "url": post["url"],
+        "fields": post["fields"],
+        "key": key,
+        "token": signing.dumps({"target": target, "key": key}, salt=SALT),
+        "expires_in": settings.DIRECT_UPLOAD_EXPIRES,
+    }
+
+
+def stored_file(token, target):
+    """The uploaded object for ``token`` as a file of ``target``'s field."""
+    try:
+        data = signing.loads(token, salt=SALT, max_age=settings.DIRECT_UPLOAD_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        raise DirectUploadError("Invalid or expired upload token")
+    if data["target"] != target:
+        raise DirectUploadError("Upload token is for another field")
+    if not default_storage.exists(data["key"]):
+        raise DirectUploadError("File has not been uploaded")
+
+    model_label, field_name = TARGETS[target][:2]
+    model = apps.get_model(model_label)
+    # Single use: a second submission with the same token would share
+    # (and on deletion remove) the first one's file.
+    if model.objects.filter(**{field_name: data["key"]}).exists():
+        raise DirectUploadError("Upload token has already been used")
+    field = model._meta.get_field(field_name)
+    # Already in storage (committed), so saving the row doesn't upload it again.
+    return field.attr_class(None, field, data["key"])
@@ -0,0 +1,243 @@
+"""
+Live feed of new submissions, streamed to the staff dashboard as
+Server-Sent Events (/api/submissions/stream/).
+
+Creating a submission writes a SubmissionEvent in the same transaction,
+so an event exists exactly when its submission is committed. The event
+id is the stream cursor: the listing endpoints report the latest one in
+``X-Last-Event-Id``, and a client that loaded a listing streams from
+there, resuming with ``Last-Event-ID`` after a reconnect.
+
+Open streams wait on a per-process hub instead of polling the database
+each. The hub is woken on commit in the process that wrote the event,
+and from a watcher thread for writes in other processes: Postgres
+LISTEN/NOTIFY where available, else one cheap polling query per
+process.
+
+Streams hold a connection open, so serve them from the ASGI app
+(backend/asgi.py).
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import (
+    CareerApplication,
+    ContactMessage,
+    CpuInquiry,
+    HackathonTeam,
+    SubmissionEvent,
+)
+from .serializers import (
+    CareerApplicationSerializer,
+    ContactMessageSerializer,
+    CpuInquirySerializer,
+    HackathonTeamSerializer,
+)
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "submission_events"
+BATCH_SIZE = 100
+RETRY_MS = 3000
+# An id gap younger than this may be a transaction still committing.
+SETTLE = timedelta(seconds=5)
+
+# kind: (model, serializer used by its listing endpoint)
+KINDS = {
+    "career": (CareerApplication, CareerApplicationSerializer),
+    "contact": (ContactMessage, ContactMessageSerializer),
+    "cpu": (CpuInquiry, CpuInquirySerializer),
+    "hackathon": (HackathonTeam, HackathonTeamSerializer),
+}
+MODEL_KINDS = {model: kind for kind, (model, _) in KINDS.items()}
+
+
+class Hub:
+    """Wakes the streams waiting in this process, from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = set()
+
+    def subscribe(self):
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        return waiter
+
+    def unsubscribe(self, waiter):
+        with self._lock:
+            self._waiters.discard(waiter)
+
+    def wake(self):
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Loop closed under a stream that is going away.
+                pass
+
+
+hub = Hub()
+_watcher_lock = threading.Lock()
+_watcher = None
+
+
+def record(instance):
+    """Add the event for a newly created submission (called from post_save)."""
+    SubmissionEvent.objects.create(kind=MODEL_KINDS[type(instance)], object_id=instance.pk)
+    if connection.vendor == "postgresql":
+        # Delivered to listeners when the transaction commits.
+        with connection.cursor() as cursor:
+            cursor.execute(f"NOTIFY {CHANNEL}")
+    transaction.on_commit(hub.wake)
+
+
+def latest_id():
+    return SubmissionEvent.objects.aggregate(last=Max("id"))["last"] or 0
+
+
+def prune(now=None):
+    """Delete events older than SUBMISSION_EVENT_RETENTION_DAYS. Returns the count."""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.SUBMISSION_EVENT_RETENTION_DAYS)
+    deleted, _ = SubmissionEvent.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def committed_after(cursor):
+    """Events after ``cursor`` that are safe to send, and whether more are held back.
+
+    Ids are assigned at insert but become visible at commit, so a later
+    id can show up before an earlier one. Events after a gap are held
+    back until the gap is older than SETTLE (then it was a rollback).
+    """
+    events = list(SubmissionEvent.objects.filter(id__gt=cursor)[:BATCH_SIZE])
+    settled = timezone.now() - SETTLE
+    expected = cursor + 1
+    for index, event in enumerate(events):
+        if event.id != expected and event.created_at > settled:
+            return events[:index], True
+        expected = event.id + 1
+    return events, False
+
+
+def serialize(events, kinds):
+    """(id, kind, data) for ``events`` of ``kinds``; one query per kind."""
+    ids = {}
+    for event in events:
+        if event.kind in kinds:
+            ids.setdefault(event.kind, []).append(event.object_id)
+    objects = {}
+    for kind, object_ids in ids.items():
+        model, serializer_class = KINDS[kind]
+        for obj in model.objects.filter(pk__in=object_ids):
+            objects[kind, obj.pk] = serializer_class(obj).data
+    return [
+        (event.id, event.kind, objects[event.kind, event.object_id])
+        for event in events
+        # Skips submissions deleted since.
+        if (event.kind, event.object_id) in objects
+    ]
+
+
+def _fetch(cursor, kinds):
+    events, held = committed_after(cursor)
+    last = events[-1].id if events else cursor
+    return serialize(events, kinds), last, held or len(events) == BATCH_SIZE
+
+
+def format_event(event_id, kind, data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return f"id: {event_id}\nevent: {kind}\ndata: {payload}\n\n"
+
+
+async def stream(cursor, kinds):
+    """The SSE body: events after ``cursor``, then new ones as they commit."""
+    start_watcher()
+    waiter = hub.subscribe()
+    _, wakeup = waiter
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while True:
+            # Cleared before reading, so a commit during the read isn't missed.
+            wakeup.clear()
+            items, cursor, pending = await sync_to_async(_fetch)(cursor, kinds)
+            for item in items:
+                yield format_event(*item)
+            if pending and not items:
+                # Held back behind a committing transaction.
+                await asyncio.sleep(1)
+                continue
+            if pending:
+                continue
+            try:
+                await asyncio.wait_for(wakeup.wait(), settings.SSE_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection.
+                yield ": keepalive\n\n"
+    finally:
+        hub.unsubscribe(waiter)
+
+
+def start_watcher():
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None or not _watcher.is_alive():
+            _watcher = threading.Thread(target=_watch, name="submission-events", daemon=True)
+            _watcher.start()
+
+
+def _watch():
+    """Wake the hub on events written by other processes."""
+    while True:
+        try:
+            if connections["default"].vendor == "postgresql":
+                _listen()
+            else:
+                _poll()
+        except Exception:
+            logger.exception("Submission event watcher failed; restarting")
+            time.sleep(5)
+        finally:
+            connections.close_all()
+
+
+def _listen():
+    database = connections["default"]
+    raw = database.get_new_connection(database.get_connection_params())
+    try:
+        raw.autocommit = True
+        with raw.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        while True:
+            if select.select([raw], [], [], 60)[0]:
+                raw.poll()
+                if raw.notifies:
+                    raw.notifies.clear()
+                    hub.wake()
+    finally:
+        raw.close()
+
+
+def _poll():
+    last = latest_id()
+    while True:
+        time.sleep(settings.SSE_POLL_INTERVAL)
+        current = latest_id()
+        if current != last:
+            last = current
+            hub.wake()
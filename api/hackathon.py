@@ -0,0 +1,209 @@
+"""
+Hackathon registration with capacity limits and live counters.
+
+Event totals and per-branch/per-year participant counts are stored as
+counters and changed with F() expressions in the same transaction as
+the registration, so stats never need to aggregate the participant
+table. The capacity check is a conditional UPDATE of the event row:
+the row lock it takes serialises concurrent registrations for the same
+event, and it matches nothing once the seats are gone.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Q
+
+from .models import (
+    HackathonCounter,
+    HackathonEvent,
+    HackathonParticipant,
+    HackathonTeam,
+)
+from .transactions import write_transaction
+
+COUNTED_FIELDS = ("branch", "year")
+
+
+class EventFull(Exception):
+    pass
+
+
+class DuplicateParticipant(Exception):
+    """Some emails/phones of a registration are already registered."""
+
+    def __init__(self, emails=(), phones=()):
+        super().__init__(emails, phones)
+        self.emails = sorted(emails)
+        self.phones = sorted(phones)
+
+
+def current_event(slug=None, create=False):
+    """The event registrations go to: ``slug``, else the newest active one.
+
+    Raises HackathonEvent.DoesNotExist if there is none, unless ``create``
+    (registrations) sets up a default event.
+    """
+    if slug:
+        return HackathonEvent.objects.get(slug=slug, is_active=True)
+    event = HackathonEvent.objects.filter(is_active=True).order_by("-created_at").first()
+    if event is None:
+        if not create:
+            raise HackathonEvent.DoesNotExist("No active hackathon event")
+        event, _ = HackathonEvent.objects.get_or_create(
+            slug="default",
+            defaults={
+                "name": "Hackathon",
+                "capacity": settings.HACKATHON_DEFAULT_CAPACITY,
+            },
+        )
+    return event
+
+
+def _reserve_seats(event, seats):
+    reserved = HackathonEvent.objects.filter(
+        Q(capacity__isnull=True) | Q(registered_participants__lte=F("capacity") - seats),
+        pk=event.pk,
+    ).update(
+        registered_teams=F("registered_teams") + 1,
+        registered_participants=F("registered_participants") + seats,
+    )
+    if not reserved:
+        raise EventFull(event)
+
+
+def _change_counters(event_id, participants, sign):
+    counts = Counter(
+        (field, getattr(participant, field))
+        for participant in participants
+        for field in COUNTED_FIELDS
+    )
+    HackathonCounter.objects.bulk_create(
+        [
+            HackathonCounter(event_id=event_id, dimension=dimension, value=value)
+            for dimension, value in counts
+        ],
+        ignore_conflicts=True,
+    )
+    for (dimension, value), count in counts.items():
+        HackathonCounter.objects.filter(
+            event_id=event_id, dimension=dimension, value=value
+        ).update(count=F("count") + sign * count)
+
+
+def find_registered(event, participants):
+    """Emails and phones of ``participants`` already registered for ``event``.
+
+    One query, answered from the per-event unique indexes.
+    """
+    emails = {p.email_normalized for p in participants}
+    phones = {p.phone_normalized for p in participants if p.phone_normalized}
+    taken = HackathonParticipant.objects.filter(event=event).filter(
+        Q(email_normalized__in=emails) | Q(phone_normalized__in=phones)
+    ).values_list("email_normalized", "phone_normalized")
+
+    taken_emails, taken_phones = set(), set()
+    for email, phone in taken:
+        if email in emails:
+            taken_emails.add(email)
+        if phone in phones:
+            taken_phones.add(phone)
+    return taken_emails, taken_phones
+
+
+def register_team(event, team_name, total_participants, leader, members):
+    """Create a team and its participants.
+
+    Raises EventFull or DuplicateParticipant.
+    """
+    participants = [HackathonParticipant(event=event, role="LEADER", **leader)]
+    participants += [
+        HackathonParticipant(event=event, role="MEMBER", **member)
+        for member in members
+    ]
+    for participant in participants:
+        participant.normalize_contact()
+
+    taken_emails, taken_phones = find_registered(event, participants)
+    if taken_emails or taken_phones:
+        raise DuplicateParticipant(taken_emails, taken_phones)
+
+    try:
+        with write_transaction():
+            _reserve_seats(event, len(participants))
+
+            team = HackathonTeam.objects.create(
+                event=event,
+                team_name=team_name,
+                total_participants=total_participants,
+            )
+            for participant in participants:
+                participant.team = team
+            HackathonParticipant.objects.bulk_create(participants)
+            _change_counters(event.pk, participants, +1)
+    except IntegrityError:
+        # Lost a race with a concurrent registration using the same details,
+        # unless none of them is registered: then it's another constraint.
+        taken_emails, taken_phones = find_registered(event, participants)
+        if not (taken_emails or taken_phones):
+            raise
+        raise DuplicateParticipant(taken_emails, taken_phones)
+
+    return team
+
+
+def unregister_team(team):
+    """Delete a team; the post_delete handlers below give its seats back."""
+    team.delete()
+
+
+def participant_deleted(participant):
+    """Release a deleted participant's seat and counters (post_delete).
+
+    Runs for every deletion, including the participants cascaded from a
+    team and deletions made in the admin.
+    """
+    if participant.event_id is None:
+        return
+    HackathonEvent.objects.filter(pk=participant.event_id).update(
+        registered_participants=F("registered_participants") - 1
+    )
+    _change_counters(participant.event_id, [participant], -1)
+
+
+def team_deleted(team):
+    if team.event_id is not None:
+        HackathonEvent.objects.filter(pk=team.event_id).update(
+            registered_teams=F("registered_teams") - 1
+        )
+
+
+def rebuild_counters(event):
+    """Recompute an event's counters from the participant table."""
+    participants = HackathonParticipant.objects.filter(team__event=event)
+    with write_transaction():
+        HackathonEvent.objects.filter(pk=event.pk).update(
+            registered_teams=event.teams.count(),
+            registered_participants=participants.count(),
+        )
+        HackathonCounter.objects.filter(event=event).delete()
+        _change_counters(event.pk, participants.only(*COUNTED_FIELDS).iterator(), +1)
+
+
+def event_stats(event):
+    """Seats and participant breakdown for an event, read from counters."""
+    stats = {
+        "event": event.slug,
+        "name": event.name,
+        "capacity": event.capacity,
+        "registered_teams": event.registered_teams,
+        "registered_participants": event.registered_participants,
+        "remaining_seats": event.remaining_seats,
+    }
+    for field in COUNTED_FIELDS:
+        stats[f"by_{field}"] = {}
+    for dimension, value, count in event.counters.filter(count__gt=0).values_list(
+        "dimension", "value", "count"
+    ):
+        stats[f"by_{dimension}"][value] = count
+    return stats
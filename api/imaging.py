@@ -0,0 +1,122 @@
+"""
+Image metadata extraction for uploaded images.
+
+Only called from background jobs: the read path serves the stored
+values and never decodes an image.
+"""
+import math
+
+_BASE83 = (
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    "abcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+)
+
+# Longest edge of the copy used for colour and blurhash; both are
+# low-frequency summaries, so a tiny image gives the same answer.
+SAMPLE_SIZE = 32
+
+
+def read_image_metadata(field_file):
+    """Return the ImageMetadata field values for an image file."""
+    from PIL import Image
+
+    field_file.open("rb")
+    try:
+        with Image.open(field_file) as img:
+            width, height = img.size
+            image_format = img.format or ""
+            # Lets JPEG decode at a reduced scale instead of full size.
+            img.draft("RGB", (SAMPLE_SIZE * 2, SAMPLE_SIZE * 2))
+            sample = img.convert("RGB")
+            sample.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE))
+    finally:
+        field_file.close()
+
+    return {
+        "image_width": width,
+        "image_height": height,
+        "image_format": image_format.lower(),
+        "image_bytes": field_file.size,
+        "image_color": dominant_color(sample),
+        "image_blurhash": blurhash(sample),
+        "image_meta_name": field_file.name,
+    }
+
+
+def dominant_color(img):
+    """Most common colour of an RGB image as ``#rrggbb``."""
+    palette_img = img.quantize(colors=8)
+    palette = palette_img.getpalette()
+    _, index = max(palette_img.getcolors())
+    r, g, b = palette[index * 3:index * 3 + 3]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def _base83(value, length):
+    return "".join(
+        _BASE83[value // 83 ** (length - i - 1) % 83] for i in range(length)
+    )
+
+
+def _to_linear(value):
+    value = value / 255
+    if value <= 0.04045:
+        return value / 12.92
+    return ((value + 0.055) / 1.055) ** 2.4
+
+
+def _to_srgb(value):
+    value = max(0.0, min(1.0, value))
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash(img, x_components=4, y_components=3):
+    """Encode a small RGB image as a BlurHash string (https://blurha.sh)."""
+    width, height = img.size
+    pixels = [tuple(_to_linear(c) for c in pixel) for pixel in img.getdata()]
+
+    factors = []
+    for j in range(y_components):
+        for i in range(x_components):
+            norm = 1 if i == j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                basis_y = math.cos(math.pi * j * y / height)
+                row = y * width
+                for x in range(width):
+                    basis = norm * math.cos(math.pi * i * x / width) * basis_y
+                    pr, pg, pb = pixels[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = 1 / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        actual_max = max(abs(c) for factor in ac for c in factor)
+        quantised_max = max(0, min(82, int(actual_max * 166 - 0.5)))
+        max_value = (quantised_max + 1) / 166
+        result += _base83(quantised_max, 1)
+    else:
+        max_value = 1
+        result += _base83(0, 1)
+
+    result += _base83(
+        (_to_srgb(dc[0]) << 16) + (_to_srgb(dc[1]) << 8) + _to_srgb(dc[2]), 4
+    )
+
+    for factor in ac:
+        r, g, b = (
+            max(0, min(18, int(math.floor(
+                math.copysign(abs(c / max_value) ** 0.5, c) * 9 + 9.5
+            ))))
+            for c in factor
+        )
+        result += _base83(r * 19 * 19 + g * 19 + b, 2)
+
+    return result
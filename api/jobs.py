@@ -0,0 +1,235 @@
+"""
+Small database-backed job queue.
+
+Work that does not need to happen inside the request (notifications,
+file processing, ...) is registered with ``@task`` and queued with
+``enqueue()``. The ``runworker`` management command claims and runs
+queued jobs.
+
+Claiming uses ``SELECT ... FOR UPDATE SKIP LOCKED`` where the database
+supports it (Postgres) and falls back to a compare-and-swap UPDATE on
+SQLite, where the single writer lock makes the UPDATE atomic.
+"""
+import logging
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Avg, Count, F, Max
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+_current = threading.local()
+
+# Serialises claims between threads of one process on backends without
+# SKIP LOCKED, so threads don't keep racing each other for the same row.
+_claim_lock = threading.Lock()
+
+
+def task(name):
+    """Register ``func`` as the handler for jobs called ``name``."""
+    def decorator(func):
+        TASKS[name] = func
+        func.task_name = name
+        return func
+    return decorator
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(name, delay=None, max_attempts=None, **payload):
+    """Queue a job and return it.
+
+    With ``JOBS_RUN_INLINE`` enabled the job is run once the current
+    transaction commits instead of waiting for a worker.
+    """
+    if name not in TASKS:
+        raise KeyError(f"Unknown job: {name}")
+
+    job = Job.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts or _setting("JOBS_MAX_ATTEMPTS", 5),
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+
+    if _setting("JOBS_RUN_INLINE", False):
+        transaction.on_commit(lambda: run_inline(job.pk))
+
+    return job
+
+
+def run_inline(pk):
+    job = claim(pk, worker_id="inline")
+    if job is not None:
+        run_job(job)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{threading.get_native_id()}"
+
+
+def _ready_jobs():
+    return Job.objects.filter(
+        status="queued",
+        run_after__lte=timezone.now(),
+    ).order_by("run_after", "id")
+
+
+def claim(pk, worker_id):
+    """Mark one specific queued job as running. Returns None if taken."""
+    now = timezone.now()
+    claimed = Job.objects.filter(pk=pk, status="queued").update(
+        status="running",
+        locked_by=worker_id,
+        locked_at=now,
+        attempts=F("attempts") + 1,
+    )
+    if not claimed:
+        return None
+    return Job.objects.get(pk=pk)
+
+
+def claim_next(worker_id):
+    """Claim the oldest ready job, or return None if there is none."""
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = _ready_jobs().select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status = "running"
+            job.locked_by = worker_id
+            job.locked_at = timezone.now()
+            job.attempts += 1
+            job.save(update_fields=["status", "locked_by", "locked_at", "attempts"])
+            return job
+
+    with _claim_lock:
+        for pk in _ready_jobs().values_list("id", flat=True)[:10]:
+            job = claim(pk, worker_id)
+            if job is not None:
+                return job
+    return None
+
+
+def current_job():
+    """The job being run by this thread, if any."""
+    return getattr(_current, "job", None)
+
+
+def report_progress(**progress):
+    """Store progress (e.g. ``done=10, total=200``) on the running job.
+
+    Also the job's heartbeat: it refreshes ``locked_at``, so a long job
+    that keeps reporting isn't taken for one whose worker died.
+    """
+    job = current_job()
+    if job is None:
+        return
+    job.progress.update(progress)
+    job.locked_at = timezone.now()
+    Job.objects.filter(pk=job.pk, status="running").update(
+        progress=job.progress, locked_at=job.locked_at
+    )
+
+
+def run_job(job):
+    """Run a claimed job and record its outcome, timing and errors."""
+    started = time.monotonic()
+    _current.job = job
+    try:
+        func = TASKS[job.name]
+        func(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        _finish(job, started, failed=True)
+        logger.exception("Job %s failed (attempt %s/%s)", job, job.attempts, job.max_attempts)
+        return False
+    finally:
+        _current.job = None
+
+    _finish(job, started, failed=False)
+    return True
+
+
+def _finish(job, started, failed):
+    job.duration_ms = int((time.monotonic() - started) * 1000)
+    job.locked_by = ""
+    job.locked_at = None
+
+    if not failed:
+        job.status = "done"
+        job.finished_at = timezone.now()
+    elif job.attempts >= job.max_attempts:
+        # Dead-letter: keep the row and its traceback for inspection.
+        job.status = "dead"
+        job.finished_at = timezone.now()
+    else:
+        backoff = _setting("JOBS_RETRY_BACKOFF", 30) * 2 ** (job.attempts - 1)
+        job.status = "queued"
+        job.run_after = timezone.now() + timedelta(seconds=backoff)
+
+    job.save(update_fields=[
+        "status", "run_after", "locked_by", "locked_at",
+        "last_error", "finished_at", "duration_ms",
+    ])
+
+
+def requeue_stale():
+    """Put back jobs whose worker died while running them.
+
+    A job is stale when it hasn't reported progress for JOBS_TIMEOUT
+    seconds. One that has used up its attempts is dead-lettered instead,
+    so a job that keeps killing its worker isn't retried forever.
+    Returns the numbers of jobs requeued and dead-lettered.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status="running",
+        locked_at__lt=now - timedelta(seconds=_setting("JOBS_TIMEOUT", 600)),
+    )
+    dead = stale.filter(attempts__gte=F("max_attempts")).update(
+        status="dead",
+        locked_by="",
+        locked_at=None,
+        finished_at=now,
+        last_error="Worker stopped while running the job (timed out)",
+    )
+    requeued = stale.update(
+        status="queued",
+        locked_by="",
+        locked_at=None,
+    )
+    return requeued, dead
+
+
+def job_stats():
+    """Per job name: counts by status and run time of finished jobs."""
+    stats = {}
+    rows = Job.objects.values("name", "status").annotate(total=Count("id"))
+    for row in rows:
+        entry = stats.setdefault(row["name"], {"counts": {}})
+        entry["counts"][row["status"]] = row["total"]
+
+    timings = (
+        Job.objects.filter(status="done")
+        .values("name")
+        .annotate(avg_ms=Avg("duration_ms"), max_ms=Max("duration_ms"))
+    )
+    for row in timings:
+        entry = stats.setdefault(row["name"], {"counts": {}})
+        entry["avg_ms"] = round(row["avg_ms"] or 0, 1)
+        entry["max_ms"] = row["max_ms"]
+
+    return stats
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import events
+from api.bulk import CHUNK_SIZE
+from api.retention import aged_queryset, archive_queryset, cutoff_for
+
+
+class Command(BaseCommand):
+    help = (
+        "Move submissions older than RETENTION_POLICIES into the archive and "
+        "prune the live feed's events"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", action="append", help="e.g. api.ContactMessage (repeatable)")
+        parser.add_argument("--backend", choices=("table", "jsonl"))
+        parser.add_argument("--batch-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        labels = options["model"] or list(settings.RETENTION_POLICIES)
+        unknown = set(labels) - set(settings.RETENTION_POLICIES)
+        if unknown:
+            raise CommandError(f"No retention policy for: {', '.join(sorted(unknown))}")
+
+        for label in labels:
+            queryset = aged_queryset(label)
+            if options["dry_run"]:
+                self.stdout.write(
+                    f"{label}: {queryset.count()} row(s) older than {cutoff_for(label):%Y-%m-%d}"
+                )
+                continue
+
+            archived = archive_queryset(
+                queryset,
+                backend=options["backend"],
+                batch_size=options["batch_size"],
+            )
+            self.stdout.write(f"{label}: archived {archived} row(s)")
+
+        if not options["dry_run"]:
+            pruned = events.prune()
+            self.stdout.write(f"submission events: pruned {pruned} row(s)")
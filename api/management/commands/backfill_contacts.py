@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from api.bulk import iter_chunks
+from api.models import CareerApplication, ContactMessage, CpuInquiry, HackathonParticipant
+from api.normalization import normalize_email, normalize_phone
+
+MODELS = (CareerApplication, ContactMessage, CpuInquiry, HackathonParticipant)
+
+
+class Command(BaseCommand):
+    help = "Fill the normalised email/phone columns of rows saved before they existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every row, e.g. after changing the normalisation rules",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        for model in MODELS:
+            queryset = model.objects.all()
+            if not options["all"]:
+                queryset = queryset.filter(email_normalized="")
+
+            updated = 0
+            for rows in iter_chunks(queryset, "email", "phone", chunk_size=options["batch_size"]):
+                # bulk_update rather than save(): no signals, one UPDATE per batch.
+                model.objects.bulk_update(
+                    [
+                        model(
+                            pk=row["pk"],
+                            email_normalized=normalize_email(row["email"]),
+                            phone_normalized=normalize_phone(row["phone"]),
+                        )
+                        for row in rows
+                    ],
+                    ["email_normalized", "phone_normalized"],
+                )
+                updated += len(rows)
+            self.stdout.write(f"{model._meta.label}: {updated} row(s)")
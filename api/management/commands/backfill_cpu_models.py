@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from api.bulk import iter_chunks
+from api.catalog import normalize
+from api.models import Cpu, CpuInquiry
+
+
+def catalog_ids():
+    return {normalize(name): pk for pk, name in Cpu.objects.values_list("pk", "name")}
+
+
+class Command(BaseCommand):
+    help = "Link CPU inquiries saved as free text to the catalog entry of the same name"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--create",
+            action="store_true",
+            help="Add names missing from the catalog as inactive entries, to review in the admin",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        queryset = CpuInquiry.objects.filter(cpu__isnull=True)
+        ids = catalog_ids()
+
+        if options["create"]:
+            missing = {}
+            for name in queryset.values_list("cpu_model", flat=True).distinct().iterator():
+                key = normalize(name)
+                if key and key not in ids:
+                    missing.setdefault(key, name.strip())
+            Cpu.objects.bulk_create(
+                [Cpu(name=name, is_active=False) for name in missing.values()],
+                ignore_conflicts=True,
+            )
+            self.stdout.write(f"Added {len(missing)} inactive catalog entries")
+            ids = catalog_ids()
+
+        linked = 0
+        for rows in iter_chunks(queryset, "cpu_model", chunk_size=options["batch_size"]):
+            # bulk_update rather than save(): no signals, one UPDATE per batch.
+            matched = [
+                CpuInquiry(pk=row["pk"], cpu_id=ids[normalize(row["cpu_model"])])
+                for row in rows
+                if normalize(row["cpu_model"]) in ids
+            ]
+            CpuInquiry.objects.bulk_update(matched, ["cpu"])
+            linked += len(matched)
+        self.stdout.write(f"Linked {linked} inquiries")
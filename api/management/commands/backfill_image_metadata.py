@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from api.jobs import enqueue
+from api.models import CommunityItem, GalleryImage
+
+
+class Command(BaseCommand):
+    help = "Queue metadata extraction for images that have none (or stale) yet"
+
+    def handle(self, *args, **options):
+        for model in (GalleryImage, CommunityItem):
+            queued = 0
+            rows = model.objects.exclude(image="").only("pk", "image", "image_meta_name")
+            for obj in rows.iterator():
+                if obj.image_metadata_stale():
+                    enqueue("images.extract_metadata", model=model._meta.label, pk=obj.pk)
+                    queued += 1
+            self.stdout.write(f"{model._meta.label}: queued {queued}")
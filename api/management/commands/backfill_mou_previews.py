@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.jobs import enqueue
+from api.models import MOU
+
+
+class Command(BaseCommand):
+    help = "Queue preview rendering for MOU PDFs that have none (or a stale one) yet"
+
+    def handle(self, *args, **options):
+        queued = 0
+        rows = MOU.objects.exclude(pdf="").only("pk", "pdf", "pdf_meta_name")
+        for mou in rows.iterator():
+            if mou.pdf_preview_stale():
+                enqueue("mous.render_preview", pk=mou.pk)
+                queued += 1
+        self.stdout.write(f"Queued {queued} MOU preview(s)")
@@ -0,0 +1,120 @@
+import itertools
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarking import Request, multipart_body, run_load, wait_for
+
+READ_PATHS = ["/api/mous/", "/api/gallery/", "/api/projects/", "/api/giveback/"]
+
+
+def _csv(value, cast=str):
+    return [cast(item) for item in value.split(",") if item]
+
+
+def upload_requests():
+    body, content_type = multipart_body(
+        {
+            "full_name": "Bench Applicant",
+            "email": "bench@example.com",
+            "phone": "9999999999",
+            "college": "Bench College",
+            "cgpa": "9",
+            "year_of_passing": "2025",
+            "skills": "benchmarking",
+        },
+        {"resume": ("bench.pdf", b"%PDF-1.4\n" + b"0" * 200_000, "application/pdf")},
+    )
+    return [Request("POST", "/api/apply/", body, {"Content-Type": content_type})]
+
+
+class Command(BaseCommand):
+    help = (
+        "Sweep gunicorn worker class / workers / threads against the api/ "
+        "endpoints and report throughput and latency for each combination"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--worker-class", default="sync,gthread", help="Comma separated")
+        parser.add_argument("--workers", default="1,2,4", help="Comma separated")
+        parser.add_argument("--threads", default="1,4,8", help="Comma separated (gthread only)")
+        parser.add_argument("--clients", type=int, default=20, help="Concurrent connections")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per combination")
+        parser.add_argument("--port", type=int, default=8099)
+        parser.add_argument(
+            "--with-uploads",
+            action="store_true",
+            help="Mix in resume uploads (creates CareerApplication rows and files!)",
+        )
+        parser.add_argument(
+            "--max-p95",
+            type=float,
+            default=500.0,
+            help="Latency ceiling (ms) when picking the recommended combination",
+        )
+
+    def combinations(self, options):
+        for worker_class, workers in itertools.product(
+            _csv(options["worker_class"]), _csv(options["workers"], int)
+        ):
+            threads = _csv(options["threads"], int) if worker_class == "gthread" else [1]
+            for thread_count in threads:
+                yield worker_class, workers, thread_count
+
+    def handle(self, *args, **options):
+        requests = [Request("GET", path) for path in READ_PATHS]
+        if options["with_uploads"]:
+            requests += upload_requests()
+
+        base_url = f"http://127.0.0.1:{options['port']}"
+        results = []
+        for worker_class, workers, threads in self.combinations(options):
+            env = dict(
+                os.environ,
+                PORT=str(options["port"]),
+                WEB_CONCURRENCY=str(workers),
+                GUNICORN_THREADS=str(threads),
+                GUNICORN_WORKER_CLASS=worker_class,
+                GUNICORN_MAX_REQUESTS="0",
+            )
+            server = subprocess.Popen(
+                [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+                cwd=settings.BASE_DIR,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_for(base_url)
+                stats = run_load(base_url, requests, options["clients"], options["duration"])
+            except TimeoutError as exc:
+                raise CommandError(str(exc))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+            results.append(((worker_class, workers, threads), stats))
+            self.stdout.write(
+                f"{worker_class:8} workers={workers:<3} threads={threads:<3} "
+                f"{stats['rps']:>8} req/s  p50 {stats['p50_ms']} ms  "
+                f"p95 {stats['p95_ms']} ms  {stats['statuses']}"
+            )
+
+        acceptable = [
+            (combo, stats) for combo, stats in results
+            if stats["p95_ms"] is not None
+            and stats["p95_ms"] <= options["max_p95"]
+            and "error" not in stats["statuses"]
+        ]
+        if not acceptable:
+            self.stdout.write("No combination met the latency ceiling")
+            return
+
+        (worker_class, workers, threads), stats = max(acceptable, key=lambda item: item[1]["rps"])
+        self.stdout.write(self.style.SUCCESS(
+            f"\nBest: GUNICORN_WORKER_CLASS={worker_class} WEB_CONCURRENCY={workers} "
+            f"GUNICORN_THREADS={threads} ({stats['rps']} req/s, p95 {stats['p95_ms']} ms)"
+        ))
@@ -0,0 +1,59 @@
+import statistics
+import time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+PATHS = ["/api/projects/", "/api/gallery/", "/api/giveback/", "/api/bundle/"]
+
+
+def _start_response(status, headers, exc_info=None):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time anonymous public /api/ requests through the WSGI handler with "
+        "and without the lean middleware path (LEAN_PATH_PREFIXES)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", action="append", help=f"Repeatable; default {PATHS}")
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per run")
+        parser.add_argument("--rounds", type=int, default=5, help="Runs per mode; the median is kept")
+
+    def handle(self, *args, **options):
+        for path in options["path"] or PATHS:
+            full = self.measure(path, [], options)
+            lean = self.measure(path, ["/api/"], options)
+            saved = full - lean
+            self.stdout.write(
+                f"{path:24} full {full:8.1f} µs  lean {lean:8.1f} µs  "
+                f"saved {saved:7.1f} µs/request ({saved / full:.0%})"
+            )
+
+    def measure(self, path, prefixes, options):
+        """Median microseconds per request for ``path``."""
+        with override_settings(LEAN_PATH_PREFIXES=prefixes):
+            # A fresh handler builds its middleware chain from these settings.
+            handler = WSGIHandler()
+            environ = {"PATH_INFO": path, "HTTP_HOST": "localhost"}
+            setup_testing_defaults(environ)
+
+            def request():
+                response = handler({**environ, "wsgi.input": BytesIO()}, _start_response)
+                b"".join(response)
+                response.close()
+
+            for _ in range(50):
+                request()
+            rounds = []
+            for _ in range(options["rounds"]):
+                started = time.perf_counter()
+                for _ in range(options["requests"]):
+                    request()
+                rounds.append((time.perf_counter() - started) / options["requests"] * 1e6)
+        return statistics.median(rounds)
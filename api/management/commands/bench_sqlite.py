@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarking import Request, run_load, wait_for
+
+PROFILES = ("default", "tuned")
+
+
+def submission_requests():
+    headers = {"Content-Type": "application/json"}
+    contact = {
+        "name": "Bench Visitor",
+        "email": "bench@example.com",
+        "phone": "9999999999",
+        "subject": "Benchmark",
+        "message": "Concurrent write benchmark",
+    }
+    inquiry = {
+        "full_name": "Bench Buyer",
+        "email": "bench@example.com",
+        "phone": "9999999999",
+        "cpu_model": "Bench CPU",
+        "quantity": 2,
+        "ram": "16 GB",
+        "storage": "512 GB",
+    }
+    return [
+        Request("POST", "/api/contact/", json.dumps(contact).encode(), headers),
+        Request("POST", "/api/inquiry/", json.dumps(inquiry).encode(), headers),
+        Request("GET", "/api/projects/"),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare SQLite profiles (Django defaults vs SQLITE_PROFILE=tuned) "
+        "under parallel form submissions from several gunicorn workers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", default=",".join(PROFILES), help="Comma separated")
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--clients", type=int, default=16, help="Concurrent connections")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per profile")
+        parser.add_argument("--port", type=int, default=8098)
+
+    def handle(self, *args, **options):
+        profiles = [profile for profile in options["profiles"].split(",") if profile]
+        unknown = set(profiles) - set(PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown))}")
+
+        base_url = f"http://127.0.0.1:{options['port']}"
+        requests = submission_requests()
+        for profile in profiles:
+            with tempfile.TemporaryDirectory() as directory:
+                # A fresh database per profile; the real one is never touched.
+                env = dict(
+                    os.environ,
+                    SQLITE_PROFILE=profile,
+                    SQLITE_PATH=os.path.join(directory, "bench.sqlite3"),
+                    PORT=str(options["port"]),
+                    WEB_CONCURRENCY=str(options["workers"]),
+                    GUNICORN_THREADS="1",
+                    GUNICORN_WORKER_CLASS="sync",
+                    GUNICORN_MAX_REQUESTS="0",
+                    JOBS_RUN_INLINE="False",
+                )
+                env.pop("DATABASE_URL", None)
+                env.pop("RENDER", None)
+                subprocess.run(
+                    [sys.executable, "manage.py", "migrate", "--verbosity", "0"],
+                    cwd=settings.BASE_DIR,
+                    env=env,
+                    check=True,
+                )
+                server = subprocess.Popen(
+                    [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+                    cwd=settings.BASE_DIR,
+                    env=env,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+                try:
+                    wait_for(base_url, "/api/projects/")
+                    stats = run_load(base_url, requests, options["clients"], options["duration"])
+                except TimeoutError as exc:
+                    raise CommandError(str(exc))
+                finally:
+                    server.terminate()
+                    server.wait(timeout=30)
+
+            failed = sum(
+                count for outcome, count in stats["statuses"].items()
+                if outcome == "error" or outcome >= 500
+            )
+            self.stdout.write(
+                f"{profile:8} {stats['rps']:>8} req/s  p50 {stats['p50_ms']} ms  "
+                f"p95 {stats['p95_ms']} ms  p99 {stats['p99_ms']} ms  "
+                f"failed {failed}  {stats['statuses']}"
+            )
@@ -0,0 +1,57 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from api.models import HackathonParticipant
+
+
+class Command(BaseCommand):
+    help = (
+        "Report hackathon participants sharing an email or phone within an "
+        "event, in one streaming pass per field"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", help="Event slug; default all events")
+
+    def handle(self, *args, **options):
+        participants = HackathonParticipant.objects.all()
+        if options["event"]:
+            participants = participants.filter(team__event__slug=options["event"])
+
+        writer = csv.writer(self.stdout)
+        writer.writerow(["event_id", "field", "value", "participant_ids", "team_ids"])
+        groups = 0
+        for field in ("email_normalized", "phone_normalized"):
+            groups += self.report(writer, participants, field)
+        self.stderr.write(f"{groups} duplicate group(s)")
+
+    def report(self, writer, participants, field):
+        # Rows arrive sorted by (event, value), so duplicates are adjacent
+        # and only the current group is held in memory.
+        rows = participants.order_by("team__event_id", field, "id").values_list(
+            "team__event_id", field, "id", "team_id"
+        )
+        groups = 0
+        current_key, members = None, []
+        for event_id, value, pk, team_id in rows.iterator(chunk_size=2000):
+            key = (event_id, value)
+            if key != current_key:
+                groups += self.flush(writer, field, current_key, members)
+                current_key, members = key, []
+            if key[1]:
+                members.append((pk, team_id))
+        groups += self.flush(writer, field, current_key, members)
+        return groups
+
+    def flush(self, writer, field, key, members):
+        if len(members) < 2:
+            return 0
+        writer.writerow([
+            key[0],
+            field.replace("_normalized", ""),
+            key[1],
+            " ".join(str(pk) for pk, _ in members),
+            " ".join(sorted({str(team_id) for _, team_id in members})),
+        ])
+        return 1
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.uploads import collect_garbage
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete resumable uploads idle for more than UPLOAD_EXPIRE_HOURS and "
+        "part files that no longer belong to an upload"
+    )
+
+    def handle(self, *args, **options):
+        expired, orphans = collect_garbage()
+        self.stdout.write(f"Removed {expired} expired upload(s), {orphans} orphaned part file(s)")
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.notifier import delivery_stats
+
+
+class Command(BaseCommand):
+    help = "Notification deliveries per channel and backend, and messages waiting for a digest"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24, help="Look back this many hours")
+
+    def handle(self, *args, **options):
+        rows, pending = delivery_stats(timezone.now() - timedelta(hours=options["hours"]))
+        for row in rows:
+            self.stdout.write(
+                f"{row['channel']:10} {row['backend']:9} {row['status']:7} "
+                f"{row['deliveries']:>6} deliveries {row['items']:>6} items  "
+                f"avg {row['avg_ms']:.0f} ms  max {row['max_ms']} ms"
+            )
+        if not rows:
+            self.stdout.write("No deliveries")
+        for channel, count in sorted(pending.items()):
+            self.stdout.write(f"{channel}: {count} waiting for a digest")
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Manage monthly Postgres partitions of submission tables: convert "
+        "tables, pre-create future partitions and detach old ones"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            choices=sorted(partitioning.PARTITIONED_MODELS),
+            help="Limit to these models (repeatable); default all",
+        )
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Convert plain tables to partitioned ones (takes an exclusive lock)",
+        )
+        parser.add_argument("--ahead", type=int, default=3, help="Months of future partitions")
+        parser.add_argument(
+            "--detach-older-than",
+            type=int,
+            metavar="MONTHS",
+            help="Detach partitions older than this many months",
+        )
+        parser.add_argument("--status", action="store_true", help="List partitions and exit")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Table partitioning requires PostgreSQL")
+
+        for label in options["model"] or sorted(partitioning.PARTITIONED_MODELS):
+            table = partitioning.table_for(label)
+            partitioned = partitioning.is_partitioned(table)
+
+            if options["status"]:
+                self.stdout.write(f"{label} ({table}): {'partitioned' if partitioned else 'plain'}")
+                if partitioned:
+                    for name, rows in partitioning.list_partitions(table):
+                        self.stdout.write(f"  {name}: ~{max(rows, 0)} rows")
+                continue
+
+            if not partitioned:
+                if not options["convert"]:
+                    self.stdout.write(f"{label}: not partitioned, skipping (use --convert)")
+                    continue
+                partitioning.convert_table(label, options["ahead"])
+                self.stdout.write(f"{label}: converted to monthly partitions")
+
+            created = partitioning.ensure_partitions(label, options["ahead"])
+            self.stdout.write(f"{label}: partitions up to {created[-1]} present")
+
+            if options["detach_older_than"] is not None:
+                detached = partitioning.detach_older_than(label, options["detach_older_than"])
+                for name in detached:
+                    self.stdout.write(f"{label}: detached {name}")
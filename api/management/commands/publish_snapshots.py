@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api.snapshots import FEEDS, publish
+
+
+class Command(BaseCommand):
+    help = "Render the public feeds to static JSON snapshots and update the manifest"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--feed",
+            action="append",
+            choices=sorted(FEEDS),
+            help="Feed to publish (repeatable, default: all)",
+        )
+
+    def handle(self, *args, **options):
+        changed = publish(options["feed"])
+        if changed:
+            self.stdout.write(self.style.SUCCESS(f"Published {', '.join(changed)}"))
+        else:
+            self.stdout.write("Snapshots are up to date")
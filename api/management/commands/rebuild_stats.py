@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.rollups import ROLLUPS, rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the daily dashboard rollups from the submission tables and "
+        "archive; with --days, only the most recent days (cheap enough for cron)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--metric",
+            action="append",
+            choices=sorted(ROLLUPS),
+            help="Metric to rebuild (repeatable, default: all)",
+        )
+        parser.add_argument("--days", type=int, help="Only recount the last N days")
+
+    def handle(self, *args, **options):
+        if options["days"] is not None and options["days"] < 1:
+            raise CommandError("--days must be at least 1")
+        rows = rebuild(options["metric"], options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} rollup row(s)"))
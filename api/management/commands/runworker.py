@@ -0,0 +1,127 @@
+import json
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from api import jobs
+from api.notifier import close_backends
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds between checks for jobs left running by a worker that died.
+REQUEUE_INTERVAL = 60
+
+
+def work(stop, poll_interval, burst=False):
+    worker_id = jobs.worker_name()
+    next_requeue = 0.0
+    while not stop.is_set():
+        close_old_connections()
+        if time.monotonic() >= next_requeue:
+            requeued, dead = jobs.requeue_stale()
+            if requeued or dead:
+                logger.warning("Requeued %s and dead-lettered %s stale job(s)", requeued, dead)
+            next_requeue = time.monotonic() + REQUEUE_INTERVAL
+        job = jobs.claim_next(worker_id)
+        if job is None:
+            if burst:
+                break
+            stop.wait(poll_interval)
+            continue
+        jobs.run_job(job)
+    close_backends()
+    connections.close_all()
+
+
+def _process_main(poll_interval, burst):
+    # Children inherit the parent's settings and app registry via fork;
+    # they only need their own stop flag and database connections.
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    work(stop, poll_interval, burst)
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument("--mode", choices=("thread", "process"), default="thread")
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling forever",
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Print job counts and timings per job name, then exit",
+        )
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            self.stdout.write(json.dumps(jobs.job_stats(), indent=2))
+            return
+
+        concurrency = max(1, options["concurrency"])
+        poll_interval = options["poll_interval"]
+        burst = options["burst"]
+        self.stdout.write(
+            f"Starting {concurrency} {options['mode']} worker(s)"
+        )
+
+        if options["mode"] == "process":
+            self._run_processes(concurrency, poll_interval, burst)
+        else:
+            self._run_threads(concurrency, poll_interval, burst)
+
+    def _run_threads(self, concurrency, poll_interval, burst):
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+
+        threads = [
+            threading.Thread(target=work, args=(stop, poll_interval, burst), daemon=True)
+            for _ in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            stop.set()
+        for thread in threads:
+            thread.join()
+
+    def _run_processes(self, concurrency, poll_interval, burst):
+        # Never share a database socket with forked children.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+
+        processes = [
+            context.Process(target=_process_main, args=(poll_interval, burst))
+            for _ in range(concurrency)
+        ]
+        for process in processes:
+            process.start()
+
+        def shutdown(*args):
+            for process in processes:
+                process.terminate()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            shutdown()
+            for process in processes:
+                process.join()
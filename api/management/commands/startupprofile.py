@@ -0,0 +1,112 @@
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: import the WSGI app the way gunicorn does,
+# serve one request, and report timings and peak RSS.
+PROBE = r"""
+import json, os, resource, sys, time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+from backend.wsgi import application
+imported = time.perf_counter()
+
+environ = {"PATH_INFO": sys.argv[1], "HTTP_HOST": "localhost", "wsgi.input": BytesIO()}
+setup_testing_defaults(environ)
+status = []
+body = b"".join(application(environ, lambda s, h, e=None: status.append(s)))
+responded = time.perf_counter()
+
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform != "darwin":
+    rss *= 1024
+print(json.dumps({
+    "status": status[0],
+    "import_ms": round((imported - started) * 1000, 1),
+    "first_response_ms": round((responded - started) * 1000, 1),
+    "rss_mb": round(rss / 1024 / 1024, 1),
+}))
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile process startup: import time per module, time to first "
+        "response and peak RSS, checked against STARTUP_BUDGET"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/", help="URL to request after startup")
+        parser.add_argument("--top", type=int, default=20, help="Modules to list")
+        parser.add_argument(
+            "--by-package",
+            action="store_true",
+            help="Group self time by top-level package instead of listing modules",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit with an error when over STARTUP_BUDGET",
+        )
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE, options["path"]],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        )
+        if result.returncode != 0:
+            raise CommandError(result.stderr[-2000:])
+
+        modules = []
+        for line in result.stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules.append((name, int(self_us), int(cumulative_us), len(indent)))
+
+        if options["by_package"]:
+            packages = defaultdict(int)
+            for name, self_us, _, _ in modules:
+                packages[name.split(".")[0]] += self_us
+            self.stdout.write("Self import time by package (ms):")
+            for name, total in sorted(packages.items(), key=lambda item: -item[1])[:options["top"]]:
+                self.stdout.write(f"  {total / 1000:8.1f}  {name}")
+        else:
+            # Cumulative time of modules imported directly by the probe or
+            # by project code shows where startup goes.
+            self.stdout.write("Cumulative import time (ms):")
+            top = sorted(modules, key=lambda module: -module[2])[:options["top"]]
+            for name, _, cumulative_us, depth in top:
+                self.stdout.write(f"  {cumulative_us / 1000:8.1f}  {name} (depth {depth // 2})")
+
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        self.stdout.write(
+            f"\nImport {stats['import_ms']} ms, first response ({stats['status']}) "
+            f"{stats['first_response_ms']} ms, peak RSS {stats['rss_mb']} MB"
+        )
+
+        budget = settings.STARTUP_BUDGET
+        over = [
+            f"{key} {stats[key]} > {limit}"
+            for key, limit in budget.items()
+            if stats[key] > limit
+        ]
+        if over:
+            message = "Over startup budget: " + ", ".join(over)
+            if options["check"]:
+                raise CommandError(message)
+            self.stderr.write(message)
+        else:
+            self.stdout.write(self.style.SUCCESS("Within startup budget"))
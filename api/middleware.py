@@ -0,0 +1,168 @@
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.http import JsonResponse
+from django.utils.module_loading import import_string
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .admission import load_classes, queue_age, write_metrics
+from .snapshots import catch_up
+
+
+class SnapshotWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise that also serves the published feed snapshots.
+
+    Snapshots are written while the server runs, so unlike collected
+    static files they are looked up on disk per request instead of being
+    indexed at startup, and a request for them first catches this
+    instance up with changes published elsewhere. Versioned files are
+    cached forever; the manifest only briefly, since clients poll it for
+    new versions.
+    """
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        self.snapshot_prefix = settings.SNAPSHOT_URL
+        self.snapshot_root = os.path.abspath(settings.SNAPSHOT_ROOT) + os.path.sep
+
+    def __call__(self, request):
+        url = request.path_info
+        if url.startswith(self.snapshot_prefix) and self.url_is_canonical(url):
+            catch_up()
+            path = os.path.join(self.snapshot_root, url[len(self.snapshot_prefix):])
+            if self.path_is_child_of(path, self.snapshot_root) and os.path.isfile(path):
+                return self.serve(self.get_static_file(path, url), request)
+        return super().__call__(request)
+
+    def add_cache_headers(self, headers, path, url):
+        if url == self.snapshot_prefix + "manifest.json":
+            headers["Cache-Control"] = f"max-age={settings.SNAPSHOT_MANIFEST_MAX_AGE}, public"
+        else:
+            super().add_cache_headers(headers, path, url)
+
+    def immutable_file_test(self, path, url):
+        if url.startswith(self.snapshot_prefix):
+            return True
+        return super().immutable_file_test(path, url)
+
+
+class ProfilingMiddleware:
+    """Profiles requests from staff users that ask for it (see api/profiling.py).
+
+    Must come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (
+            "HTTP_X_PROFILE" not in request.META
+            and "_profile=" not in request.META.get("QUERY_STRING", "")
+        ):
+            return self.get_response(request)
+
+        # Imported here: the profiler and its models stay out of startup.
+        from .profiling import annotate, inline_response, profile, requested
+
+        mode = requested(request)
+        if mode is None:
+            return self.get_response(request)
+        response, result = profile(request, self.get_response)
+        if mode == "inline":
+            return inline_response(result)
+        return annotate(response, result)
+
+
+class AdmissionControlMiddleware:
+    """Answers 503 + Retry-After early when a route class is over its limits.
+
+    See api/admission.py. Placed before sessions and auth, so rejected
+    requests cost next to nothing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.ADMISSION_CONTROL:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.classes = load_classes()
+
+    def __call__(self, request):
+        route = next((route for route in self.classes if route.matches(request)), None)
+        if route is None:
+            return self.get_response(request)
+
+        age = queue_age(request) if route.max_queue_age is not None else None
+        if age is not None and age > route.max_queue_age:
+            route.reject_stale()
+            response = self.reject(route)
+        elif not route.acquire():
+            response = self.reject(route)
+        else:
+            try:
+                response = self.get_response(request)
+            finally:
+                route.release()
+        write_metrics(self.classes)
+        return response
+
+    def reject(self, route):
+        response = JsonResponse(
+            {"message": "The server is busy, please try again shortly"}, status=503
+        )
+        response["Retry-After"] = str(route.retry_after)
+        return response
+
+
+async def _anonymous_user():
+    return AnonymousUser()
+
+
+class SessionStackMiddleware:
+    """The SESSION_STACK_MIDDLEWARE (sessions, CSRF, auth, messages), where needed.
+
+    An anonymous request to LEAN_PATH_PREFIXES, one with no session
+    cookie and no Authorization header, would load no session and end up
+    as AnonymousUser anyway, so it skips the stack and gets
+    AnonymousUser directly. The admin, and staff calling the API with
+    their session, run the full stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(settings.LEAN_PATH_PREFIXES)
+        self.view_hooks = []
+        handler = get_response
+        for path in reversed(settings.SESSION_STACK_MIDDLEWARE):
+            middleware = import_string(path)(handler)
+            if hasattr(middleware, "process_view"):
+                self.view_hooks.insert(0, middleware.process_view)
+            handler = convert_exception_to_response(middleware)
+        self.full_stack = handler
+
+    def is_lean(self, request):
+        return (
+            request.path_info.startswith(self.prefixes)
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and "HTTP_AUTHORIZATION" not in request.META
+        )
+
+    def __call__(self, request):
+        if not self.is_lean(request):
+            return self.full_stack(request)
+        request.user = AnonymousUser()
+        request.auser = _anonymous_user
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # The handler only calls hooks of middleware listed in MIDDLEWARE.
+        if self.is_lean(request):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_team_alter_careerapplication_phone_participant'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HackathonTeam',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team_name', models.CharField(max_length=150)),
+                ('total_participants', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HackathonParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('LEADER', 'Leader'), ('MEMBER', 'Member')], max_length=10)),
+                ('full_name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(max_length=15)),
+                ('branch', models.CharField(max_length=50)),
+                ('section', models.CharField(max_length=10)),
+                ('year', models.CharField(max_length=10)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participants', to='api.hackathonteam')),
+            ],
+        ),
+        migrations.DeleteModel(
+            name='Participant',
+        ),
+        migrations.DeleteModel(
+            name='Team',
+        ),
+    ]
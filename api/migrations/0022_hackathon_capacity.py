@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:47
+
+import django.db.models.deletion
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def attach_existing_teams(apps, schema_editor):
+    HackathonEvent = apps.get_model("api", "HackathonEvent")
+    HackathonTeam = apps.get_model("api", "HackathonTeam")
+    HackathonParticipant = apps.get_model("api", "HackathonParticipant")
+    HackathonCounter = apps.get_model("api", "HackathonCounter")
+
+    if not HackathonTeam.objects.exists():
+        return
+
+    event, _ = HackathonEvent.objects.get_or_create(slug="default", defaults={"name": "Hackathon"})
+    HackathonTeam.objects.filter(event__isnull=True).update(event=event)
+
+    participants = HackathonParticipant.objects.filter(team__event=event)
+    event.registered_teams = HackathonTeam.objects.filter(event=event).count()
+    event.registered_participants = participants.count()
+    event.save()
+
+    counts = Counter()
+    for branch, year in participants.values_list("branch", "year").iterator():
+        counts["branch", branch] += 1
+        counts["year", year] += 1
+    HackathonCounter.objects.bulk_create([
+        HackathonCounter(event=event, dimension=dimension, value=value, count=count)
+        for (dimension, value), count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_archivedsubmission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HackathonEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+                ('slug', models.SlugField(unique=True)),
+                ('capacity', models.PositiveIntegerField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('registered_teams', models.PositiveIntegerField(default=0, editable=False)),
+                ('registered_participants', models.PositiveIntegerField(default=0, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='hackathonteam',
+            name='event',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='teams', to='api.hackathonevent'),
+        ),
+        migrations.CreateModel(
+            name='HackathonCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('branch', 'Branch'), ('year', 'Year')], max_length=10)),
+                ('value', models.CharField(max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counters', to='api.hackathonevent')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('event', 'dimension', 'value'), name='unique_hackathon_counter')],
+            },
+        ),
+        migrations.RunPython(attach_existing_teams, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:49
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Copies of api.normalization as of this migration, so later changes to
+# the rules don't change what it did.
+def normalize_email(email):
+    return (email or "").strip().lower()
+
+
+def normalize_phone(phone):
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-10:] if len(digits) > 10 else digits
+
+
+def populate_participants(apps, schema_editor):
+    HackathonParticipant = apps.get_model("api", "HackathonParticipant")
+
+    seen_emails = set()
+    seen_phones = set()
+    participants = HackathonParticipant.objects.select_related("team").order_by("id")
+    for participant in participants.iterator():
+        participant.email_normalized = normalize_email(participant.email)
+        participant.phone_normalized = normalize_phone(participant.phone)
+        event_id = participant.team.event_id
+
+        email_key = (event_id, participant.email_normalized)
+        phone_key = (event_id, participant.phone_normalized)
+        # Later registrations that repeat an earlier email/phone are left
+        # out of the per-event constraints (event stays NULL) instead of
+        # failing the migration; find_duplicate_participants reports them.
+        if email_key in seen_emails or (participant.phone_normalized and phone_key in seen_phones):
+            participant.event_id = None
+        else:
+            participant.event_id = event_id
+            seen_emails.add(email_key)
+            seen_phones.add(phone_key)
+
+        participant.save(update_fields=["email_normalized", "phone_normalized", "event"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_hackathon_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hackathonparticipant',
+            name='email_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='hackathonparticipant',
+            name='event',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='participants', to='api.hackathonevent'),
+        ),
+        migrations.AddField(
+            model_name='hackathonparticipant',
+            name='phone_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=15),
+        ),
+        migrations.RunPython(populate_participants, migrations.RunPython.noop),
+    ]
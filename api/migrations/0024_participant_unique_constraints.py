@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Separate from 0023 so the data update there is committed before the
+    # indexes are built (Postgres refuses to build them with pending
+    # deferred FK checks in the same transaction).
+
+    dependencies = [
+        ('api', '0023_participant_uniqueness'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='hackathonparticipant',
+            constraint=models.UniqueConstraint(condition=models.Q(('event__isnull', False)), fields=('event', 'email_normalized'), name='unique_participant_email_per_event'),
+        ),
+        migrations.AddConstraint(
+            model_name='hackathonparticipant',
+            constraint=models.UniqueConstraint(condition=models.Q(('event__isnull', False), models.Q(('phone_normalized', ''), _negated=True)), fields=('event', 'phone_normalized'), name='unique_participant_phone_per_event'),
+        ),
+    ]
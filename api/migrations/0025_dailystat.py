@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_participant_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=30)),
+                ('day', models.DateField()),
+                ('key', models.CharField(blank=True, max_length=100)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('quantity', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['metric', 'day', 'key'],
+                'indexes': [models.Index(fields=['day'], name='api_dailyst_day_01df5f_idx')],
+                'constraints': [models.UniqueConstraint(fields=('metric', 'day', 'key'), name='unique_daily_stat')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='careerapplication',
+            name='email_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='careerapplication',
+            name='phone_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=15),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='email_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='phone_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=15),
+        ),
+        migrations.AddField(
+            model_name='cpuinquiry',
+            name='email_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='cpuinquiry',
+            name='phone_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=15),
+        ),
+        migrations.AlterField(
+            model_name='hackathonparticipant',
+            name='email_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='hackathonparticipant',
+            name='phone_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=15),
+        ),
+    ]
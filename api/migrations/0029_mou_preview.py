@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mou',
+            name='pdf_bytes',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='mou',
+            name='pdf_meta_name',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='mou',
+            name='pdf_pages',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='mou',
+            name='pdf_sha256',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='mou',
+            name='pdf_thumbnail',
+            field=models.FileField(blank=True, editable=False, upload_to='mou-previews/'),
+        ),
+    ]
@@ -1,6 +1,37 @@
+import uuid
+
 from django.db import models
+from django.utils import timezone
+
+from .normalization import normalize_email, normalize_phone
+
+
+class NormalizedContact(models.Model):
+    """Canonical copies of ``email`` and ``phone``, filled in on save.
+
+    Indexed so one person's submissions can be found without scanning
+    (see ``manage.py backfill_contacts`` for rows saved before this).
+    """
+
+    email_normalized = models.CharField(max_length=254, blank=True, editable=False, db_index=True)
+    phone_normalized = models.CharField(max_length=15, blank=True, editable=False, db_index=True)
+
+    class Meta:
+        abstract = True
+
+    def normalize_contact(self):
+        self.email_normalized = normalize_email(self.email)
+        self.phone_normalized = normalize_phone(self.phone)
 
-class CareerApplication(models.Model):
+    def save(self, *args, **kwargs):
+        self.normalize_contact()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"email", "phone"} & set(update_fields):
+            kwargs["update_fields"] = set(update_fields) | {"email_normalized", "phone_normalized"}
+        super().save(*args, **kwargs)
+
+
+class CareerApplication(NormalizedContact):
     full_name = models.CharField(max_length=100)
     email = models.EmailField()
     phone = models.CharField(max_length=10)
@@ -10,19 +41,19 @@ class CareerApplication(models.Model):
     experience = models.CharField(max_length=50, blank=True)
     skills = models.TextField()
     resume = models.FileField(upload_to='resume/')
-    applied_at = models.DateTimeField(auto_now_add=True)
+    applied_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return self.full_name
 
 
-class ContactMessage(models.Model):
+class ContactMessage(NormalizedContact):
     name = models.CharField(max_length=100)
     email = models.EmailField()
     phone = models.CharField(max_length=15)
     subject = models.CharField(max_length=200, blank=True)
     message = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return f"{self.name} - {self.email}"
@@ -51,10 +82,40 @@ class MOU(models.Model):
 
     is_active = models.BooleanField(default=True)
 
+    # Preview of ``pdf``, filled in by a background job (api/pdfpreview.py).
+    pdf_thumbnail = models.FileField(upload_to="mou-previews/", blank=True, editable=False)
+    pdf_pages = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    pdf_bytes = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    pdf_sha256 = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
+    # Name of the file the values above describe.
+    pdf_meta_name = models.CharField(max_length=255, blank=True, editable=False)
+
     def __str__(self):
         return self.title
+
+    def pdf_preview_stale(self):
+        return bool(self.pdf) and self.pdf.name != self.pdf_meta_name
     
 
+class ImageMetadata(models.Model):
+    """Facts about ``image`` filled in by a background job after upload."""
+
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_format = models.CharField(max_length=10, blank=True, editable=False)
+    image_bytes = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_color = models.CharField(max_length=7, blank=True, editable=False)
+    image_blurhash = models.CharField(max_length=64, blank=True, editable=False)
+    # Name of the file the values above describe.
+    image_meta_name = models.CharField(max_length=255, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def image_metadata_stale(self):
+        return bool(self.image) and self.image.name != self.image_meta_name
+
+
 #gallery
 
 def gallery_upload_path(instance, filename):
@@ -65,7 +126,7 @@ def gallery_upload_path(instance, filename):
     # media/gallery/Events/filename.jpg
     return f"gallery/{instance.category}/{filename}"
 
-class GalleryImage(models.Model):
+class GalleryImage(ImageMetadata):
 
     CATEGORY_CHOICES = [
         ('Events', 'Events'),
@@ -110,7 +171,7 @@ class Project(models.Model):
     def __str__(self):
         return self.title
 
-class CommunityItem(models.Model):
+class CommunityItem(ImageMetadata):
 
     SECTION_CHOICES = (
         ('giveback', 'Give Back'),
@@ -156,31 +217,115 @@ class CommunityItem(models.Model):
     
 
 
-class CpuInquiry(models.Model):
+class Cpu(models.Model):
+    """A CPU model offered for inquiries, with its RAM and storage options.
+
+    Served from a per-process index (api/catalog.py) by
+    /api/cpus/autocomplete/.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    ram_options = models.JSONField(default=list, blank=True)  # e.g. ["8 GB", "16 GB"]
+    storage_options = models.JSONField(default=list, blank=True)
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class CpuInquiry(NormalizedContact):
     full_name = models.CharField(max_length=100)
     email = models.EmailField()
     phone = models.CharField(max_length=10)
+    # The catalog entry, when the model asked about is in it; cpu_model
+    # keeps the name as submitted.
+    cpu = models.ForeignKey(
+        Cpu, null=True, blank=True, on_delete=models.SET_NULL, related_name="inquiries"
+    )
     cpu_model = models.CharField(max_length=100)
     quantity = models.IntegerField()
     ram = models.CharField(max_length=50)
     storage = models.CharField(max_length=50)
     message = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return self.full_name
 
 
+class HackathonEvent(models.Model):
+    name = models.CharField(max_length=150)
+    slug = models.SlugField(unique=True)
+    # Maximum number of participants; empty means unlimited.
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    # Maintained by api/hackathon.py inside the registration transaction.
+    registered_teams = models.PositiveIntegerField(default=0, editable=False)
+    registered_participants = models.PositiveIntegerField(default=0, editable=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def remaining_seats(self):
+        if self.capacity is None:
+            return None
+        return max(0, self.capacity - self.registered_participants)
+
+
+class HackathonCounter(models.Model):
+    """Participants per event and branch or year, kept in step with registrations."""
+
+    DIMENSION_CHOICES = (
+        ("branch", "Branch"),
+        ("year", "Year"),
+    )
+
+    event = models.ForeignKey(
+        HackathonEvent,
+        on_delete=models.CASCADE,
+        related_name="counters"
+    )
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    value = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "dimension", "value"],
+                name="unique_hackathon_counter",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event} {self.dimension}={self.value}: {self.count}"
+
+
 class HackathonTeam(models.Model):
+    event = models.ForeignKey(
+        HackathonEvent,
+        on_delete=models.PROTECT,
+        related_name="teams",
+        null=True,
+        blank=True,
+    )
     team_name = models.CharField(max_length=150)
     total_participants = models.PositiveIntegerField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
-    def _str_(self):
+    def __str__(self):
         return self.team_name
 
 
-class HackathonParticipant(models.Model):
+class HackathonParticipant(NormalizedContact):
     ROLE_CHOICES = (
         ("LEADER", "Leader"),
         ("MEMBER", "Member"),
@@ -191,6 +336,15 @@ class HackathonParticipant(models.Model):
         on_delete=models.CASCADE,
         related_name="participants"
     )
+    # Copy of team.event so uniqueness per event can be a plain index.
+    event = models.ForeignKey(
+        HackathonEvent,
+        on_delete=models.PROTECT,
+        related_name="participants",
+        null=True,
+        blank=True,
+        editable=False,
+    )
     role = models.CharField(max_length=10, choices=ROLE_CHOICES)
     full_name = models.CharField(max_length=100)
     email = models.EmailField()
@@ -199,5 +353,239 @@ class HackathonParticipant(models.Model):
     section = models.CharField(max_length=10)
     year = models.CharField(max_length=10)
 
-    def _str_(self):
-        return f"{self.full_name} ({self.role})"
\ No newline at end of file
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "email_normalized"],
+                condition=models.Q(event__isnull=False),
+                name="unique_participant_email_per_event",
+            ),
+            models.UniqueConstraint(
+                fields=["event", "phone_normalized"],
+                condition=models.Q(event__isnull=False) & ~models.Q(phone_normalized=""),
+                name="unique_participant_phone_per_event",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.full_name} ({self.role})"
+
+    def save(self, *args, **kwargs):
+        self.event_id = self.team.event_id
+        super().save(*args, **kwargs)
+
+
+class Job(models.Model):
+    STATUS_CHOICES = (
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("dead", "Dead"),
+    )
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    progress = models.JSONField(default=dict, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class ArchivedSubmission(models.Model):
+    """A submission row moved out of its hot table by the retention policy."""
+
+    model = models.CharField(max_length=100)
+    original_id = models.BigIntegerField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    # zlib-compressed JSON of the row's field values
+    data = models.BinaryField()
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model", "original_id"],
+                name="unique_archived_submission",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["model", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.original_id}"
+
+
+class DailyStat(models.Model):
+    """Submissions received per day for a dashboard metric (see api/rollups.py)."""
+
+    metric = models.CharField(max_length=30)
+    day = models.DateField()
+    # Breakdown within the metric, e.g. the CPU model; "" for the total.
+    key = models.CharField(max_length=100, blank=True)
+    count = models.PositiveIntegerField(default=0)
+    quantity = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["metric", "day", "key"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["metric", "day", "key"],
+                name="unique_daily_stat",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day"]),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.day} {self.key}: {self.count}"
+
+
+class PendingNotification(models.Model):
+    """A rendered notification held back for the channel's next digest."""
+
+    channel = models.CharField(max_length=30)
+    subject = models.CharField(max_length=200)
+    text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["channel", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.channel}: {self.subject}"
+
+
+class NotificationDelivery(models.Model):
+    """One attempt to deliver a message (or digest) to a destination."""
+
+    STATUS_CHOICES = (
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    )
+
+    channel = models.CharField(max_length=30)
+    backend = models.CharField(max_length=20)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    # Submissions covered: 1, or the size of a digest.
+    items = models.PositiveIntegerField(default=1)
+    duration_ms = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["channel", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} via {self.backend}: {self.status}"
+
+
+class UploadSession(models.Model):
+    """A resumable upload in progress (see api/uploads.py)."""
+
+    # Random, so knowing an upload's URL is what grants access to it.
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    length = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.length})"
+
+    @property
+    def is_complete(self):
+        return self.offset >= self.length
+
+
+class RequestProfile(models.Model):
+    """A profiled request, made by a staff user on demand (see api/profiling.py)."""
+
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    query_string = models.TextField(blank=True)
+    user = models.CharField(max_length=150)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    sql_count = models.PositiveIntegerField(default=0)
+    sql_ms = models.FloatField(default=0)
+    # pstats output, sorted by cumulative time
+    call_tree = models.TextField()
+    # [{"sql": ..., "ms": ...}] in execution order
+    queries = models.JSONField(default=list)
+    # [{"serializer": ..., "calls": ..., "ms": ...}], inclusive of nested ones
+    serializers = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+class SubmissionEvent(models.Model):
+    """A committed submission, in commit order, for the live feed (api/events.py)."""
+
+    KIND_CHOICES = (
+        ("career", "Career application"),
+        ("contact", "Contact message"),
+        ("cpu", "CPU inquiry"),
+        ("hackathon", "Hackathon team"),
+    )
+
+    # The id is the stream cursor clients resume from (Last-Event-ID).
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} {self.object_id}"
+
+
+class FeedVersion(models.Model):
+    """Bumped with every change to a public feed (see api/snapshots.py).
+
+    Shared by every process, so web instances can tell that their local
+    snapshots are stale and the bundle can tag responses without
+    rendering them.
+    """
+
+    feed = models.CharField(max_length=30, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.feed} v{self.version}"
@@ -0,0 +1,21 @@
+"""
+Canonical forms of contact details, used for duplicate checks and
+cross-submission lookups.
+"""
+import re
+
+NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_email(email):
+    return (email or "").strip().lower()
+
+
+def normalize_phone(phone):
+    """Digits only, without a leading country code or trunk zero.
+
+    Numbers are Indian mobiles, stored as 10 digits; "+91 98765 43210",
+    "09876543210" and "9876543210" all normalise to "9876543210".
+    """
+    digits = NON_DIGITS.sub("", phone or "")
+    return digits[-10:] if len(digits) > 10 else digits
@@ -0,0 +1,340 @@
+"""
+Notifications about new submissions.
+
+Each channel ("career", "contact", "cpu", "hackathon") delivers to the
+destinations listed in settings.NOTIFICATION_CHANNELS, each through a
+backend: Telegram, SMTP email, a JSON webhook, or the memory and file
+backends for tests and local development. Backend instances are kept per
+thread, so their HTTP session or SMTP connection stays open between
+messages instead of being set up for every notification.
+
+Once a channel has sent NOTIFY_DIGEST_THRESHOLD messages within
+NOTIFY_DIGEST_WINDOW seconds, further messages are held back and sent
+as one digest when the window ends. Every delivery attempt is recorded
+in NotificationDelivery.
+"""
+import json
+import smtplib
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Sum
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .jobs import current_job, enqueue, report_progress
+from .models import Job, NotificationDelivery, PendingNotification
+from .transactions import write_transaction
+
+# Pending messages sent per digest; more are left for the next one.
+DIGEST_SIZE = 50
+
+
+class NotificationError(Exception):
+    pass
+
+
+class Message:
+    def __init__(self, subject, text, items=1):
+        self.subject = subject
+        self.text = text
+        self.items = items
+
+    @classmethod
+    def from_text(cls, text, items=1):
+        """A message whose first line doubles as its subject."""
+        return cls(text.split("\n", 1)[0][:200], text, items)
+
+
+def split_text(text, limit):
+    """Split ``text`` into chunks of at most ``limit`` characters, at line breaks where possible."""
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+class Backend:
+    """Delivers messages to one destination configured by ``options``."""
+
+    def __init__(self, **options):
+        self.options = options
+
+    def send(self, message):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class HTTPBackend(Backend):
+    timeout = 10
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        # Imported here: requests is only needed by workers, not web startup.
+        import requests
+
+        # One session per backend instance keeps the TCP/TLS connection
+        # to the API open between messages.
+        self.session = requests.Session()
+
+    def post(self, url, **kwargs):
+        try:
+            response = self.session.post(url, timeout=self.timeout, **kwargs)
+        except OSError as exc:  # requests' exceptions are OSErrors
+            raise NotificationError(str(exc)) from exc
+        if response.status_code >= 400:
+            raise NotificationError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+class TelegramBackend(HTTPBackend):
+    max_length = 4096
+
+    def send(self, message):
+        url = f"https://api.telegram.org/bot{self.options['token']}/sendMessage"
+        for chunk in split_text(message.text, self.max_length):
+            self.post(url, data={"chat_id": self.options["chat_id"], "text": chunk})
+
+
+class WebhookBackend(HTTPBackend):
+
+    def send(self, message):
+        self.post(
+            self.options["url"],
+            json={
+                "subject": message.subject,
+                "text": message.text,
+                "items": message.items,
+            },
+            headers=self.options.get("headers"),
+        )
+
+
+class EmailBackend(Backend):
+    """Sends through Django's email backend (EMAIL_* settings)."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        from django.core.mail import get_connection
+
+        self.connection = get_connection(fail_silently=False)
+
+    def send(self, message):
+        from django.core.mail import EmailMessage
+
+        email = EmailMessage(
+            message.subject,
+            message.text,
+            self.options.get("from_email"),
+            self.options["to"],
+            connection=self.connection,
+        )
+        try:
+            # Opening explicitly keeps the connection open after sending.
+            self.connection.open()
+            try:
+                email.send()
+            except smtplib.SMTPServerDisconnected:
+                # The server dropped the idle connection; reconnect once.
+                self.connection.close()
+                self.connection.open()
+                email.send()
+        except (smtplib.SMTPException, OSError) as exc:
+            self.connection.close()
+            raise NotificationError(str(exc)) from exc
+
+    def close(self):
+        self.connection.close()
+
+
+class MemoryBackend(Backend):
+    """Keeps messages in ``MemoryBackend.outbox``, for tests."""
+
+    outbox = []
+
+    def send(self, message):
+        self.outbox.append((self.options, message))
+
+
+class FileBackend(Backend):
+    """Appends messages as JSON lines to ``path``, for local development."""
+
+    _lock = threading.Lock()
+
+    def send(self, message):
+        line = json.dumps({
+            "sent_at": timezone.now().isoformat(),
+            "subject": message.subject,
+            "text": message.text,
+            "items": message.items,
+        })
+        with self._lock, open(self.options["path"], "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+
+BACKENDS = {
+    "telegram": TelegramBackend,
+    "email": EmailBackend,
+    "webhook": WebhookBackend,
+    "memory": MemoryBackend,
+    "file": FileBackend,
+}
+
+_local = threading.local()
+
+
+def get_backend(destination):
+    """The backend instance for a destination, reused within this thread."""
+    backends = _local.__dict__.setdefault("backends", {})
+    key = json.dumps(destination, sort_keys=True)
+    if key not in backends:
+        options = dict(destination)
+        backends[key] = BACKENDS[options.pop("backend")](**options)
+    return backends[key]
+
+
+def close_backends():
+    for backend in _local.__dict__.pop("backends", {}).values():
+        backend.close()
+
+
+def render(template, context):
+    text = render_to_string(f"notifications/{template}.txt", context).strip()
+    return Message.from_text(text)
+
+
+def deliver(channel, message):
+    """Send ``message`` to every destination of ``channel``.
+
+    All destinations are tried; NotificationError is raised afterwards if
+    any failed. Within a job, destinations that already received the
+    message are skipped when the job is retried.
+    """
+    job = current_job()
+    delivered = set(job.progress.get("delivered", [])) if job else set()
+    errors = []
+    for index, destination in enumerate(settings.NOTIFICATION_CHANNELS.get(channel, [])):
+        ref = f"{index}:{destination['backend']}"
+        if ref in delivered:
+            continue
+        started = time.monotonic()
+        try:
+            get_backend(destination).send(message)
+        except NotificationError as exc:
+            errors.append(f"{ref}: {exc}")
+            outcome, error = "failed", str(exc)
+        else:
+            delivered.add(ref)
+            outcome, error = "sent", ""
+        NotificationDelivery.objects.create(
+            channel=channel,
+            backend=destination["backend"],
+            status=outcome,
+            items=message.items,
+            duration_ms=int((time.monotonic() - started) * 1000),
+            error=error,
+        )
+
+    if job:
+        report_progress(delivered=sorted(delivered))
+    if errors:
+        raise NotificationError("; ".join(errors))
+
+
+def _should_hold(channel):
+    if not settings.NOTIFY_DIGEST_THRESHOLD:
+        return False
+    job = current_job()
+    if job and job.progress.get("delivered"):
+        # A retry that already reached some destinations: finish the job.
+        return False
+    if PendingNotification.objects.filter(channel=channel).exists():
+        return True
+    since = timezone.now() - timedelta(seconds=settings.NOTIFY_DIGEST_WINDOW)
+    destinations = len(settings.NOTIFICATION_CHANNELS.get(channel, [])) or 1
+    recent = NotificationDelivery.objects.filter(
+        channel=channel, status="sent", created_at__gte=since
+    ).count()
+    return recent >= settings.NOTIFY_DIGEST_THRESHOLD * destinations
+
+
+def hold(channel, message):
+    """Keep ``message`` for the channel's next digest, scheduling one if needed."""
+    with write_transaction():
+        PendingNotification.objects.create(
+            channel=channel, subject=message.subject, text=message.text
+        )
+        scheduled = Job.objects.filter(
+            name="notify.digest", status="queued", payload__channel=channel
+        ).exists()
+        if not scheduled:
+            enqueue(
+                "notify.digest",
+                delay=timedelta(seconds=settings.NOTIFY_DIGEST_WINDOW),
+                channel=channel,
+            )
+
+
+def notify(channel, template, context):
+    """Render ``notifications/<template>.txt`` and send or hold it."""
+    message = render(template, context)
+    if _should_hold(channel):
+        hold(channel, message)
+    else:
+        deliver(channel, message)
+
+
+def send_digest(channel):
+    """Send the channel's held messages as one message. Returns their count."""
+    pending = list(PendingNotification.objects.filter(channel=channel)[:DIGEST_SIZE])
+    if not pending:
+        return 0
+
+    if len(pending) == 1:
+        message = Message(pending[0].subject, pending[0].text)
+    else:
+        text = render_to_string(
+            "notifications/digest.txt",
+            {"channel": channel, "pending": pending},
+        ).strip()
+        message = Message.from_text(text, items=len(pending))
+    deliver(channel, message)
+
+    PendingNotification.objects.filter(pk__in=[item.pk for item in pending]).delete()
+    if PendingNotification.objects.filter(channel=channel).exists():
+        enqueue("notify.digest", channel=channel)
+    return len(pending)
+
+
+def delivery_stats(since):
+    """Delivery counts and timings per channel/backend/status since ``since``."""
+    rows = (
+        NotificationDelivery.objects.filter(created_at__gte=since)
+        .values("channel", "backend", "status")
+        .annotate(
+            deliveries=Count("id"),
+            items=Sum("items"),
+            avg_ms=Avg("duration_ms"),
+            max_ms=Max("duration_ms"),
+        )
+        .order_by("channel", "backend", "status")
+    )
+    pending = dict(
+        PendingNotification.objects.values_list("channel")
+        .annotate(Count("id"))
+        .order_by()
+    )
+    return list(rows), pending
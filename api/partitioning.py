@@ -0,0 +1,269 @@
+"""
+Optional monthly range partitioning of submission tables on Postgres.
+
+``convert_table()`` turns an existing table into a table partitioned by
+month on its date column, keeping the table name, columns and id
+sequence so the Django model and later migrations keep working. The
+primary key becomes ``(id, <date column>)`` because Postgres requires
+the partition key in every unique constraint; ids stay unique since
+they still come from the one identity sequence.
+
+Indexes, CHECK constraints and foreign keys are recreated on the new
+table. Tables referenced by foreign keys, or with unique constraints
+that don't include the date column, can't be partitioned and are
+refused before anything changes.
+
+Rows outside every monthly range go to a DEFAULT partition;
+``create_partition()`` moves the ones in its range out of it, since
+Postgres refuses a new partition that overlaps rows already there.
+
+Queries ordered newest-first with a date filter (or a LIMIT) then only
+touch the newest partitions.
+"""
+from datetime import date
+
+from django.apps import apps
+from django.db import connection, transaction
+
+from .bulk import SUBMISSION_MODELS
+
+# Tables that may be partitioned: model label -> partition column.
+PARTITIONED_MODELS = {
+    label: SUBMISSION_MODELS[label][0]
+    for label in ("api.ContactMessage", "api.CareerApplication")
+}
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def table_for(model_label):
+    return apps.get_model(model_label)._meta.db_table
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+class PartitioningError(Exception):
+    pass
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table):
+    return f"{table}_default"
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = %s",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table):
+    """(name, estimated rows) of the attached partitions, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, c.reltuples::bigint FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s ORDER BY c.relname",
+            [table],
+        )
+        return cursor.fetchall()
+
+
+def _exists(cursor, name):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+    return cursor.fetchone()[0]
+
+
+def create_partition(table, month):
+    """Create the partition for ``month`` if missing. Returns its name."""
+    name = partition_name(table, month)
+    default = default_partition_name(table)
+    bounds = [month, add_months(month, 1)]
+    with transaction.atomic(), connection.cursor() as cursor:
+        if _exists(cursor, name):
+            return name
+        column = _qn(_partition_column(table))
+        in_default = False
+        if _exists(cursor, default):
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {_qn(default)} "
+                f"WHERE {column} >= %s AND {column} < %s)",
+                bounds,
+            )
+            in_default = cursor.fetchone()[0]
+        if in_default:
+            cursor.execute(f"ALTER TABLE {_qn(table)} DETACH PARTITION {_qn(default)}")
+        cursor.execute(
+            f"CREATE TABLE {_qn(name)} PARTITION OF {_qn(table)} "
+            f"FOR VALUES FROM (%s) TO (%s)",
+            bounds,
+        )
+        if in_default:
+            cursor.execute(
+                f"INSERT INTO {_qn(name)} SELECT * FROM {_qn(default)} "
+                f"WHERE {column} >= %s AND {column} < %s",
+                bounds,
+            )
+            cursor.execute(
+                f"DELETE FROM {_qn(default)} WHERE {column} >= %s AND {column} < %s",
+                bounds,
+            )
+            cursor.execute(f"ALTER TABLE {_qn(table)} ATTACH PARTITION {_qn(default)} DEFAULT")
+    return name
+
+
+def _partition_column(table):
+    for label, column in PARTITIONED_MODELS.items():
+        if table_for(label) == table:
+            return column
+    raise KeyError(table)
+
+
+def ensure_partitions(model_label, months_ahead, today=None):
+    """Create partitions from the current month to ``months_ahead`` later."""
+    table = table_for(model_label)
+    first = month_start(today or date.today())
+    return [
+        create_partition(table, add_months(first, offset))
+        for offset in range(months_ahead + 1)
+    ]
+
+
+def detach_older_than(model_label, months, today=None):
+    """Detach (not drop) partitions entirely older than ``months`` ago."""
+    table = table_for(model_label)
+    cutoff = partition_name(table, add_months(month_start(today or date.today()), -months))
+    detached = []
+    for name, _ in list_partitions(table):
+        # Names sort chronologically; the default partition has no date.
+        if name.endswith("_default") or name >= cutoff:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {_qn(table)} DETACH PARTITION {_qn(name)}")
+        detached.append(name)
+    return detached
+
+
+def _recreate_statements(cursor, table, column):
+    """DDL re-adding the table's indexes, unique/exclusion constraints and
+    foreign keys (besides the primary key) once the table is rebuilt."""
+    cursor.execute(
+        "SELECT conrelid::regclass::text FROM pg_constraint "
+        "WHERE confrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    referencing = [row[0] for row in cursor.fetchall()]
+    if referencing:
+        raise PartitioningError(
+            f"{table} is referenced by foreign keys from {', '.join(referencing)}"
+        )
+
+    statements = []
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid), ARRAY("
+        "  SELECT attname FROM pg_attribute WHERE attrelid = conrelid AND attnum = ANY(conkey)"
+        ") FROM pg_constraint WHERE conrelid = %s::regclass AND contype IN ('u', 'x', 'f')",
+        [table],
+    )
+    for name, kind, definition, columns in cursor.fetchall():
+        if kind != "f" and column not in columns:
+            raise PartitioningError(
+                f"Constraint {name} on {table} doesn't include {column}, "
+                f"so a partitioned table can't enforce it"
+            )
+        statements.append(f"ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(name)} {definition}")
+
+    # Indexes that don't back a constraint, e.g. db_index and Meta.indexes.
+    cursor.execute(
+        "SELECT pg_get_indexdef(i.indexrelid), i.indisunique, ARRAY("
+        "  SELECT attname FROM pg_attribute WHERE attrelid = i.indrelid AND attnum = ANY(i.indkey)"
+        ") FROM pg_index i WHERE i.indrelid = %s::regclass AND NOT EXISTS ("
+        "  SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid AND c.conrelid = i.indrelid"
+        ")",
+        [table],
+    )
+    for definition, unique, columns in cursor.fetchall():
+        if unique and column not in columns:
+            raise PartitioningError(
+                f"Unique index on {table} doesn't include {column}: {definition}"
+            )
+        statements.append(definition)
+    return statements
+
+
+def convert_table(model_label, months_ahead):
+    """Rebuild a plain table as a monthly partitioned table, copying its rows."""
+    table = table_for(model_label)
+    column = PARTITIONED_MODELS[model_label]
+    legacy = f"{table}_unpartitioned"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {_qn(table)} IN ACCESS EXCLUSIVE MODE")
+        # Read while the definitions still name ``table``; run once the old
+        # table (and so its index and constraint names) is gone.
+        recreate = _recreate_statements(cursor, table, column)
+        cursor.execute(f"SELECT min({_qn(column)}), max(id) FROM {_qn(table)}")
+        oldest, max_id = cursor.fetchone()
+
+        cursor.execute(f"ALTER TABLE {_qn(table)} RENAME TO {_qn(legacy)}")
+        cursor.execute(
+            f"CREATE TABLE {_qn(table)} (LIKE {_qn(legacy)} "
+            f"INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING STORAGE "
+            f"INCLUDING CONSTRAINTS) PARTITION BY RANGE ({_qn(column)})"
+        )
+        cursor.execute(
+            f"ALTER TABLE {_qn(table)} ADD PRIMARY KEY (id, {_qn(column)})"
+        )
+        cursor.execute(
+            f"CREATE TABLE {_qn(default_partition_name(table))} "
+            f"PARTITION OF {_qn(table)} DEFAULT"
+        )
+
+        first = month_start(oldest.date() if oldest else date.today())
+        last = add_months(month_start(date.today()), months_ahead)
+        month = first
+        while month <= last:
+            create_partition(table, month)
+            month = add_months(month, 1)
+
+        cursor.execute(f"INSERT INTO {_qn(table)} SELECT * FROM {_qn(legacy)}")
+
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute "
+            "WHERE attrelid = %s::regclass AND attname = 'id'",
+            [legacy],
+        )
+        if not cursor.fetchone()[0]:
+            # A serial (pre-identity) id: keep its sequence, which the copied
+            # default still uses, alive when the old table is dropped.
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [legacy])
+            sequence = cursor.fetchone()[0]
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {_qn(table)}.id")
+
+        cursor.execute(f"DROP TABLE {_qn(legacy)}")
+        # After the copy: building each index once is faster than
+        # maintaining it row by row.
+        for statement in recreate:
+            cursor.execute(statement)
+        if max_id:
+            cursor.execute(
+                "SELECT setval(pg_get_serial_sequence(%s, 'id'), %s)",
+                [table, max_id],
+            )
@@ -0,0 +1,153 @@
+"""
+Previews for MOU PDFs: a small WebP of the first page, the page count
+and the file size, so listing cards never need the PDF itself.
+
+Pages are rendered with pypdfium2 when it is installed, else with
+poppler's pdftoppm/pdfinfo when they are on the PATH. With neither, the
+page count is read from the file's page objects and no thumbnail is
+made. Results are keyed by the PDF's SHA-256, so a document that is
+uploaded again, or attached to several MOUs, is rendered only once.
+
+Only called from background jobs.
+"""
+import hashlib
+import io
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .models import MOU
+
+THUMBNAIL_WIDTH = 320
+WEBP_QUALITY = 70
+PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+PDFINFO_PAGES = re.compile(r"^Pages:\s+(\d+)", re.MULTILINE)
+
+
+def content_hash(field_file):
+    digest = hashlib.sha256()
+    field_file.open("rb")
+    try:
+        for chunk in field_file.chunks():
+            digest.update(chunk)
+    finally:
+        field_file.close()
+    return digest.hexdigest()
+
+
+@contextmanager
+def local_path(field_file):
+    """A filesystem path for ``field_file``, copying it if storage is remote."""
+    try:
+        yield field_file.path
+        return
+    except NotImplementedError:
+        pass
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as handle:
+        field_file.open("rb")
+        try:
+            for chunk in field_file.chunks():
+                handle.write(chunk)
+        finally:
+            field_file.close()
+        handle.flush()
+        yield handle.name
+
+
+def _render_pdfium(path):
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(path)
+    try:
+        page = pdf[0]
+        # Page sizes are in points; scale is pixels per point.
+        image = page.render(scale=THUMBNAIL_WIDTH / page.get_width()).to_pil()
+        return len(pdf), image
+    finally:
+        pdf.close()
+
+
+def _render_poppler(path):
+    from PIL import Image
+
+    info = subprocess.run(["pdfinfo", path], capture_output=True, text=True, timeout=60)
+    match = PDFINFO_PAGES.search(info.stdout)
+    pages = int(match.group(1)) if match else None
+
+    with tempfile.TemporaryDirectory() as directory:
+        prefix = os.path.join(directory, "page")
+        subprocess.run(
+            [
+                "pdftoppm", "-f", "1", "-l", "1", "-singlefile", "-png",
+                "-scale-to-x", str(THUMBNAIL_WIDTH), "-scale-to-y", "-1",
+                path, prefix,
+            ],
+            check=True,
+            capture_output=True,
+            timeout=60,
+        )
+        with Image.open(prefix + ".png") as image:
+            image.load()
+            return pages, image
+
+
+def _count_pages(path):
+    # Misses pages kept in compressed object streams; a best effort for
+    # when no renderer is installed.
+    with open(path, "rb") as handle:
+        return len(PAGE_OBJECT.findall(handle.read())) or None
+
+
+def render_first_page(path):
+    """Return (page count, PIL image of page one or None)."""
+    try:
+        return _render_pdfium(path)
+    except ImportError:
+        pass
+    if shutil.which("pdftoppm"):
+        return _render_poppler(path)
+    return _count_pages(path), None
+
+
+def save_thumbnail(image, name):
+    image = image.convert("RGB")
+    image.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_WIDTH * 2))
+    buffer = io.BytesIO()
+    image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=6)
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def read_pdf_preview(field_file):
+    """Return the MOU preview field values for a PDF file."""
+    sha256 = content_hash(field_file)
+    values = {
+        "pdf_sha256": sha256,
+        "pdf_bytes": field_file.size,
+        "pdf_meta_name": field_file.name,
+    }
+
+    known = (
+        MOU.objects.filter(pdf_sha256=sha256, pdf_pages__isnull=False)
+        .exclude(pdf_thumbnail="")
+        .values("pdf_pages", "pdf_thumbnail")
+        .first()
+    )
+    if known and default_storage.exists(known["pdf_thumbnail"]):
+        return {**values, **known}
+
+    with local_path(field_file) as path:
+        pages, image = render_first_page(path)
+    values["pdf_pages"] = pages
+    values["pdf_thumbnail"] = ""
+    if image is not None:
+        name = f"mou-previews/{sha256}.webp"
+        if not default_storage.exists(name):
+            name = save_thumbnail(image, name)
+        values["pdf_thumbnail"] = name
+    return values
@@ -0,0 +1,184 @@
+"""
+On-demand profiling of single requests, for staff.
+
+A request from a logged-in staff user carrying ``X-Profile: 1`` (or
+``?_profile=1``) runs under cProfile while every SQL query and every
+serializer's to_representation() is timed. The result is stored as a
+RequestProfile, viewable in the admin, and the response points at it
+with ``X-Profile-Id`` and a ``Server-Timing`` summary. With the value
+``inline`` the profile replaces the response body instead.
+
+Other requests only pay for the header/query-string check; the
+serializer hook is installed the first time a profile is taken and is
+a thread-local lookup afterwards.
+"""
+import cProfile
+import io
+import pstats
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework import serializers
+
+from .models import RequestProfile
+
+HEADER = "X-Profile"
+QUERY_PARAM = "_profile"
+CALL_TREE_LINES = 80
+
+_active = threading.local()
+_hook_lock = threading.Lock()
+_hooked = False
+
+
+class Recorder:
+    """Collects SQL and serializer timings for the profiled request."""
+
+    def __init__(self):
+        self.queries = []
+        self.serializers = defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, execute, sql, params, many, context):
+        # A database execute_wrapper.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                "sql": sql,
+                "ms": round((time.perf_counter() - started) * 1000, 3),
+            })
+
+    def serializer_time(self, name, seconds):
+        entry = self.serializers[name]
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def _timed(method):
+    def to_representation(self, *args, **kwargs):
+        recorder = getattr(_active, "recorder", None)
+        if recorder is None:
+            return method(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            name = type(self).__name__
+            if isinstance(self, serializers.ListSerializer):
+                name = f"{type(self.child).__name__}(many=True)"
+            recorder.serializer_time(name, time.perf_counter() - started)
+
+    to_representation.__wrapped__ = method
+    return to_representation
+
+
+def _install_serializer_hook():
+    global _hooked
+    with _hook_lock:
+        if _hooked:
+            return
+        for cls in (serializers.Serializer, serializers.ListSerializer):
+            cls.to_representation = _timed(cls.to_representation)
+        _hooked = True
+
+
+def requested(request):
+    """The profiling mode asked for ("store" or "inline"), or None."""
+    value = request.headers.get(HEADER) or request.GET.get(QUERY_PARAM)
+    if not value or not settings.PROFILING_ENABLED:
+        return None
+    user = getattr(request, "user", None)
+    if user is None or not user.is_staff:
+        return None
+    return "inline" if value == "inline" else "store"
+
+
+def profile(request, get_response):
+    """Run ``get_response(request)`` under the profiler. Returns (response, RequestProfile)."""
+    _install_serializer_hook()
+    # Read before the view runs: DRF views with no authentication classes
+    # replace request.user with AnonymousUser.
+    username = request.user.get_username()
+    recorder = Recorder()
+    profiler = cProfile.Profile()
+    wrappers = [connection.execute_wrapper(recorder) for connection in connections.all()]
+    for wrapper in wrappers:
+        wrapper.__enter__()
+    _active.recorder = recorder
+    started = time.perf_counter()
+    try:
+        response = profiler.runcall(get_response, request)
+        if hasattr(response, "render") and not response.is_rendered:
+            # Rendering is where DRF serializes to JSON; include it.
+            profiler.runcall(response.render)
+    finally:
+        duration = time.perf_counter() - started
+        _active.recorder = None
+        for wrapper in reversed(wrappers):
+            wrapper.__exit__(None, None, None)
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(CALL_TREE_LINES)
+    stats.print_callees(CALL_TREE_LINES // 4)
+
+    result = RequestProfile.objects.create(
+        method=request.method,
+        path=request.path[:500],
+        query_string=request.META.get("QUERY_STRING", ""),
+        user=username,
+        status_code=response.status_code,
+        duration_ms=round(duration * 1000, 3),
+        sql_count=len(recorder.queries),
+        sql_ms=round(sum(query["ms"] for query in recorder.queries), 3),
+        call_tree=stream.getvalue(),
+        queries=recorder.queries,
+        serializers=sorted(
+            (
+                {"serializer": name, "calls": calls, "ms": round(seconds * 1000, 3)}
+                for name, (calls, seconds) in recorder.serializers.items()
+            ),
+            key=lambda entry: -entry["ms"],
+        ),
+    )
+    _prune()
+    return response, result
+
+
+def _prune():
+    stale = RequestProfile.objects.order_by("-created_at").values_list("pk", flat=True)[
+        settings.PROFILING_KEEP:
+    ]
+    RequestProfile.objects.filter(pk__in=list(stale)).delete()
+
+
+def inline_response(result):
+    lines = [
+        f"{result.method} {result.path} -> {result.status_code} in {result.duration_ms:.1f} ms",
+        f"SQL: {result.sql_count} queries, {result.sql_ms:.1f} ms",
+        "",
+        "Serializers (inclusive):",
+        *(f"  {s['ms']:9.1f} ms  {s['calls']:5}x  {s['serializer']}" for s in result.serializers),
+        "",
+        "Queries:",
+        *(f"  {q['ms']:9.1f} ms  {q['sql']}" for q in result.queries),
+        "",
+        result.call_tree,
+    ]
+    return HttpResponse("\n".join(lines), content_type="text/plain; charset=utf-8")
+
+
+def annotate(response, result):
+    serializer_ms = max((s["ms"] for s in result.serializers), default=0)
+    response["X-Profile-Id"] = str(result.pk)
+    response["Server-Timing"] = ", ".join([
+        f"total;dur={result.duration_ms:.1f}",
+        f'sql;dur={result.sql_ms:.1f};desc="{result.sql_count} queries"',
+        f"serializers;dur={serializer_ms:.1f}",
+    ])
+    return response
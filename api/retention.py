@@ -0,0 +1,251 @@
+"""
+Retention policy for submission tables.
+
+Rows older than the per-model age in ``RETENTION_POLICIES`` are moved
+out of the hot tables, in batches, into either the compressed
+``ArchivedSubmission`` table or gzipped JSON-lines files under
+``ARCHIVE_ROOT`` (``ARCHIVE_BACKEND``). Their files are moved under
+``ARCHIVE_COLD_MEDIA_DIR`` in storage.
+
+``with_archived()`` lets listings page through live and archived rows
+together, newest first, on a (date, pk) cursor. Pages of the hot table
+and the archive table are read from their indexes. A JSON-lines file has
+no index, so each page scans it once, keeping only a page of rows:
+fine for cold data that is rarely listed; prefer the table backend when
+archived rows are browsed often.
+"""
+import gzip
+import heapq
+import json
+from itertools import islice
+import os
+import zlib
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .bulk import CHUNK_SIZE, SUBMISSION_MODELS, iter_chunks
+from .models import ArchivedSubmission
+from .transactions import write_transaction
+
+
+def cutoff_for(model_label, now=None):
+    days = settings.RETENTION_POLICIES[model_label]["days"]
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def aged_queryset(model_label, now=None):
+    model = apps.get_model(model_label)
+    date_field, _ = SUBMISSION_MODELS[model_label]
+    return model.objects.filter(**{f"{date_field}__lt": cutoff_for(model_label, now)})
+
+
+def move_file(name, new_name):
+    """Move a stored file, renaming in place when storage is local."""
+    if not default_storage.exists(name):
+        return name
+    try:
+        old_path = default_storage.path(name)
+        new_path = default_storage.path(new_name)
+    except NotImplementedError:
+        with default_storage.open(name, "rb") as handle:
+            new_name = default_storage.save(new_name, handle)
+        default_storage.delete(name)
+        return new_name
+    os.makedirs(os.path.dirname(new_path), exist_ok=True)
+    os.replace(old_path, new_path)
+    return new_name
+
+
+def _move_to_cold(rows, file_fields):
+    moved = []
+    for row in rows:
+        for field in file_fields:
+            name = row[field]
+            if name:
+                row[field] = move_file(name, f"{settings.ARCHIVE_COLD_MEDIA_DIR}/{name}")
+                moved.append((name, row[field]))
+    return moved
+
+
+def _jsonl_path(model_label):
+    return os.path.join(settings.ARCHIVE_ROOT, f"{model_label.lower()}.jsonl.gz")
+
+
+def _write_jsonl(model_label, rows):
+    path = _jsonl_path(model_label)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Each batch is appended as its own gzip member; readers see one stream.
+    with gzip.open(path, "at", encoding="utf-8") as handle:
+        for row in rows:
+            handle.write(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def _write_table(model_label, date_field, rows):
+    ArchivedSubmission.objects.bulk_create(
+        [
+            ArchivedSubmission(
+                model=model_label,
+                original_id=row["pk"],
+                created_at=row[date_field],
+                data=zlib.compress(json.dumps(row, cls=DjangoJSONEncoder).encode()),
+            )
+            for row in rows
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def archive_queryset(queryset, backend=None, batch_size=CHUNK_SIZE, progress=None):
+    """Move the rows of ``queryset`` to the archive. Returns the row count."""
+    backend = backend or settings.ARCHIVE_BACKEND
+    model = queryset.model
+    model_label = model._meta.label
+    date_field, file_fields = SUBMISSION_MODELS[model_label]
+    fields = [field.attname for field in model._meta.concrete_fields if not field.primary_key]
+    total = queryset.count()
+    done = 0
+
+    for rows in iter_chunks(queryset, *fields, chunk_size=batch_size):
+        moved = _move_to_cold(rows, file_fields)
+        try:
+            with write_transaction():
+                if backend == "jsonl":
+                    _write_jsonl(model_label, rows)
+                else:
+                    _write_table(model_label, date_field, rows)
+                model.objects.filter(pk__in=[row["pk"] for row in rows]).delete()
+        except Exception:
+            for name, cold_name in moved:
+                move_file(cold_name, name)
+            raise
+        done += len(rows)
+        if progress:
+            progress(done=done, total=total)
+
+    return done
+
+
+def _decode(data, date_field):
+    row = json.loads(data)
+    row[date_field] = parse_datetime(row[date_field])
+    return row
+
+
+def _is_before(date, pk, before, before_pk):
+    """Whether a row sorts after the (``before``, ``before_pk``) cursor, newest first."""
+    if before is None:
+        return True
+    if before_pk is None:
+        return date < before
+    return (date, pk) < (before, before_pk)
+
+
+def _table_rows(model_label, date_field, before=None, before_pk=None, limit=None):
+    data = ArchivedSubmission.objects.filter(model=model_label)
+    if before and before_pk is not None:
+        data = data.filter(
+            Q(created_at__lt=before) | Q(created_at=before, original_id__lt=before_pk)
+        )
+    elif before:
+        data = data.filter(created_at__lt=before)
+    data = data.order_by("-created_at", "-original_id").values_list("created_at", "data")
+    if limit:
+        data = data[:limit]
+    for created_at, blob in data.iterator(chunk_size=limit or 2000):
+        row = _decode(zlib.decompress(bytes(blob)), date_field)
+        # The JSON keeps milliseconds only; cursors need the exact value.
+        row[date_field] = created_at
+        yield row
+
+
+def _jsonl_page(model_label, date_field, before=None, before_pk=None, limit=CHUNK_SIZE):
+    """The newest ``limit`` JSON-lines rows past the cursor, newest first.
+
+    The whole file is scanned, holding no more than ``limit`` rows.
+    """
+    path = _jsonl_path(model_label)
+    if not os.path.exists(path):
+        return []
+    page, kept = [], set()
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            row = _decode(line, date_field)
+            key = (row[date_field], row["pk"])
+            # A batch can be written twice if its delete was retried.
+            if row["pk"] in kept or not _is_before(*key, before, before_pk):
+                continue
+            if len(page) < limit:
+                heapq.heappush(page, (key, row))
+                kept.add(row["pk"])
+            elif key > page[0][0]:
+                _, dropped = heapq.heapreplace(page, (key, row))
+                kept.discard(dropped["pk"])
+                kept.add(row["pk"])
+    return [row for _, row in sorted(page, key=lambda item: item[0], reverse=True)]
+
+
+def _jsonl_rows(model_label, date_field):
+    path = _jsonl_path(model_label)
+    if not os.path.exists(path):
+        return []
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        # A batch can be written twice if its delete was retried; keep one.
+        rows = {row["pk"]: row for row in (_decode(line, date_field) for line in handle)}
+    return sorted(rows.values(), key=lambda row: row[date_field], reverse=True)
+
+
+def archived_rows(model_label):
+    """Archived field values for a model from both backends, newest first."""
+    date_field, _ = SUBMISSION_MODELS[model_label]
+    return heapq.merge(
+        _table_rows(model_label, date_field),
+        _jsonl_rows(model_label, date_field),
+        key=lambda row: row[date_field],
+        reverse=True,
+    )
+
+
+def with_archived(queryset, before=None, before_pk=None, limit=None):
+    """A page of ``queryset``'s rows merged with the model's archived rows.
+
+    Rows are ordered newest first by (date field, pk). Returns up to
+    ``limit`` (ARCHIVE_PAGE_SIZE) rows after the cursor: rows older than
+    ``before``, or with the same date and a pk below ``before_pk``.
+    Each source is read only as far as the page needs. Archived rows
+    come back as unsaved instances the regular serializers can render.
+    """
+    model = queryset.model
+    model_label = model._meta.label
+    date_field, _ = SUBMISSION_MODELS[model_label]
+    limit = limit or settings.ARCHIVE_PAGE_SIZE
+    if before and before_pk is not None:
+        queryset = queryset.filter(
+            Q(**{f"{date_field}__lt": before}) | Q(**{date_field: before, "pk__lt": before_pk})
+        )
+    elif before:
+        queryset = queryset.filter(**{f"{date_field}__lt": before})
+    queryset = queryset.order_by(f"-{date_field}", "-pk")
+    archived = heapq.merge(
+        _table_rows(model_label, date_field, before, before_pk, limit),
+        _jsonl_page(model_label, date_field, before, before_pk, limit),
+        key=lambda row: (row[date_field], row["pk"]),
+        reverse=True,
+    )
+    return list(islice(
+        heapq.merge(
+            queryset[:limit].iterator(),
+            (model(**row) for row in archived),
+            key=lambda obj: (getattr(obj, date_field), obj.pk),
+            reverse=True,
+        ),
+        limit,
+    ))
@@ -0,0 +1,175 @@
+"""
+Daily rollups of submissions for the dashboard.
+
+Each new row bumps a per-day counter in DailyStat (see api/signals.py),
+so /api/stats/ reads a few hundred small rows instead of the listings.
+Counters record what was received: deleting or archiving submissions
+does not lower them, and rebuild() recounts live and archived rows.
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.apps import apps
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .bulk import SUBMISSION_MODELS
+from .models import DailyStat
+from .retention import archived_rows
+from .transactions import write_transaction
+
+# metric: (model label, date field, breakdown field, quantity field)
+ROLLUPS = {
+    "career_applications": ("api.CareerApplication", "applied_at", None, None),
+    "contact_messages": ("api.ContactMessage", "created_at", None, None),
+    "cpu_inquiries": ("api.CpuInquiry", "created_at", "cpu_model", "quantity"),
+    "hackathon_teams": ("api.HackathonTeam", "created_at", None, None),
+}
+
+
+def metrics_for(model_label):
+    return [metric for metric, spec in ROLLUPS.items() if spec[0] == model_label]
+
+
+def _add(counts):
+    """Add ``{(metric, day, key): (count, quantity)}`` to the counters."""
+    DailyStat.objects.bulk_create(
+        [DailyStat(metric=metric, day=day, key=key) for metric, day, key in counts],
+        ignore_conflicts=True,
+    )
+    for (metric, day, key), (count, quantity) in counts.items():
+        DailyStat.objects.filter(metric=metric, day=day, key=key).update(
+            count=F("count") + count,
+            quantity=F("quantity") + quantity,
+        )
+
+
+def _row_key(metric, row):
+    _, date_field, key_field, quantity_field = ROLLUPS[metric]
+    day = timezone.localdate(row[date_field])
+    key = (row[key_field] or "")[:100] if key_field else ""
+    quantity = (row[quantity_field] or 0) if quantity_field else 0
+    return (metric, day, key), quantity
+
+
+def record(instance):
+    """Count a newly created submission."""
+    counts = {}
+    for metric in metrics_for(instance._meta.label):
+        key, quantity = _row_key(metric, instance.__dict__)
+        counts[key] = (1, quantity)
+    _add(counts)
+
+
+def _live_counts(metric, since):
+    model_label, date_field, key_field, quantity_field = ROLLUPS[metric]
+    queryset = apps.get_model(model_label).objects.all()
+    if since:
+        queryset = queryset.filter(**{f"{date_field}__gte": since})
+    rows = queryset.annotate(
+        rollup_day=TruncDate(date_field),
+        rollup_key=F(key_field) if key_field else Value(""),
+    ).values("rollup_day", "rollup_key").annotate(
+        rollup_count=Count("pk"),
+        rollup_quantity=Sum(quantity_field) if quantity_field else Value(0),
+    ).order_by()
+    return {
+        (metric, row["rollup_day"], row["rollup_key"][:100]): (
+            row["rollup_count"],
+            row["rollup_quantity"] or 0,
+        )
+        for row in rows
+    }
+
+
+def _archived_counts(metric, since):
+    model_label, date_field, _, _ = ROLLUPS[metric]
+    counts, quantities = Counter(), Counter()
+    if model_label not in SUBMISSION_MODELS:
+        return {}
+    for row in archived_rows(model_label):
+        if since and row[date_field] < since:
+            # Newest first, so nothing older is wanted either.
+            break
+        key, quantity = _row_key(metric, row)
+        counts[key] += 1
+        quantities[key] += quantity
+    return {key: (counts[key], quantities[key]) for key in counts}
+
+
+def rebuild(metrics=None, days=None):
+    """Recount ``metrics`` (all by default) from the submission tables.
+
+    With ``days`` only the last that many days are recounted, which is
+    enough to repair counters after a crash or a manual import.
+    """
+    metrics = metrics or list(ROLLUPS)
+    first_day = since = None
+    if days:
+        first_day = timezone.localdate() - timedelta(days=days - 1)
+        since = timezone.make_aware(datetime.combine(first_day, time.min))
+
+    rows = 0
+    with write_transaction():
+        for metric in metrics:
+            counts = _live_counts(metric, since)
+            for key, (count, quantity) in _archived_counts(metric, since).items():
+                live_count, live_quantity = counts.get(key, (0, 0))
+                counts[key] = (live_count + count, live_quantity + quantity)
+
+            stale = DailyStat.objects.filter(metric=metric)
+            if since:
+                stale = stale.filter(day__gte=first_day)
+            stale.delete()
+            DailyStat.objects.bulk_create(
+                [
+                    DailyStat(metric=metric, day=day, key=key, count=count, quantity=quantity)
+                    for (metric, day, key), (count, quantity) in counts.items()
+                ],
+                batch_size=500,
+            )
+            rows += len(counts)
+    return rows
+
+
+def time_series(metrics, first_day, last_day):
+    """Daily counts per metric between two dates, zero-filled, in one query."""
+    days = [
+        first_day + timedelta(days=offset)
+        for offset in range((last_day - first_day).days + 1)
+    ]
+    index = {day: position for position, day in enumerate(days)}
+    series = {}
+    for metric in metrics:
+        series[metric] = {
+            "count": [0] * len(days),
+            "total": 0,
+        }
+        if ROLLUPS[metric][3]:
+            series[metric]["quantity"] = [0] * len(days)
+            series[metric]["total_quantity"] = 0
+        if ROLLUPS[metric][2]:
+            series[metric]["by_key"] = {}
+
+    rows = DailyStat.objects.filter(
+        metric__in=metrics, day__range=(first_day, last_day)
+    ).values_list("metric", "day", "key", "count", "quantity")
+    for metric, day, key, count, quantity in rows:
+        data = series[metric]
+        data["count"][index[day]] += count
+        data["total"] += count
+        if "quantity" in data:
+            data["quantity"][index[day]] += quantity
+            data["total_quantity"] += quantity
+        if "by_key" in data:
+            totals = data["by_key"].setdefault(key, {"count": 0, "quantity": 0})
+            totals["count"] += count
+            totals["quantity"] += quantity
+
+    return {
+        "from": first_day,
+        "to": last_day,
+        "days": days,
+        "series": series,
+    }
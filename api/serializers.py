@@ -1,5 +1,8 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
 from rest_framework import serializers
-from django.db import transaction
 from .models import (
     CareerApplication,
     ContactMessage,
@@ -7,13 +10,92 @@ from .models import (
     GalleryImage,
     Project,
     CommunityItem,
+    Cpu,
     CpuInquiry,
+   HackathonEvent,
    HackathonTeam, 
    HackathonParticipant,
+   Job,
 )
+from . import catalog
+from .direct_uploads import TARGETS, DirectUploadError, stored_file
+from .hackathon import current_event, register_team
+from .normalization import normalize_email, normalize_phone
+from .rollups import ROLLUPS
+from .uploads import completed_upload, delete_session
+
+
+class DirectUploadMixin:
+    """Accept a file uploaded straight to storage in place of a file field.
+
+    For each ``{field: target}`` in ``direct_upload_fields`` the client may
+    send ``<field>_key`` with the token from /api/uploads/direct/; the
+    stored file then goes through the field's usual validation.
+    """
+
+    direct_upload_fields = {}
+
+    def to_internal_value(self, data):
+        copied = False
+        for field, target in self.direct_upload_fields.items():
+            token = data.get(f"{field}_key")
+            if not token or data.get(field):
+                continue
+            try:
+                stored = stored_file(token, target)
+            except DirectUploadError as error:
+                raise serializers.ValidationError({f"{field}_key": [str(error)]})
+            if not copied:
+                data = data.dict() if hasattr(data, "dict") else dict(data)
+                copied = True
+            data[field] = stored
+        return super().to_internal_value(data)
+
 
+class ResumableUploadMixin:
+    """Accept a finished resumable upload in place of a file field.
+
+    For each field in ``upload_fields`` the client may send
+    ``<field>_upload`` with the id of a completed upload instead of the
+    file itself; the file then goes through the field's usual validation.
+    """
+
+    upload_fields = ()
+
+    def to_internal_value(self, data):
+        self._uploads = []
+        for field in self.upload_fields:
+            upload_id = data.get(f"{field}_upload")
+            if not upload_id or data.get(field):
+                continue
+            try:
+                upload = completed_upload(upload_id)
+            except DjangoValidationError:  # not a UUID
+                upload = None
+            if upload is None:
+                raise serializers.ValidationError(
+                    {f"{field}_upload": ["Unknown or unfinished upload"]}
+                )
+            if not self._uploads:
+                data = data.dict() if hasattr(data, "dict") else dict(data)
+            data[field] = upload
+            self._uploads.append(upload)
+        return super().to_internal_value(data)
+
+    def save(self, **kwargs):
+        instance = super().save(**kwargs)
+        for upload in getattr(self, "_uploads", []):
+            upload.close()
+            delete_session(upload.session)
+        return instance
+
+
+class CareerApplicationSerializer(
+    DirectUploadMixin, ResumableUploadMixin, serializers.ModelSerializer
+):
+    upload_fields = ("resume",)
+    direct_upload_fields = {"resume": "career.resume"}
 
-class CareerApplicationSerializer(serializers.ModelSerializer):
     def validate_resume(self, value):
         if not value.name.lower().endswith(".pdf"):
             raise serializers.ValidationError("Resume must be a PDF file")
@@ -32,10 +114,25 @@ class ContactMessageSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class MOUSerializer(serializers.ModelSerializer):
+class MOUSerializer(DirectUploadMixin, ResumableUploadMixin, serializers.ModelSerializer):
+    upload_fields = ("pdf",)
+    direct_upload_fields = {"pdf": "mou.pdf"}
+
+    thumbnail_url = serializers.SerializerMethodField()
+    page_count = serializers.IntegerField(source="pdf_pages", read_only=True)
+    size = serializers.IntegerField(source="pdf_bytes", read_only=True)
+
     class Meta:
         model = MOU
-        fields = "__all__"
+        exclude = ["pdf_thumbnail", "pdf_pages", "pdf_bytes", "pdf_sha256", "pdf_meta_name"]
+
+    def get_thumbnail_url(self, obj):
+        if not obj.pdf_thumbnail:
+            return None
+        request = self.context.get("request")
+        if request:
+            return request.build_absolute_uri(obj.pdf_thumbnail.url)
+        return obj.pdf_thumbnail.url
 
 
 class GalleryImageSerializer(serializers.ModelSerializer):
@@ -43,7 +140,18 @@ class GalleryImageSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GalleryImage
-        fields = ["id", "title", "category", "image"]
+        fields = [
+            "id",
+            "title",
+            "category",
+            "image",
+            "image_width",
+            "image_height",
+            "image_format",
+            "image_bytes",
+            "image_color",
+            "image_blurhash",
+        ]
 
     def get_image(self, obj):
         request = self.context.get("request")
@@ -61,26 +169,128 @@ class ProjectSerializer(serializers.ModelSerializer):
 class CommunityItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = CommunityItem
-        fields = "__all__"
+        exclude = ["image_meta_name"]
+
+
+class CpuSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Cpu
+        fields = ["id", "name", "ram_options", "storage_options"]
 
 
 class CpuInquirySerializer(serializers.ModelSerializer):
+    """Takes a catalog ``cpu`` id, or a free-text ``cpu_model`` linked to the
+    catalog entry of that name if there is one."""
+
+    cpu = serializers.PrimaryKeyRelatedField(
+        queryset=Cpu.objects.filter(is_active=True), required=False, allow_null=True
+    )
+    cpu_model = serializers.CharField(max_length=100, required=False, allow_blank=True)
+
     class Meta:
         model = CpuInquiry
         fields = "__all__"
 
+    def validate(self, attrs):
+        cpu = attrs.get("cpu")
+        if cpu is not None:
+            attrs["cpu_model"] = cpu.name
+            for field in ("ram", "storage"):
+                options = getattr(cpu, f"{field}_options")
+                if options and field in attrs and attrs[field] not in options:
+                    raise serializers.ValidationError(
+                        {field: f"Must be one of: {', '.join(options)}"}
+                    )
+        elif attrs.get("cpu_model"):
+            attrs.pop("cpu", None)
+            attrs["cpu_id"] = catalog.match(attrs["cpu_model"])
+        elif not self.partial:
+            raise serializers.ValidationError(
+                {"cpu_model": "Enter a CPU model or choose one from the catalog"}
+            )
+        return attrs
+
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "name",
+            "status",
+            "attempts",
+            "progress",
+            "created_at",
+            "finished_at",
+            "duration_ms",
+        ]
+
+
+class BulkSelectionSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    before = serializers.DateTimeField(required=False)
+    after = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError("Provide ids or a before/after range")
+        return attrs
+
+
+class StatsQuerySerializer(serializers.Serializer):
+    MAX_DAYS = 366
+
+    metric = serializers.CharField(required=False)
+    days = serializers.IntegerField(required=False, min_value=1, max_value=MAX_DAYS)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate_metric(self, value):
+        metrics = [metric for metric in value.split(",") if metric]
+        unknown = sorted(set(metrics) - set(ROLLUPS))
+        if unknown:
+            raise serializers.ValidationError(f"Unknown metric(s): {', '.join(unknown)}")
+        return metrics
+
+    def validate(self, attrs):
+        end = attrs.get("end") or timezone.localdate()
+        start = attrs.get("start") or end - timedelta(days=attrs.get("days", 30) - 1)
+        if start > end:
+            raise serializers.ValidationError("start must not be after end")
+        if (end - start).days >= self.MAX_DAYS:
+            raise serializers.ValidationError(f"At most {self.MAX_DAYS} days per request")
+        return {
+            "metrics": attrs.get("metric") or list(ROLLUPS),
+            "first_day": start,
+            "last_day": end,
+        }
+
+
+class DirectUploadRequestSerializer(serializers.Serializer):
+    target = serializers.ChoiceField(choices=sorted(TARGETS))
+    filename = serializers.CharField(max_length=255)
+    content_type = serializers.CharField(max_length=100)
+    size = serializers.IntegerField(min_value=1)
 
 
 class HackathonParticipantSerializer(serializers.ModelSerializer):
     class Meta:
         model = HackathonParticipant
-        fields = "_all_"
+        exclude = ["team", "role"]
+
+
+class HackathonParticipationSerializer(HackathonParticipantSerializer):
+    team_name = serializers.CharField(source="team.team_name", read_only=True)
+
+    class Meta(HackathonParticipantSerializer.Meta):
+        exclude = ["team"]
 
 
 class HackathonTeamSerializer(serializers.ModelSerializer):
     class Meta:
         model = HackathonTeam
-        fields = "_all_"
+        fields = "__all__"
 
 
 class HackathonRegistrationSerializer(serializers.Serializer):
@@ -88,27 +298,29 @@ class HackathonRegistrationSerializer(serializers.Serializer):
     totalParticipants = serializers.IntegerField()
     leader = HackathonParticipantSerializer()
     members = HackathonParticipantSerializer(many=True)
+    event = serializers.SlugField(required=False)
 
-    def create(self, validated_data):
-        leader_data = validated_data.pop("leader")
-        members_data = validated_data.pop("members")
+    def validate(self, attrs):
+        people = [attrs["leader"], *attrs["members"]]
+        emails = [normalize_email(person["email"]) for person in people]
+        phones = [normalize_phone(person["phone"]) for person in people]
+        if len(set(emails)) != len(emails) or len(set(phones)) != len(phones):
+            raise serializers.ValidationError(
+                "Each participant needs a different email and phone number"
+            )
+        return attrs
+
+    def validate_event(self, value):
+        try:
+            return current_event(value)
+        except HackathonEvent.DoesNotExist:
+            raise serializers.ValidationError("Unknown or closed hackathon event")
 
-        team = HackathonTeam.objects.create(
+    def create(self, validated_data):
+        return register_team(
+            event=validated_data.get("event") or current_event(create=True),
             team_name=validated_data["teamName"],
             total_participants=validated_data["totalParticipants"],
+            leader=validated_data["leader"],
+            members=validated_data["members"],
         )
-
-        HackathonParticipant.objects.create(
-            team=team,
-            role="LEADER",
-            **leader_data
-        )
-
-        for member in members_data:
-            HackathonParticipant.objects.create(
-                team=team,
-                role="MEMBER",
-                **member
-            )
-
-        return team
\ No newline at end of file
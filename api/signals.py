@@ -0,0 +1,86 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import catalog, events
+from .hackathon import participant_deleted, team_deleted
+from .jobs import enqueue
+from .models import (
+    CareerApplication,
+    CommunityItem,
+    ContactMessage,
+    Cpu,
+    CpuInquiry,
+    GalleryImage,
+    HackathonParticipant,
+    HackathonTeam,
+    MOU,
+    Project,
+)
+from .rollups import record
+from .snapshots import mark_stale
+
+
+@receiver(post_save, sender=GalleryImage)
+@receiver(post_save, sender=CommunityItem)
+def queue_image_metadata(sender, instance, **kwargs):
+    if instance.image_metadata_stale():
+        enqueue(
+            "images.extract_metadata",
+            model=sender._meta.label,
+            pk=instance.pk,
+        )
+
+
+@receiver(post_save, sender=MOU)
+def queue_pdf_preview(sender, instance, **kwargs):
+    if instance.pdf_preview_stale():
+        enqueue("mous.render_preview", pk=instance.pk)
+
+
+@receiver(post_save, sender=CareerApplication)
+@receiver(post_save, sender=ContactMessage)
+@receiver(post_save, sender=CpuInquiry)
+@receiver(post_save, sender=HackathonTeam)
+def count_submission(sender, instance, created, raw=False, **kwargs):
+    # Fixture loads (raw) are counted by `manage.py rebuild_stats`.
+    if created and not raw:
+        record(instance)
+
+
+@receiver(post_save, sender=CareerApplication)
+@receiver(post_save, sender=ContactMessage)
+@receiver(post_save, sender=CpuInquiry)
+@receiver(post_save, sender=HackathonTeam)
+def publish_submission_event(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        events.record(instance)
+
+
+@receiver(post_save, sender=MOU)
+@receiver(post_save, sender=GalleryImage)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=CommunityItem)
+@receiver(post_delete, sender=MOU)
+@receiver(post_delete, sender=GalleryImage)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=CommunityItem)
+def republish_snapshots(sender, **kwargs):
+    mark_stale(sender._meta.label)
+
+
+@receiver(post_save, sender=Cpu)
+@receiver(post_delete, sender=Cpu)
+def invalidate_cpu_catalog(sender, **kwargs):
+    transaction.on_commit(catalog.invalidate)
+
+
+# Deletions from anywhere (API, admin, cascades) give seats back.
+@receiver(post_delete, sender=HackathonParticipant)
+def release_participant(sender, instance, **kwargs):
+    participant_deleted(instance)
+
+
+@receiver(post_delete, sender=HackathonTeam)
+def release_team(sender, instance, **kwargs):
+    team_deleted(instance)
@@ -0,0 +1,256 @@
+"""
+Static snapshots of the public content feeds.
+
+Each feed's list response is rendered through its real view and written
+to SNAPSHOT_ROOT as ``<feed>.<hash>.json`` with gzip/brotli variants,
+and ``manifest.json`` points at the current file of every feed. The
+snapshot middleware (api/middleware.py) serves these files, with the
+versioned ones cached forever, so reading a feed never reaches a view.
+
+Snapshots live on each instance's own disk, so a change bumps the
+feed's FeedVersion row in the same transaction. The process that made
+the change publishes once it commits; every other web instance (and
+the one whose change came from ``manage.py runworker``) notices within
+SNAPSHOT_CHECK_INTERVAL seconds, when a snapshot request finds its
+manifest behind the database, and publishes then. ``manage.py
+publish_snapshots`` publishes unconditionally. A feed whose content has
+not changed keeps its file and manifest entry.
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.db.models import F
+from django.urls import resolve
+from django.utils import timezone
+
+from .models import FeedVersion
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+# feed name: API path whose response is published
+FEEDS = {
+    "mous": "/api/mous/",
+    "gallery": "/api/gallery/",
+    "projects": "/api/projects/",
+    "giveback": "/api/giveback/",
+}
+
+# Models whose changes make a feed stale.
+FEED_MODELS = {
+    "api.MOU": ["mous"],
+    "api.GalleryImage": ["gallery"],
+    "api.Project": ["projects"],
+    "api.CommunityItem": ["giveback"],
+}
+
+_pending = threading.local()
+_check_lock = threading.Lock()
+_checked = float("-inf")
+
+
+def _request(path):
+    """A GET request for ``path`` as if made to SNAPSHOT_BASE_URL."""
+    url = urlsplit(settings.SNAPSHOT_BASE_URL)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    return WSGIRequest({
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": url.hostname,
+        "SERVER_PORT": str(port),
+        "HTTP_HOST": url.netloc,
+        "wsgi.url_scheme": url.scheme,
+        "wsgi.input": BytesIO(),
+    })
+
+
+def render_feed(feed):
+    """The body of the feed's API response, exactly as the view returns it."""
+    return render_path(FEEDS[feed])
+
+
+def render_path(path):
+    """The body of the GET response for ``path``, straight from its view."""
+    match = resolve(path)
+    response = match.func(_request(path), *match.args, **match.kwargs)
+    response.render()
+    if response.status_code != 200:
+        raise RuntimeError(f"{path} answered {response.status_code}")
+    return response.content
+
+
+@contextmanager
+def _publish_lock():
+    # Publishers in other workers/processes rewrite the same manifest.
+    os.makedirs(settings.SNAPSHOT_ROOT, exist_ok=True)
+    with open(os.path.join(settings.SNAPSHOT_ROOT, ".lock"), "w") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _write_atomic(path, data):
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, "wb") as handle:
+        handle.write(data)
+    os.replace(temp_path, path)
+
+
+def read_manifest():
+    try:
+        with open(os.path.join(settings.SNAPSHOT_ROOT, MANIFEST), encoding="utf-8") as handle:
+            return json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return {"feeds": {}}
+
+
+def _prune(feed, keep_names):
+    """Remove old versions of a feed, keeping the newest SNAPSHOT_KEEP."""
+    files = sorted(
+        (
+            entry for entry in os.scandir(settings.SNAPSHOT_ROOT)
+            if entry.name.startswith(f"{feed}.") and entry.name.endswith(".json")
+        ),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in files[settings.SNAPSHOT_KEEP:]:
+        if entry.name in keep_names:
+            continue
+        for suffix in ("", ".gz", ".br"):
+            try:
+                os.remove(entry.path + suffix)
+            except FileNotFoundError:
+                pass
+
+
+def versions(feeds=None):
+    """The current FeedVersion of ``feeds`` (all by default); 0 if never changed."""
+    feeds = feeds or list(FEEDS)
+    found = dict(FeedVersion.objects.filter(feed__in=feeds).values_list("feed", "version"))
+    return {feed: found.get(feed, 0) for feed in feeds}
+
+
+def bump(feeds):
+    FeedVersion.objects.bulk_create(
+        [FeedVersion(feed=feed) for feed in feeds], ignore_conflicts=True
+    )
+    FeedVersion.objects.filter(feed__in=feeds).update(version=F("version") + 1)
+
+
+def publish(feeds=None):
+    """Render and write ``feeds`` (all by default). Returns the feeds that changed."""
+    # Imported here: only publishers need the compressor.
+    from whitenoise.compress import Compressor
+
+    feeds = feeds or list(FEEDS)
+    compressor = Compressor(quiet=True)
+    changed = []
+    with _publish_lock():
+        manifest = read_manifest()
+        # Versions first: a change made while rendering shows up as a
+        # newer version on the next check.
+        current = versions(feeds)
+        updated = False
+        for feed in feeds:
+            body = render_feed(feed)
+            digest = hashlib.sha256(body).hexdigest()[:16]
+            name = f"{feed}.{digest}.json"
+            path = os.path.join(settings.SNAPSHOT_ROOT, name)
+            entry = manifest["feeds"].get(feed, {})
+            if entry.get("hash") == digest and os.path.exists(path):
+                if entry.get("version") != current[feed]:
+                    entry["version"] = current[feed]
+                    updated = True
+                continue
+
+            _write_atomic(path, body)
+            compressor.compress(path)
+            manifest["feeds"][feed] = {
+                "url": settings.SNAPSHOT_URL + name,
+                "hash": digest,
+                "version": current[feed],
+                "bytes": len(body),
+                "published_at": timezone.now().isoformat(),
+            }
+            changed.append(feed)
+            _prune(feed, {name})
+
+        if changed:
+            manifest["published_at"] = timezone.now().isoformat()
+        if changed or updated:
+            _write_atomic(
+                os.path.join(settings.SNAPSHOT_ROOT, MANIFEST),
+                json.dumps(manifest, indent=1).encode(),
+            )
+    return changed
+
+
+def _publish_pending():
+    feeds = sorted(_pending.__dict__.pop("feeds", ()))
+    if not feeds:
+        return
+    try:
+        publish(feeds)
+    except Exception:
+        # The change itself is committed; `manage.py publish_snapshots`
+        # catches the snapshots up.
+        logger.exception("Publishing snapshots %s failed", feeds)
+
+
+def catch_up():
+    """Publish feeds changed by other processes, checking at most every SNAPSHOT_CHECK_INTERVAL seconds."""
+    global _checked
+    if (
+        not settings.SNAPSHOT_PUBLISH_ON_SAVE
+        or time.monotonic() - _checked < settings.SNAPSHOT_CHECK_INTERVAL
+    ):
+        return []
+    with _check_lock:
+        if time.monotonic() - _checked < settings.SNAPSHOT_CHECK_INTERVAL:
+            return []
+        _checked = time.monotonic()
+        try:
+            published = read_manifest()["feeds"]
+            stale = [
+                feed for feed, version in versions().items()
+                if published.get(feed, {}).get("version") != version
+            ]
+            return publish(stale) if stale else []
+        except Exception:
+            # The snapshots already on disk are still served.
+            logger.exception("Catching up snapshots failed")
+            return []
+
+
+def mark_stale(model_label):
+    """Bump the feeds built from ``model_label`` and republish them once the transaction commits.
+
+    Several changes in one transaction (an admin bulk action, say)
+    publish each feed once.
+    """
+    feeds = FEED_MODELS.get(model_label, [])
+    if not feeds:
+        return
+    bump(feeds)
+    if not settings.SNAPSHOT_PUBLISH_ON_SAVE:
+        return
+    _pending.__dict__.setdefault("feeds", set()).update(feeds)
+    callbacks = transaction.get_connection().run_on_commit
+    if not any(callback is _publish_pending for _, callback, _ in callbacks):
+        transaction.on_commit(_publish_pending)
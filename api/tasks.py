@@ -0,0 +1,114 @@
+from urllib.parse import urljoin
+
+from django.apps import apps
+from django.urls import reverse
+
+from .bulk import build_queryset, bulk_delete, bulk_export
+from .imaging import read_image_metadata
+from .jobs import current_job, report_progress, task
+from .notifier import notify, send_digest
+from .pdfpreview import read_pdf_preview
+from .retention import archive_queryset
+from .snapshots import mark_stale
+from .models import (
+    CareerApplication,
+    ContactMessage,
+    CpuInquiry,
+    HackathonTeam,
+    MOU,
+)
+
+
+@task("notify.career_application")
+def notify_career_application(pk, base_url=""):
+    obj = CareerApplication.objects.filter(pk=pk).first()
+    if obj is None:
+        return
+
+    resume_url = ""
+    if obj.resume:
+        # Storage URLs are absolute on S3, site-relative on disk.
+        resume_url = urljoin(base_url, obj.resume.url)
+
+    notify("career", "career_application", {"application": obj, "resume_url": resume_url})
+
+
+@task("notify.contact_message")
+def notify_contact_message(pk):
+    obj = ContactMessage.objects.filter(pk=pk).first()
+    if obj is None:
+        return
+
+    notify("contact", "contact_message", {"contact": obj})
+
+
+@task("notify.cpu_inquiry")
+def notify_cpu_inquiry(pk):
+    obj = CpuInquiry.objects.filter(pk=pk).first()
+    if obj is None:
+        return
+
+    notify("cpu", "cpu_inquiry", {"inquiry": obj})
+
+
+@task("notify.hackathon_registration")
+def notify_hackathon_registration(pk):
+    team = HackathonTeam.objects.filter(pk=pk).first()
+    if team is None:
+        return
+
+    notify("hackathon", "hackathon_registration", {
+        "team": team,
+        "participants": team.participants.order_by("role", "id"),
+    })
+
+
+@task("notify.digest")
+def notify_digest(channel):
+    sent = send_digest(channel)
+    report_progress(sent=sent)
+
+
+@task("images.extract_metadata")
+def extract_image_metadata(model, pk):
+    model_class = apps.get_model(model)
+    obj = model_class.objects.filter(pk=pk).first()
+    if obj is None or not obj.image_metadata_stale():
+        return
+
+    metadata = read_image_metadata(obj.image)
+    # update() rather than save(): no post_save, and a no-op if the image
+    # was replaced while we were reading it.
+    if model_class.objects.filter(pk=pk, image=obj.image.name).update(**metadata):
+        mark_stale(model)
+
+
+@task("mous.render_preview")
+def render_mou_preview(pk):
+    mou = MOU.objects.filter(pk=pk).first()
+    if mou is None or not mou.pdf_preview_stale():
+        return
+
+    preview = read_pdf_preview(mou.pdf)
+    # As for images: no post_save, and a no-op if the PDF was replaced.
+    if MOU.objects.filter(pk=pk, pdf=mou.pdf.name).update(**preview):
+        mark_stale("api.MOU")
+
+
+BULK_OPERATIONS = {
+    "delete": bulk_delete,
+    "export": bulk_export,
+    "archive": archive_queryset,
+}
+
+
+@task("bulk.run")
+def run_bulk_operation(operation, model, **selection):
+    queryset = build_queryset(model, **selection)
+    result = BULK_OPERATIONS[operation](queryset, progress=report_progress)
+    progress = {"result": result}
+    job = current_job()
+    if operation == "export" and job is not None:
+        # The file itself is private; staff fetch it through the job.
+        progress["download"] = reverse("job-download", args=[job.pk])
+    report_progress(**progress)
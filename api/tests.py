@@ -1,3 +1,1431 @@
-from django.test import TestCase
+import base64
+import csv
+import importlib.util
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date, datetime, time, timedelta
+from unittest import mock, skipUnless
+from urllib.parse import urlencode
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core import signing
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.http import Http404
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.views.static import serve
+
+from . import (
+    catalog,
+    direct_uploads,
+    events,
+    hackathon,
+    imaging,
+    jobs,
+    notifier,
+    partitioning,
+    pdfpreview,
+    rollups,
+    snapshots,
+    tasks,
+    uploads,
+    warmup,
+)
+from .admission import load_classes
+from .bulk import bulk_delete, bulk_export, iter_chunks
+from .retention import aged_queryset, archive_queryset, with_archived
+from .management.commands.runworker import work
+from .transactions import write_transaction
+from .models import (
+    CareerApplication,
+    ContactMessage,
+    Cpu,
+    CpuInquiry,
+    HackathonEvent,
+    HackathonParticipant,
+    HackathonTeam,
+    ArchivedSubmission,
+    DailyStat,
+    GalleryImage,
+    Job,
+    MOU,
+    NotificationDelivery,
+    PendingNotification,
+    Project,
+    RequestProfile,
+    SubmissionEvent,
+    UploadSession,
+)
+
+
+@jobs.task("tests.succeed")
+def succeed():
+    pass
+
+
+@jobs.task("tests.fail")
+def fail():
+    raise RuntimeError("boom")
+
+
+class AdminChangelistQueryCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        start = ContactMessage.objects.count()
+        for i in range(start, start + count):
+            ContactMessage.objects.create(
+                name=f"Name {i}", email=f"c{i}@example.com", phone="9999999999",
+                subject="Hello", message="x" * 500,
+            )
+            CareerApplication.objects.create(
+                full_name=f"Name {i}", email=f"a{i}@example.com", phone="9999999999",
+                college="College", cgpa="9", year_of_passing=2025, skills="python",
+                resume="resume/cv.pdf",
+            )
+            CpuInquiry.objects.create(
+                full_name=f"Name {i}", email=f"q{i}@example.com", phone="9999999999",
+                cpu_model="i5", quantity=1, ram="8GB", storage="256GB",
+            )
+            team = HackathonTeam.objects.create(team_name=f"Team {i}", total_participants=1)
+            HackathonParticipant.objects.create(
+                team=team, role="LEADER", full_name=f"Name {i}", email=f"h{i}@example.com",
+                phone="9999999999", branch="CSE", section="A", year="3",
+            )
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_table_size(self):
+        urls = [
+            "/admin/api/contactmessage/",
+            "/admin/api/careerapplication/",
+            "/admin/api/cpuinquiry/",
+            "/admin/api/hackathonparticipant/",
+        ]
+        self.add_rows(3)
+        small = {url: self.changelist_queries(url) for url in urls}
+        self.add_rows(40)
+        large = {url: self.changelist_queries(url) for url in urls}
+        self.assertEqual(small, large)
+
+    def test_contact_message_list_is_truncated(self):
+        self.add_rows(1)
+        response = self.client.get("/admin/api/contactmessage/")
+        self.assertNotContains(response, "x" * 81)
+        self.assertContains(response, "x" * 80 + "…")
+
+    def test_preview_of_exactly_full_length_has_no_ellipsis(self):
+        ContactMessage.objects.create(
+            name="Exact", email="exact@example.com", phone="9999999999", message="y" * 80,
+        )
+        response = self.client.get("/admin/api/contactmessage/")
+        self.assertContains(response, "y" * 80)
+        self.assertNotContains(response, "y" * 80 + "…")
+
+
+@override_settings(JOBS_RUN_INLINE=False, JOBS_RETRY_BACKOFF=30)
+class JobQueueTests(TestCase):
+
+    def test_claim_takes_each_ready_job_once(self):
+        job = jobs.enqueue("tests.succeed")
+        jobs.enqueue("tests.succeed", delay=timedelta(hours=1))
+
+        claimed = jobs.claim_next("w1")
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual((claimed.status, claimed.locked_by, claimed.attempts), ("running", "w1", 1))
+        # The other job isn't due yet.
+        self.assertIsNone(jobs.claim_next("w2"))
+
+    def test_failures_back_off_then_dead_letter(self):
+        job = jobs.enqueue("tests.fail", max_attempts=2)
+
+        before = timezone.now()
+        with self.assertLogs("api.jobs", "ERROR"):
+            self.assertFalse(jobs.run_job(jobs.claim_next("w")))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "queued")
+        self.assertIn("boom", job.last_error)
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=30))
+        self.assertIsNone(jobs.claim_next("w"))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs("api.jobs", "ERROR"):
+            self.assertFalse(jobs.run_job(jobs.claim_next("w")))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("dead", 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_worker_requeues_jobs_of_dead_workers(self):
+        job = jobs.enqueue("tests.succeed")
+        Job.objects.filter(pk=job.pk).update(
+            status="running", locked_by="gone", locked_at=timezone.now() - timedelta(hours=1)
+        )
+
+        with self.assertLogs("api.management.commands.runworker", "WARNING"):
+            work(threading.Event(), poll_interval=0, burst=True)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("done", 1))
+
+    def test_reporting_progress_keeps_a_long_job_claimed(self):
+        job = jobs.claim(jobs.enqueue("tests.succeed").pk, "w")
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        with mock.patch.object(jobs._current, "job", job, create=True):
+            jobs.report_progress(done=1, total=10)
+        self.assertEqual(jobs.requeue_stale(), (0, 0))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress), ("running", {"done": 1, "total": 10}))
+
+    def test_stale_job_out_of_attempts_is_dead_lettered(self):
+        job = jobs.enqueue("tests.succeed", max_attempts=2)
+        Job.objects.filter(pk=job.pk).update(
+            status="running", attempts=2, locked_by="gone",
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(jobs.requeue_stale(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), ("dead", ""))
+        self.assertIsNotNone(job.finished_at)
+        self.assertIsNone(jobs.claim_next("w"))
+
+
+@override_settings(JOBS_RUN_INLINE=False)
+class BulkDeleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", "staff@example.com", "pw", is_staff=True)
+        for i in range(7):
+            ContactMessage.objects.create(
+                name=f"Name {i}", email=f"c{i}@example.com", phone="9999999999", message="Hi",
+            )
+
+    def test_chunks_walk_every_row_once_by_pk(self):
+        chunks = list(iter_chunks(ContactMessage.objects.all(), "email", chunk_size=3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        pks = [row["pk"] for chunk in chunks for row in chunk]
+        self.assertEqual(pks, sorted(ContactMessage.objects.values_list("pk", flat=True)))
+
+    def test_bulk_delete_removes_the_selection_and_reports_progress(self):
+        keep = ContactMessage.objects.order_by("pk").last()
+        progress = []
+        deleted = bulk_delete(
+            ContactMessage.objects.exclude(pk=keep.pk),
+            progress=lambda **values: progress.append(values),
+        )
+        self.assertEqual(deleted, 6)
+        self.assertEqual(list(ContactMessage.objects.all()), [keep])
+        self.assertEqual(progress[-1], {"done": 6, "total": 6})
+
+    def test_bulk_delete_request_requires_staff(self):
+        body = {"before": "2100-01-01T00:00:00Z"}
+        response = self.client.delete("/api/contact/", body, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Job.objects.exists())
+
+        self.client.force_login(self.staff)
+        response = self.client.delete("/api/contact/", body, content_type="application/json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Job.objects.get().payload["operation"], "delete")
+
+    def admin_action(self, query, **data):
+        admin_user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(admin_user)
+        first = ContactMessage.objects.order_by("pk").first()
+        body = {"action": "bulk_delete", "index": 0, "_selected_action": [first.pk], **data}
+        self.client.post(f"/admin/api/contactmessage/?{urlencode(query)}", body)
+        return Job.objects.get()
+
+    def test_admin_select_across_queues_a_range_not_every_pk(self):
+        now = timezone.now()
+        job = self.admin_action(
+            {"q": "Name 1", "created_at__year": now.year},
+            select_across="1",
+        )
+        self.assertNotIn("ids", job.payload)
+        self.assertEqual(job.payload["search"], "Name 1")
+        # A row added after the click is left alone.
+        ContactMessage.objects.create(
+            name="Name 10", email="late@example.com", phone="9999999999", message="Hi",
+        )
+        jobs.run_job(jobs.claim(job.pk, "test"))
+        self.assertFalse(ContactMessage.objects.filter(name="Name 1").exists())
+        self.assertEqual(ContactMessage.objects.count(), 7)
+
+    def test_admin_page_selection_queues_the_ids(self):
+        job = self.admin_action({})
+        self.assertEqual(job.payload["ids"], [ContactMessage.objects.order_by("pk").first().pk])
+
+    def test_job_status_requires_staff(self):
+        job = jobs.enqueue("tests.succeed")
+        self.assertEqual(self.client.get(f"/api/jobs/{job.pk}/").status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(f"/api/jobs/{job.pk}/").status_code, 200)
+
+
+@override_settings(JOBS_RUN_INLINE=False)
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", "staff@example.com", "pw", is_staff=True)
+        for i in range(3):
+            ContactMessage.objects.create(
+                name=f"Visitor {i}", email=f"c{i}@example.com", phone="9999999999", message="Hi",
+            )
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        override = override_settings(
+            MEDIA_ROOT=os.path.join(root, "media"),
+            STORAGES=dict(settings.STORAGES, exports={
+                "BACKEND": "django.core.files.storage.FileSystemStorage",
+                "OPTIONS": {"location": os.path.join(root, "exports"), "base_url": None},
+            }),
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def run_export(self):
+        job = jobs.enqueue("bulk.run", operation="export", model="api.ContactMessage")
+        jobs.run_job(jobs.claim(job.pk, "test"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "done")
+        return job
+
+    def test_export_is_private_and_unguessable(self):
+        job = self.run_export()
+        name = job.progress["result"]
+        self.assertRegex(name, r"^api-contactmessage-\d{8}-\d{6}-[\w-]{22}\.csv$")
+        self.assertFalse(default_storage.exists(name))
+        # What serves MEDIA_URL when DEBUG is on.
+        with self.assertRaises(Http404):
+            serve(RequestFactory().get(settings.MEDIA_URL + name), name, document_root=settings.MEDIA_ROOT)
+
+    def test_staff_download_the_export_through_the_job(self):
+        job = self.run_export()
+        url = job.progress["download"]
+        self.assertEqual(url, f"/api/jobs/{job.pk}/download/")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment", response["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual([row["name"] for row in rows], ["Visitor 0", "Visitor 1", "Visitor 2"])
+
+    def test_only_finished_exports_can_be_downloaded(self):
+        self.client.force_login(self.staff)
+        delete = jobs.enqueue("bulk.run", operation="delete", model="api.ContactMessage", ids=[])
+        self.assertEqual(self.client.get(f"/api/jobs/{delete.pk}/download/").status_code, 404)
+        export = jobs.enqueue("bulk.run", operation="export", model="api.ContactMessage")
+        self.assertEqual(self.client.get(f"/api/jobs/{export.pk}/download/").status_code, 404)
+
+
+class ArchiveTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", "staff@example.com", "pw", is_staff=True)
+        now = timezone.now()
+        for days in (1, 2, 400, 500, 600):
+            message = ContactMessage.objects.create(
+                name=f"Sent {days} days ago", email="c@example.com", phone="9999999999",
+                message="Hello",
+            )
+            ContactMessage.objects.filter(pk=message.pk).update(
+                created_at=now - timedelta(days=days)
+            )
+
+    def archive(self):
+        return archive_queryset(aged_queryset("api.ContactMessage"), backend="table")
+
+    def test_aged_rows_move_to_the_archive_table(self):
+        self.assertEqual(self.archive(), 3)
+        self.assertEqual(ContactMessage.objects.count(), 2)
+        self.assertEqual(ArchivedSubmission.objects.filter(model="api.ContactMessage").count(), 3)
+
+    def test_archived_rows_come_back_merged_newest_first(self):
+        original = {obj.pk: obj.name for obj in ContactMessage.objects.all()}
+        self.archive()
+
+        rows = with_archived(ContactMessage.objects.order_by("-created_at"), limit=10)
+        self.assertEqual({obj.pk: obj.name for obj in rows}, original)
+        self.assertEqual(
+            [obj.name for obj in rows],
+            [f"Sent {days} days ago" for days in (1, 2, 400, 500, 600)],
+        )
+
+    def page_through(self):
+        self.client.force_login(self.staff)
+        names, url = [], "/api/contact/?include_archived=1"
+        while url:
+            response = self.client.get(url)
+            names += [row["name"] for row in response.json()]
+            cursor = response.headers.get("X-Next-Before")
+            url = cursor and "/api/contact/?" + urlencode({
+                "include_archived": 1,
+                "before": cursor,
+                "before_id": response.headers["X-Next-Before-Id"],
+            })
+        return names
+
+    @override_settings(ARCHIVE_PAGE_SIZE=2)
+    def test_listing_pages_with_a_date_cursor(self):
+        self.archive()
+        self.assertEqual(
+            self.page_through(), [f"Sent {days} days ago" for days in (1, 2, 400, 500, 600)]
+        )
+
+    @override_settings(ARCHIVE_PAGE_SIZE=2)
+    def test_rows_sharing_a_date_across_pages_are_all_listed(self):
+        ContactMessage.objects.filter(
+            name__in=["Sent 400 days ago", "Sent 500 days ago", "Sent 600 days ago"]
+        ).update(created_at=timezone.now() - timedelta(days=450))
+        self.archive()
+        names = self.page_through()
+        self.assertEqual(names[:2], ["Sent 1 days ago", "Sent 2 days ago"])
+        self.assertEqual(
+            sorted(names[2:]), ["Sent 400 days ago", "Sent 500 days ago", "Sent 600 days ago"]
+        )
+
+    @override_settings(ARCHIVE_PAGE_SIZE=2)
+    def test_jsonl_archive_is_listed_too(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(ARCHIVE_ROOT=root):
+            archive_queryset(
+                aged_queryset("api.ContactMessage").filter(name="Sent 600 days ago"), backend="jsonl"
+            )
+            self.archive()
+            self.assertEqual(
+                self.page_through(), [f"Sent {days} days ago" for days in (1, 2, 400, 500, 600)]
+            )
+
+
+@skipUnless(
+    connection.vendor == "postgresql",
+    "Partitioning is Postgres-only; run the tests with RENDER=true and a Postgres DATABASE_URL",
+)
+class PartitioningTests(TestCase):
+    table = "api_contactmessage"
+
+    def indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes WHERE tablename = %s AND indexname NOT LIKE %s",
+                [self.table, "%pkey"],
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    def add_message(self, when):
+        message = ContactMessage.objects.create(
+            name="Name", email="c@example.com", phone="9999999999", message="Hi",
+        )
+        ContactMessage.objects.filter(pk=message.pk).update(created_at=when)
+        return message
+
+    def test_convert_keeps_rows_and_indexes(self):
+        old = self.add_message(timezone.now() - timedelta(days=400))
+        new = self.add_message(timezone.now())
+        indexes = self.indexes()
+        self.assertTrue(indexes)
+
+        partitioning.convert_table("api.ContactMessage", months_ahead=1)
+
+        self.assertTrue(partitioning.is_partitioned(self.table))
+        self.assertEqual(self.indexes(), indexes)
+        self.assertEqual(
+            set(ContactMessage.objects.values_list("pk", flat=True)), {old.pk, new.pk}
+        )
+        self.assertGreater(self.add_message(timezone.now()).pk, new.pk)
+
+    def test_new_partition_takes_its_rows_from_the_default_partition(self):
+        partitioning.convert_table("api.ContactMessage", months_ahead=0)
+        month = partitioning.add_months(partitioning.month_start(date.today()), 3)
+        message = self.add_message(timezone.make_aware(datetime.combine(month, time(12))))
+
+        partitioning.ensure_partitions("api.ContactMessage", months_ahead=3)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id FROM {partitioning.partition_name(self.table, month)}"
+            )
+            self.assertEqual(cursor.fetchall(), [(message.pk,)])
+            cursor.execute(f"SELECT count(*) FROM {partitioning.default_partition_name(self.table)}")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+
+def person(number, **fields):
+    return {
+        "full_name": f"Person {number}", "email": f"p{number}@example.com",
+        "phone": f"90000000{number:02d}", "branch": "CSE", "section": "A", "year": "3",
+        **fields,
+    }
+
+
+@override_settings(JOBS_RUN_INLINE=False)
+class HackathonRegistrationTests(TestCase):
+
+    def setUp(self):
+        self.event = HackathonEvent.objects.create(name="Hack", slug="hack", capacity=3)
+
+    def register(self, *people):
+        return self.client.post(
+            "/api/hackathonregister/",
+            {
+                "teamName": "Team",
+                "totalParticipants": len(people),
+                "leader": people[0],
+                "members": list(people[1:]),
+            },
+            content_type="application/json",
+        )
+
+    def stats(self):
+        return self.client.get("/api/hackathon/stats/").json()
+
+    def test_registration_over_capacity_is_refused(self):
+        self.assertEqual(self.register(person(1), person(2)).status_code, 201)
+        response = self.register(person(3), person(4))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(HackathonParticipant.objects.count(), 2)
+        self.assertEqual(self.stats()["remaining_seats"], 1)
+
+    def test_counters_follow_registrations_and_deletions(self):
+        self.register(person(1), person(2, branch="ECE"))
+        self.assertEqual(self.stats()["by_branch"], {"CSE": 1, "ECE": 1})
+
+        # Deleted directly, as the admin does.
+        HackathonParticipant.objects.get(email="p2@example.com").delete()
+        stats = self.stats()
+        self.assertEqual((stats["registered_teams"], stats["registered_participants"]), (1, 1))
+        self.assertEqual(stats["by_branch"], {"CSE": 1})
+
+        HackathonTeam.objects.get().delete()
+        stats = self.stats()
+        self.assertEqual((stats["registered_teams"], stats["registered_participants"]), (0, 0))
+        self.assertEqual(stats["by_branch"], {})
+
+    def test_already_registered_participants_get_409(self):
+        self.register(person(1))
+        response = self.register(person(2), person(3, email=" P1@Example.com"))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["emails"], ["p1@example.com"])
+
+    def test_duplicate_found_only_by_the_constraint_is_reported(self):
+        self.register(person(1))
+        taken = hackathon.find_registered(self.event, self._participants(person(1)))
+        # As if the other registration committed after the pre-check.
+        with mock.patch.object(
+            hackathon, "find_registered", side_effect=[(set(), set()), taken]
+        ):
+            with self.assertRaises(hackathon.DuplicateParticipant) as raised:
+                self.register_directly(person(1))
+        self.assertEqual(raised.exception.emails, ["p1@example.com"])
+
+    def test_other_integrity_errors_are_not_reported_as_duplicates(self):
+        with mock.patch.object(
+            HackathonParticipant.objects, "bulk_create", side_effect=IntegrityError("other")
+        ):
+            with self.assertRaises(IntegrityError):
+                self.register_directly(person(1))
+
+    def _participants(self, *people):
+        participants = [HackathonParticipant(event=self.event, **fields) for fields in people]
+        for participant in participants:
+            participant.normalize_contact()
+        return participants
+
+    def register_directly(self, leader):
+        return hackathon.register_team(self.event, "Team", 1, leader, [])
+
+    def test_stats_without_an_event_do_not_create_one(self):
+        self.event.delete()
+        self.assertEqual(self.client.get("/api/hackathon/stats/").status_code, 404)
+        self.assertFalse(HackathonEvent.objects.exists())
+
+
+class RollupTests(TestCase):
+
+    def counters(self):
+        return set(DailyStat.objects.values_list("metric", "day", "key", "count", "quantity"))
+
+    def inquire(self, cpu_model, quantity):
+        return CpuInquiry.objects.create(
+            full_name="Buyer", email="b@example.com", phone="9999999999",
+            cpu_model=cpu_model, quantity=quantity, ram="8GB", storage="256GB",
+        )
+
+    def test_new_rows_are_counted_as_they_arrive(self):
+        self.inquire("i5", 1)
+        self.inquire("i5", 2)
+        self.inquire("i7", 3)
+        today = timezone.localdate()
+        self.assertEqual(self.counters(), {
+            ("cpu_inquiries", today, "i5", 2, 3),
+            ("cpu_inquiries", today, "i7", 1, 3),
+        })
+
+    def test_rebuild_recounts_live_and_archived_rows(self):
+        old = self.inquire("i5", 4)
+        then = timezone.now() - timedelta(days=400)
+        CpuInquiry.objects.filter(pk=old.pk).update(created_at=then)
+        self.inquire("i7", 1)
+        archive_queryset(aged_queryset("api.CpuInquiry"), backend="table")
+        DailyStat.objects.all().delete()
+
+        rollups.rebuild(["cpu_inquiries"])
+
+        self.assertEqual(self.counters(), {
+            ("cpu_inquiries", timezone.localdate(then), "i5", 1, 4),
+            ("cpu_inquiries", timezone.localdate(), "i7", 1, 1),
+        })
+
+    def test_rebuild_of_recent_days_keeps_older_counters(self):
+        self.inquire("i5", 1)
+        DailyStat.objects.create(
+            metric="cpu_inquiries", day=timezone.localdate() - timedelta(days=30), key="old", count=9,
+        )
+        DailyStat.objects.filter(key="i5").update(count=100)
+
+        rollups.rebuild(["cpu_inquiries"], days=7)
+
+        self.assertEqual(
+            dict(DailyStat.objects.values_list("key", "count")), {"i5": 1, "old": 9}
+        )
+
+
+@override_settings(
+    JOBS_RUN_INLINE=False,
+    NOTIFICATION_CHANNELS={"contact": [{"backend": "memory", "name": "staff"}]},
+    NOTIFY_DIGEST_THRESHOLD=2,
+)
+class NotifierTests(TestCase):
+
+    def setUp(self):
+        notifier.MemoryBackend.outbox.clear()
+        self.addCleanup(notifier.close_backends)
+
+    def message(self, number):
+        contact = ContactMessage.objects.create(
+            name=f"Visitor {number}", email="v@example.com", phone="9999999999", message="Hi",
+        )
+        tasks.notify_contact_message(contact.pk)
+
+    def test_message_is_rendered_and_delivered(self):
+        self.message(1)
+        [(options, message)] = notifier.MemoryBackend.outbox
+        self.assertEqual(options, {"name": "staff"})
+        self.assertIn("Visitor 1", message.text)
+        delivery = NotificationDelivery.objects.get()
+        self.assertEqual((delivery.channel, delivery.backend, delivery.status), ("contact", "memory", "sent"))
+
+    def test_messages_over_the_threshold_are_held_for_one_digest(self):
+        for number in range(4):
+            self.message(number)
+        self.assertEqual(len(notifier.MemoryBackend.outbox), 2)
+        self.assertEqual(PendingNotification.objects.count(), 2)
+        self.assertEqual(Job.objects.filter(name="notify.digest").count(), 1)
+
+        self.assertEqual(notifier.send_digest("contact"), 2)
+        _, digest = notifier.MemoryBackend.outbox[-1]
+        self.assertIn("Visitor 2", digest.text)
+        self.assertIn("Visitor 3", digest.text)
+        self.assertEqual(digest.items, 2)
+        self.assertFalse(PendingNotification.objects.exists())
+
+    def test_failed_delivery_is_recorded_and_raised(self):
+        with mock.patch.object(
+            notifier.MemoryBackend, "send", side_effect=notifier.NotificationError("down")
+        ):
+            with self.assertRaises(notifier.NotificationError):
+                self.message(1)
+        delivery = NotificationDelivery.objects.get()
+        self.assertEqual((delivery.status, delivery.error), ("failed", "down"))
+
+
+@override_settings(JOBS_RUN_INLINE=False)
+class ResumableUploadTests(TestCase):
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        override = override_settings(
+            UPLOAD_TEMP_DIR=os.path.join(root, "parts"), MEDIA_ROOT=os.path.join(root, "media")
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def create(self, length, filename="cv.pdf"):
+        metadata = "filename " + base64.b64encode(filename.encode()).decode()
+        response = self.client.post(
+            "/api/uploads/", headers={"Upload-Length": str(length), "Upload-Metadata": metadata}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response["Upload-Offset"], "0")
+        return response["Location"]
+
+    def patch(self, location, offset, data):
+        return self.client.patch(
+            location, data, content_type="application/offset+octet-stream",
+            headers={"Upload-Offset": str(offset), "Tus-Resumable": "1.0.0"},
+        )
+
+    def test_upload_resumes_from_the_stored_offset(self):
+        body = b"%PDF-1.4 " + b"x" * 100
+        location = self.create(len(body))
+
+        response = self.patch(location, 0, body[:40])
+        self.assertEqual((response.status_code, response["Upload-Offset"]), (204, "40"))
+
+        # After a dropped connection the client asks where to carry on.
+        response = self.client.head(location)
+        self.assertEqual((response["Upload-Offset"], response["Upload-Length"]), ("40", str(len(body))))
+
+        response = self.patch(location, 40, body[40:])
+        self.assertEqual((response.status_code, response["Upload-Offset"]), (204, str(len(body))))
+        session = UploadSession.objects.get()
+        self.assertIsNotNone(session.completed_at)
+        with open(uploads.part_path(session.pk), "rb") as handle:
+            self.assertEqual(handle.read(), body)
+
+    def test_patch_at_a_stale_offset_conflicts(self):
+        location = self.create(10)
+        self.patch(location, 0, b"12345")
+        response = self.patch(location, 0, b"12345")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(UploadSession.objects.get().offset, 5)
+
+    def test_patch_past_the_length_is_rejected(self):
+        location = self.create(4)
+        self.assertEqual(self.patch(location, 0, b"12345").status_code, 400)
+
+    def test_finished_upload_is_submitted_in_place_of_the_file(self):
+        body = b"%PDF-1.4 resume"
+        location = self.create(len(body))
+        self.patch(location, 0, body)
+        session = UploadSession.objects.get()
+
+        response = self.client.post("/api/apply/", {
+            "full_name": "Asha", "email": "asha@example.com", "phone": "9999999999",
+            "college": "College", "cgpa": "9", "year_of_passing": 2025, "skills": "python",
+            "resume_upload": str(session.pk),
+        })
+        self.assertEqual(response.status_code, 201)
+        application = CareerApplication.objects.get()
+        with application.resume.open("rb") as handle:
+            self.assertEqual(handle.read(), body)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(os.path.exists(uploads.part_path(session.pk)))
+
+    def test_unfinished_upload_cannot_be_submitted(self):
+        location = self.create(10)
+        self.patch(location, 0, b"12345")
+        response = self.client.post("/api/apply/", {
+            "full_name": "Asha", "email": "asha@example.com", "phone": "9999999999",
+            "college": "College", "cgpa": "9", "year_of_passing": 2025, "skills": "python",
+            "resume_upload": str(UploadSession.objects.get().pk),
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("resume_upload", response.json())
+
+
+class FeedVersionTests(TestCase):
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        override = override_settings(SNAPSHOT_ROOT=root, SNAPSHOT_CHECK_INTERVAL=0)
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+
+    def add_project(self, title):
+        return Project.objects.create(
+            title=title, client="Client", description="Work",
+            start_date=date(2026, 1, 1), end_date=date(2026, 6, 1),
+        )
+
+    def test_changes_bump_the_feed_version(self):
+        self.add_project("One")
+        project = self.add_project("Two")
+        project.delete()
+        self.assertEqual(snapshots.versions(["projects", "mous"]), {"projects": 3, "mous": 0})
+
+    def test_bundle_revalidates_against_the_feed_versions(self):
+        self.add_project("One")
+        response = self.client.get("/api/bundle/?sections=projects")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["projects"][0]["title"], "One")
+        etag = response["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/bundle/?sections=projects", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.add_project("Two")
+        response = self.client.get("/api/bundle/?sections=projects", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.json()["projects"]), 2)
+
+    def test_snapshot_request_catches_up_with_changes_from_other_processes(self):
+        snapshots.publish()
+        before = snapshots.read_manifest()["feeds"]["projects"]
+
+        # Saved without this instance publishing, as by the worker or
+        # another web instance: the version moves, the manifest doesn't.
+        self.add_project("One")
+        self.assertEqual(snapshots.read_manifest()["feeds"]["projects"], before)
+
+        response = self.client.get("/snapshots/manifest.json")
+        self.assertEqual(response.status_code, 200)
+        after = snapshots.read_manifest()["feeds"]["projects"]
+        self.assertEqual(after["version"], 1)
+        self.assertNotEqual(after["hash"], before["hash"])
+        self.assertEqual(self.client.get(after["url"]).status_code, 200)
+
+
+@skipUnless(connection.vendor == "sqlite", "BEGIN IMMEDIATE is SQLite's")
+@override_settings(SQLITE_IMMEDIATE_WRITES=True)
+class WriteTransactionTests(TransactionTestCase):
+
+    def begin(self, block):
+        with CaptureQueriesContext(connection) as queries:
+            with block():
+                ContactMessage.objects.count()
+        return queries[0]["sql"]
+
+    def test_write_blocks_take_the_write_lock_up_front(self):
+        self.assertEqual(self.begin(write_transaction), "BEGIN IMMEDIATE")
+        self.assertIsNone(connection.transaction_mode)
+
+    def test_other_atomic_blocks_begin_deferred(self):
+        self.assertEqual(self.begin(transaction.atomic), "BEGIN")
+
+    @override_settings(SQLITE_IMMEDIATE_WRITES=False)
+    def test_profile_without_immediate_writes_begins_deferred(self):
+        self.assertEqual(self.begin(write_transaction), "BEGIN")
+
+
+class SubmissionStreamTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def setUp(self):
+        # No watcher thread: the test database isn't shared with it.
+        patcher = mock.patch.object(events, "start_watcher")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def contact(self, number):
+        return ContactMessage.objects.create(
+            name=f"Visitor {number}", email="v@example.com", phone="9999999999", message="Hi",
+        )
+
+    def add_event(self, pk, age=timedelta(0)):
+        return SubmissionEvent.objects.create(
+            pk=pk, kind="contact", object_id=pk, created_at=timezone.now() - age
+        )
+
+    def test_sync_workers_refuse_the_stream(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get("/api/submissions/stream/").status_code, 501)
+
+    async def test_stream_resumes_after_the_cursor(self):
+        first = await sync_to_async(self.contact)(1)
+        second = await sync_to_async(self.contact)(2)
+        cursor = await SubmissionEvent.objects.aget(object_id=first.pk)
+        await self.async_client.aforce_login(self.admin)
+
+        response = await self.async_client.get(
+            "/api/submissions/stream/", headers={"Last-Event-ID": str(cursor.pk)}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b"retry: 3000\n\n")
+        event = (await anext(chunks)).decode()
+        self.assertTrue(event.startswith(f"id: {cursor.pk + 1}\nevent: contact\ndata: "))
+        self.assertEqual(json.loads(event.split("data: ", 1)[1])["id"], second.pk)
+
+    async def test_stream_is_for_staff(self):
+        response = await self.async_client.get("/api/submissions/stream/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_events_after_a_fresh_gap_are_held_back(self):
+        for pk in (1, 2, 4):
+            self.add_event(pk)
+        sent, held = events.committed_after(0)
+        self.assertEqual([event.pk for event in sent], [1, 2])
+        self.assertTrue(held)
+
+    def test_an_old_gap_was_a_rollback(self):
+        self.add_event(1)
+        self.add_event(3, age=events.SETTLE * 2)
+        sent, held = events.committed_after(0)
+        self.assertEqual([event.pk for event in sent], [1, 3])
+        self.assertFalse(held)
+
+
+def png(size=(40, 20), color="red"):
+    """A small generated PNG: ``color`` with a blue band down the left quarter."""
+    from PIL import Image
+
+    img = Image.new("RGB", size, color)
+    img.paste((0, 0, 255), (0, 0, size[0] // 4, size[1]))
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return ContentFile(buffer.getvalue(), name="photo.png")
+
+
+@override_settings(JOBS_RUN_INLINE=True, SNAPSHOT_PUBLISH_ON_SAVE=False)
+class ImageMetadataTests(TestCase):
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        override = override_settings(MEDIA_ROOT=root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_metadata_reads_size_format_and_colour(self):
+        upload = png()
+        name = default_storage.save("gallery/photo.png", upload)
+        image = GalleryImage(image=name)
+        metadata = imaging.read_image_metadata(image.image)
+        self.assertEqual(metadata["image_width"], 40)
+        self.assertEqual(metadata["image_height"], 20)
+        self.assertEqual(metadata["image_format"], "png")
+        self.assertEqual(metadata["image_bytes"], upload.size)
+        self.assertEqual(metadata["image_color"], "#ff0000")
+        self.assertEqual(metadata["image_meta_name"], name)
+
+    def test_blurhash_encodes_components_and_average_colour(self):
+        from PIL import Image
+
+        hash_ = imaging.blurhash(Image.new("RGB", (8, 8), (255, 0, 0)))
+        # Size flag for 4x3 components, then max AC, the DC colour and
+        # two characters per AC component.
+        self.assertEqual(len(hash_), 1 + 1 + 4 + 2 * 11)
+        self.assertEqual(hash_[0], "L")
+        self.assertEqual(hash_[2:6], imaging._base83(0xFF0000, 4))
+
+    def test_upload_fills_in_the_serialized_fields(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = GalleryImage.objects.create(title="Launch", category="Events", image=png())
+        image.refresh_from_db()
+        self.assertFalse(image.image_metadata_stale())
+
+        item = self.client.get("/api/gallery/").json()[0]
+        self.assertEqual(
+            {key: item[key] for key in ("image_width", "image_height", "image_format", "image_color")},
+            {"image_width": 40, "image_height": 20, "image_format": "png", "image_color": "#ff0000"},
+        )
+        self.assertEqual(item["image_bytes"], image.image.size)
+        self.assertEqual(len(item["image_blurhash"]), 28)
+
+
+@override_settings(JOBS_RUN_INLINE=True, SNAPSHOT_PUBLISH_ON_SAVE=False)
+class PdfPreviewTests(TestCase):
+
+    # Two page objects under one page tree, as the regex fallback sees them.
+    PDF = (
+        b"%PDF-1.4\n1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n"
+        b"2 0 obj << /Type /Pages /Kids [3 0 R 4 0 R] /Count 2 >> endobj\n"
+        b"3 0 obj << /Type /Page /Parent 2 0 R >> endobj\n"
+        b"4 0 obj << /Type/Page /Parent 2 0 R >> endobj\n%%EOF\n"
+    )
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        override = override_settings(MEDIA_ROOT=root)
+        override.enable()
+        self.addCleanup(override.disable)
+        # Whatever is installed here, start from "no pypdfium2".
+        patcher = mock.patch.object(pdfpreview, "_render_pdfium", side_effect=ImportError)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_mou(self, content=PDF):
+        with self.captureOnCommitCallbacks(execute=True):
+            mou = MOU.objects.create(
+                title="Cloud", category="cloud", description="", highlights=[],
+                icon="bi-cloud", start_date=date(2025, 1, 1),
+                pdf=ContentFile(content, name="mou.pdf"),
+            )
+        mou.refresh_from_db()
+        return mou
+
+    def test_without_a_renderer_pages_are_counted_from_the_file(self):
+        with mock.patch.object(pdfpreview.shutil, "which", return_value=None):
+            mou = self.create_mou()
+        self.assertEqual(mou.pdf_pages, 2)
+        self.assertEqual(mou.pdf_bytes, len(self.PDF))
+        self.assertEqual(mou.pdf_thumbnail.name, "")
+        self.assertFalse(mou.pdf_preview_stale())
+
+    def test_poppler_renders_a_webp_thumbnail(self):
+        from PIL import Image
+
+        page = Image.new("RGB", (pdfpreview.THUMBNAIL_WIDTH, 400), "white")
+        with mock.patch.object(pdfpreview.shutil, "which", return_value="/usr/bin/pdftoppm"), \
+                mock.patch.object(pdfpreview, "_render_poppler", return_value=(5, page)):
+            mou = self.create_mou()
+        self.assertEqual(mou.pdf_pages, 5)
+        self.assertEqual(mou.pdf_thumbnail.name, f"mou-previews/{mou.pdf_sha256}.webp")
+        with Image.open(mou.pdf_thumbnail) as thumbnail:
+            self.assertEqual(thumbnail.format, "WEBP")
+
+    def test_same_pdf_reuses_the_rendered_preview(self):
+        from PIL import Image
+
+        page = Image.new("RGB", (pdfpreview.THUMBNAIL_WIDTH, 400), "white")
+        with mock.patch.object(pdfpreview, "render_first_page", return_value=(5, page)) as render:
+            first = self.create_mou()
+            second = self.create_mou()
+        render.assert_called_once()
+        self.assertNotEqual(first.pdf.name, second.pdf.name)
+        self.assertEqual(
+            (second.pdf_sha256, second.pdf_pages, second.pdf_thumbnail.name),
+            (first.pdf_sha256, 5, first.pdf_thumbnail.name),
+        )
+
+    def test_task_skips_a_preview_that_is_up_to_date(self):
+        with mock.patch.object(pdfpreview.shutil, "which", return_value=None):
+            mou = self.create_mou()
+        with mock.patch.object(tasks, "read_pdf_preview") as read:
+            tasks.render_mou_preview(mou.pk)
+        read.assert_not_called()
+
+
+@override_settings(PROFILING_ENABLED=True)
+class ProfilingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", "staff@example.com", "pw", is_staff=True)
+        cls.visitor = User.objects.create_user("visitor", "visitor@example.com", "pw")
+
+    def test_requests_from_non_staff_are_not_profiled(self):
+        response = self.client.get("/api/gallery/?_profile=1")
+        self.assertNotIn("X-Profile-Id", response)
+
+        self.client.force_login(self.visitor)
+        response = self.client.get("/api/gallery/", headers={"X-Profile": "1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_staff_request_is_stored_and_linked(self):
+        self.client.force_login(self.staff)
+        response = self.client.get("/api/gallery/?_profile=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+        result = RequestProfile.objects.get(pk=response["X-Profile-Id"])
+        self.assertEqual((result.method, result.path, result.user), ("GET", "/api/gallery/", "staff"))
+        self.assertGreater(result.sql_count, 0)
+        self.assertIn("GalleryImageSerializer(many=True)", [s["serializer"] for s in result.serializers])
+        self.assertIn("sql;dur=", response["Server-Timing"])
+
+    def test_inline_profile_replaces_the_response(self):
+        self.client.force_login(self.staff)
+        response = self.client.get("/api/gallery/", headers={"X-Profile": "inline"})
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+        self.assertTrue(response.content.startswith(b"GET /api/gallery/ -> 200"))
+
+    @override_settings(PROFILING_KEEP=2)
+    def test_only_the_newest_profiles_are_kept(self):
+        self.client.force_login(self.staff)
+        ids = [self.client.get("/api/gallery/?_profile=1")["X-Profile-Id"] for _ in range(3)]
+        self.assertEqual(
+            sorted(RequestProfile.objects.values_list("pk", flat=True)),
+            [int(pk) for pk in ids[1:]],
+        )
+
+
+def load_gunicorn_config():
+    path = settings.BASE_DIR / "gunicorn.conf.py"
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class GunicornWorkerTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.conf = load_gunicorn_config()
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        # An eight-CPU host, whatever runs the tests.
+        patcher = mock.patch.object(self.conf.os, "sched_getaffinity", return_value=set(range(8)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, name, content):
+        with open(os.path.join(self.root, name), "w") as handle:
+            handle.write(content)
+
+    def workers(self, **environ):
+        return self.conf.worker_count(
+            environ, cgroup_root=self.root, meminfo=os.path.join(self.root, "meminfo"),
+        )
+
+    def test_cgroup_cpu_quota_limits_workers(self):
+        self.write("cpu.max", "200000 100000\n")
+        self.write("memory.max", "max\n")
+        self.assertEqual(self.conf.available_cpus(self.root), 2)
+        self.assertEqual(self.workers(), 5)
+
+    def test_cgroup_memory_limit_caps_workers(self):
+        self.write("cpu.max", "max 100000\n")
+        self.write("memory.max", str(512 * 1024 * 1024))
+        # (512 MB - 100 MB for the master) // 120 MB per worker.
+        self.assertEqual(self.workers(), 3)
+        self.assertEqual(self.workers(GUNICORN_WORKER_MEMORY_MB="200"), 2)
+        # Never below one worker.
+        self.write("memory.max", str(64 * 1024 * 1024))
+        self.assertEqual(self.workers(), 1)
+
+    def test_without_cgroup_files_uses_cpus_and_meminfo(self):
+        self.assertEqual(self.workers(), 17)
+        self.write("meminfo", "MemTotal:        1048576 kB\nMemFree:          524288 kB\n")
+        self.assertEqual(self.conf.available_memory_mb(self.root, os.path.join(self.root, "meminfo")), 1024)
+        self.assertEqual(self.workers(), 7)
+
+    def test_web_concurrency_overrides_the_calculation(self):
+        self.write("cpu.max", "100000 100000\n")
+        self.assertEqual(self.workers(WEB_CONCURRENCY="6"), 6)
+
+
+class InlineThread:
+    """Stands in for threading.Thread: runs the target when started."""
+
+    def __init__(self, target, **kwargs):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+    def is_alive(self):
+        return False
+
+
+class ReadinessTests(TestCase):
+
+    def setUp(self):
+        patches = [
+            mock.patch.dict(warmup._state, ready=False, steps={}, error=None),
+            mock.patch.object(warmup, "_thread", None),
+            mock.patch.object(warmup.threading, "Thread", InlineThread),
+            # The test database lives in this thread's connection.
+            mock.patch.object(warmup.connections, "close_all"),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_not_ready_until_warmed_up(self):
+        with mock.patch.object(warmup, "start"):
+            response = self.client.get("/readyz")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.client.get("/healthz").status_code, 200)
+
+        warmup.run()
+        response = self.client.get("/readyz")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "ready")
+        self.assertEqual(
+            list(response.json()["steps"]), ["database", "imports", "feeds", "catalog", "notifier"],
+        )
+
+    def test_failed_warmup_is_retried_by_the_next_check(self):
+        broken = [("database", mock.Mock(side_effect=DatabaseError("no database")))]
+        with mock.patch.object(warmup, "STEPS", broken), self.assertLogs("api.warmup", "ERROR"):
+            response = self.client.get("/readyz")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(
+            (response.json()["status"], response.json()["error"]), ("failed", "database: no database"),
+        )
+
+        self.assertEqual(self.client.get("/readyz").status_code, 200)
+
+
+@override_settings(
+    JOBS_RUN_INLINE=False,
+    NOTIFICATION_CHANNELS={"career": [{"backend": "memory"}]},
+)
+class MediaStorageTests(TestCase):
+
+    APPLICATION = {
+        "full_name": "Asha", "email": "asha@example.com", "phone": "9999999999",
+        "college": "College", "cgpa": "9", "year_of_passing": 2025, "skills": "python",
+    }
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        override = override_settings(MEDIA_ROOT=root)
+        override.enable()
+        self.addCleanup(override.disable)
+        notifier.MemoryBackend.outbox.clear()
+        self.addCleanup(notifier.close_backends)
+
+    def direct_upload(self, target="career.resume", upload=True):
+        key = f"resume/{len(os.listdir(settings.MEDIA_ROOT))}/cv.pdf"
+        if upload:
+            default_storage.save(key, ContentFile(b"%PDF-1.4 resume"))
+        return signing.dumps({"target": target, "key": key}, salt=direct_uploads.SALT), key
+
+    def apply(self, token):
+        return self.client.post("/api/apply/", dict(self.APPLICATION, resume_key=token))
+
+    def test_direct_upload_token_is_accepted_once(self):
+        token, key = self.direct_upload()
+        self.assertEqual(self.apply(token).status_code, 201)
+        self.assertEqual(CareerApplication.objects.get().resume.name, key)
+
+        response = self.apply(token)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"resume_key": ["Upload token has already been used"]})
+
+    def test_direct_upload_token_is_checked(self):
+        token, _ = self.direct_upload(target="mou.pdf")
+        self.assertEqual(
+            self.apply(token).json(), {"resume_key": ["Upload token is for another field"]}
+        )
+        self.assertEqual(
+            self.apply(token[:-2]).json(), {"resume_key": ["Invalid or expired upload token"]}
+        )
+        token, _ = self.direct_upload(upload=False)
+        self.assertEqual(self.apply(token).json(), {"resume_key": ["File has not been uploaded"]})
+        self.assertFalse(CareerApplication.objects.exists())
+
+    def test_resume_link_uses_the_storage_url(self):
+        application = CareerApplication.objects.create(resume="resume/cv.pdf", **self.APPLICATION)
+        tasks.notify_career_application(application.pk, base_url="http://testserver/")
+        [(_, message)] = notifier.MemoryBackend.outbox
+        self.assertIn("http://testserver/media/resume/cv.pdf", message.text)
+
+        with mock.patch(
+            "django.core.files.storage.FileSystemStorage.url",
+            return_value="https://bucket.example/resume/cv.pdf",
+        ):
+            tasks.notify_career_application(application.pk, base_url="http://testserver/")
+        _, message = notifier.MemoryBackend.outbox[-1]
+        self.assertIn("\nhttps://bucket.example/resume/cv.pdf", message.text)
+
+
+class AdmissionControlTests(TestCase):
+
+    def classes_for(self, method, path):
+        request = getattr(RequestFactory(), method)(path)
+        return [route.name for route in load_classes() if route.matches(request)]
+
+    def test_default_classes(self):
+        self.assertEqual(self.classes_for("post", "/api/apply/")[0], "heavy")
+        self.assertEqual(self.classes_for("post", "/api/contact/"), ["writes"])
+        self.assertEqual(self.classes_for("get", "/api/projects/"), ["reads"])
+        self.assertEqual(self.classes_for("post", "/admin/api/contactmessage/1/change/"), [])
+
+    @override_settings(ADMISSION_CLASSES=[
+        {"name": "writes", "methods": ["POST"], "path": r"^/api/", "limit": 0, "retry_after": 7},
+    ])
+    def test_request_over_the_limit_is_turned_away(self):
+        response = self.client.post(
+            "/api/contact/",
+            {"name": "Visitor", "email": "v@example.com", "phone": "9999999999", "message": "Hi"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "7")
+        self.assertFalse(ContactMessage.objects.exists())
+
+    @override_settings(ADMISSION_CLASSES=[
+        {"name": "reads", "methods": ["GET"], "path": r"^/", "max_queue_age": 5, "retry_after": 2},
+    ])
+    def test_request_that_queued_too_long_is_turned_away(self):
+        stale = f"t={int((timezone.now().timestamp() - 60) * 1000)}"
+        response = self.client.get("/api/projects/", headers={"X-Request-Start": stale})
+        self.assertEqual((response.status_code, response["Retry-After"]), (503, "2"))
+
+        fresh = f"t={int(timezone.now().timestamp() * 1000)}"
+        response = self.client.get("/api/projects/", headers={"X-Request-Start": fresh})
+        self.assertEqual(response.status_code, 200)
+
+
+class SessionStackTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def setUp(self):
+        patcher = mock.patch.object(
+            SessionMiddleware, "process_request", autospec=True,
+            side_effect=SessionMiddleware.process_request,
+        )
+        self.sessions = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_anonymous_api_request_skips_the_stack(self):
+        self.assertEqual(self.client.get("/api/projects/").status_code, 200)
+        self.assertEqual(self.client.get("/api/jobs/999/").status_code, 403)
+        self.sessions.assert_not_called()
+
+    def test_session_cookie_runs_the_stack(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get("/api/jobs/999/").status_code, 404)
+        self.sessions.assert_called_once()
+
+    def test_authorization_header_runs_the_stack(self):
+        credentials = base64.b64encode(b"admin:pw").decode()
+        response = self.client.get("/api/jobs/999/", headers={"Authorization": f"Basic {credentials}"})
+        self.assertEqual(response.status_code, 404)
+        self.sessions.assert_called_once()
+
+    def test_admin_runs_the_stack(self):
+        response = self.client.get("/admin/login/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("csrftoken", response.cookies)
+        self.sessions.assert_called_once()
+
+
+@override_settings(JOBS_RUN_INLINE=False)
+class CpuCatalogTests(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(catalog, "_index", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.i7 = Cpu.objects.create(
+            name="Intel Core i7-12700", ram_options=["16 GB", "32 GB"], storage_options=["1 TB"]
+        )
+        Cpu.objects.create(name="Intel Core i5-12400")
+        Cpu.objects.create(name="AMD Ryzen 7 5800X")
+        Cpu.objects.create(name="Ryzen 5 Pro")
+        self.retired = Cpu.objects.create(name="Intel Core i9-9900", is_active=False)
+
+    def search(self, query, **params):
+        response = self.client.get("/api/cpus/autocomplete/", {"q": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [entry["name"] for entry in response.json()]
+
+    def inquire(self, **fields):
+        return self.client.post("/api/inquiry/", dict({
+            "full_name": "Buyer", "email": "b@example.com", "phone": "9999999999",
+            "quantity": 2, "ram": "16 GB", "storage": "1 TB",
+        }, **fields), content_type="application/json")
+
+    def test_prefix_of_any_word_matches_active_entries(self):
+        self.assertEqual(self.search("i7"), ["Intel Core i7-12700"])
+        self.assertEqual(self.search("core i"), ["Intel Core i5-12400", "Intel Core i7-12700"])
+        self.assertEqual(self.search("INTEL"), ["Intel Core i5-12400", "Intel Core i7-12700"])
+        self.assertEqual(self.search("i9"), [])
+
+    def test_names_starting_with_the_query_come_first(self):
+        self.assertEqual(self.search("ryzen"), ["Ryzen 5 Pro", "AMD Ryzen 7 5800X"])
+        self.assertEqual(self.search("intel", limit=1), ["Intel Core i5-12400"])
+
+    def test_limit_is_bounded(self):
+        response = self.client.get("/api/cpus/autocomplete/", {"q": "intel", "limit": 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_catalog_changes_are_seen_on_commit(self):
+        self.assertEqual(self.search("xeon"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            Cpu.objects.create(name="Intel Xeon E-2388G")
+        self.assertEqual(self.search("xeon"), ["Intel Xeon E-2388G"])
+
+    def test_free_text_model_is_linked_to_the_catalog_entry(self):
+        self.assertEqual(self.inquire(cpu_model="intel core i7 12700").status_code, 201)
+        inquiry = CpuInquiry.objects.get()
+        self.assertEqual(inquiry.cpu, self.i7)
+        self.assertEqual(inquiry.cpu_model, "intel core i7 12700")
+
+    def test_unknown_model_is_kept_without_a_link(self):
+        self.assertEqual(self.inquire(cpu_model="Pentium II").status_code, 201)
+        self.assertIsNone(CpuInquiry.objects.get().cpu)
+
+    def test_catalog_id_sets_the_model_and_checks_the_options(self):
+        self.assertEqual(self.inquire(cpu=self.i7.pk).status_code, 201)
+        self.assertEqual(CpuInquiry.objects.get().cpu_model, "Intel Core i7-12700")
+
+        response = self.inquire(cpu=self.i7.pk, ram="8 GB")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ram", response.json())
+        self.assertEqual(self.inquire(cpu=self.retired.pk).status_code, 400)
+        self.assertEqual(self.inquire().status_code, 400)
+
+
+class PersonSubmissionsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", "staff@example.com", "pw", is_staff=True)
+        ContactMessage.objects.create(
+            name="Asha", email=" Asha@Example.com", phone="+91 98765 43210", message="Hi",
+        )
+        CareerApplication.objects.create(
+            full_name="Asha", email="asha@example.com", phone="9876543210", college="College",
+            cgpa="9", year_of_passing=2025, skills="python", resume="resume/cv.pdf",
+        )
+        ContactMessage.objects.create(
+            name="Ravi", email="ravi@example.com", phone="9999999999", message="Hi",
+        )
+
+    def test_lookup_is_for_staff(self):
+        self.assertEqual(self.client.get("/api/people/asha@example.com/").status_code, 403)
+        self.client.force_login(User.objects.create_user("visitor", password="pw"))
+        self.assertEqual(self.client.get("/api/people/asha@example.com/").status_code, 403)
+
+    def test_backfilled_rows_are_found_by_normalised_email(self):
+        # Rows saved before the normalised columns existed.
+        ContactMessage.objects.update(email_normalized="", phone_normalized="")
+        CareerApplication.objects.update(email_normalized="", phone_normalized="")
+        call_command("backfill_contacts", stdout=io.StringIO())
+        self.assertEqual(
+            set(ContactMessage.objects.values_list("phone_normalized", flat=True)),
+            {"9876543210", "9999999999"},
+        )
+
+        self.client.force_login(self.staff)
+        response = self.client.get("/api/people/ASHA@example.com/")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["email"], "asha@example.com")
+        self.assertEqual([row["name"] for row in body["contact_messages"]], ["Asha"])
+        self.assertEqual(len(body["career_applications"]), 1)
+        self.assertEqual(body["cpu_inquiries"], [])
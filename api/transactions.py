@@ -0,0 +1,46 @@
+"""
+Transactions for blocks that write.
+
+SQLite starts a transaction as a reader (BEGIN DEFERRED) and upgrades
+it to a writer at its first write. In WAL mode, if another connection
+committed in between, the upgrade fails straight away with "database is
+locked" and the busy timeout never applies. With SQLITE_IMMEDIATE_WRITES
+(the "tuned" SQLite profile) ``write_transaction()`` begins with BEGIN
+IMMEDIATE instead, so the wait for the write lock happens at BEGIN,
+where the timeout does apply.
+
+Only blocks that write use it. Atomic blocks that merely read keep
+SQLite's default and never queue behind writers; the admin, for one,
+wraps every change form in ``transaction.atomic()``. Other databases
+get a plain ``transaction.atomic()``.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+
+@contextmanager
+def write_transaction(using=None):
+    """``transaction.atomic()`` that takes SQLite's write lock when it begins."""
+    connection = transaction.get_connection(using)
+    if (
+        not settings.SQLITE_IMMEDIATE_WRITES
+        or connection.vendor != "sqlite"
+        or connection.in_atomic_block
+    ):
+        # Nested blocks run inside the outer transaction, whatever its mode.
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    # Opening a connection resets transaction_mode from the settings.
+    connection.ensure_connection()
+    previous = connection.transaction_mode
+    connection.transaction_mode = "IMMEDIATE"
+    try:
+        with transaction.atomic(using=using):
+            connection.transaction_mode = previous
+            yield
+    finally:
+        connection.transaction_mode = previous
@@ -0,0 +1,176 @@
+"""
+Resumable uploads, following the tus 1.0 protocol (core, creation and
+termination).
+
+A client creates an upload with its total length, then PATCHes the
+bytes in as many requests as it needs; after a dropped connection it
+asks for the current offset with HEAD and carries on from there. Bytes
+go straight into one part file per upload under UPLOAD_TEMP_DIR. A
+finished upload is handed to the regular serializers as an uploaded
+file whose temporary path the file storage can move into place, so it
+is never read back into memory.
+"""
+import base64
+import binascii
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db.models import F
+from django.utils import timezone
+
+from .models import UploadSession
+
+TUS_VERSION = "1.0.0"
+READ_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Rejected upload request; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def part_path(session_id):
+    return os.path.join(settings.UPLOAD_TEMP_DIR, f"{session_id}.part")
+
+
+def parse_metadata(header):
+    """Decode an ``Upload-Metadata`` header ("key base64value, ...")."""
+    metadata = {}
+    for pair in filter(None, (item.strip() for item in (header or "").split(","))):
+        key, _, value = pair.partition(" ")
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode() if value else ""
+        except (binascii.Error, UnicodeDecodeError):
+            raise UploadError(f"Invalid Upload-Metadata value for {key!r}")
+    return metadata
+
+
+def create_session(length, metadata):
+    if length < 0:
+        raise UploadError("Upload-Length must not be negative")
+    if length > settings.UPLOAD_MAX_SIZE:
+        raise UploadError("Upload is larger than the maximum size", status=413)
+
+    filename = os.path.basename(metadata.get("filename", "")) or "upload"
+    session = UploadSession.objects.create(
+        filename=filename[:255],
+        content_type=metadata.get("filetype", "")[:100],
+        length=length,
+        completed_at=timezone.now() if length == 0 else None,
+    )
+    os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+    open(part_path(session.pk), "wb").close()
+    return session
+
+
+def append(session, offset, stream, content_length):
+    """Write the request body at ``offset``. Returns the new offset.
+
+    Whatever arrives before the client disconnects is kept, as the
+    protocol expects. Concurrent PATCHes for the same offset are settled
+    by a compare-and-swap on the stored offset; the loser gets a 409.
+    """
+    if offset != session.offset:
+        raise UploadError("Upload-Offset does not match the current offset", status=409)
+    if content_length > session.length - offset:
+        raise UploadError("Body runs past Upload-Length")
+
+    written = 0
+    try:
+        with open(part_path(session.pk), "r+b") as handle:
+            handle.seek(offset)
+            while written < content_length:
+                data = stream.read(min(READ_SIZE, content_length - written))
+                if not data:
+                    break
+                handle.write(data)
+                written += len(data)
+    except FileNotFoundError:
+        raise UploadError("Upload not found", status=404)
+    except OSError:
+        # Client went away mid-body: keep what was written.
+        pass
+
+    new_offset = offset + written
+    updated = UploadSession.objects.filter(pk=session.pk, offset=offset).update(
+        offset=new_offset,
+        updated_at=timezone.now(),
+        completed_at=timezone.now() if new_offset == session.length else None,
+    )
+    if not updated:
+        raise UploadError("Upload was modified concurrently", status=409)
+    return new_offset
+
+
+def delete_session(session):
+    try:
+        os.remove(part_path(session.pk))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+class CompletedUpload(UploadedFile):
+    """A finished upload, presented to serializers like a regular file upload.
+
+    Exposing temporary_file_path() lets FileSystemStorage move the part
+    file into MEDIA_ROOT instead of copying it.
+    """
+
+    def __init__(self, session):
+        super().__init__(
+            open(part_path(session.pk), "rb"),
+            name=session.filename,
+            content_type=session.content_type or "application/octet-stream",
+            size=session.length,
+        )
+        self.session = session
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            # Already moved into storage.
+            pass
+
+
+def completed_upload(session_id):
+    """The CompletedUpload for ``session_id``, or None if it isn't finished."""
+    session = UploadSession.objects.filter(
+        pk=session_id, offset=F("length"), completed_at__isnull=False
+    ).first()
+    if session is None or not os.path.exists(part_path(session.pk)):
+        return None
+    return CompletedUpload(session)
+
+
+def collect_garbage(now=None):
+    """Remove expired uploads and part files without an upload. Returns counts."""
+    cutoff = (now or timezone.now()) - timedelta(hours=settings.UPLOAD_EXPIRE_HOURS)
+    expired = 0
+    for session in UploadSession.objects.filter(updated_at__lt=cutoff).iterator():
+        delete_session(session)
+        expired += 1
+
+    orphans = 0
+    if os.path.isdir(settings.UPLOAD_TEMP_DIR):
+        known = {str(pk) for pk in UploadSession.objects.values_list("pk", flat=True)}
+        for name in os.listdir(settings.UPLOAD_TEMP_DIR):
+            path = os.path.join(settings.UPLOAD_TEMP_DIR, name)
+            if (
+                name.endswith(".part")
+                and name[:-len(".part")] not in known
+                # Don't race a session being created right now.
+                and timezone.now().timestamp() - os.path.getmtime(path) > 3600
+            ):
+                os.remove(path)
+                orphans += 1
+    return expired, orphans
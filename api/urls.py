@@ -7,7 +7,19 @@ from .views import (
     ProjectListAPIView,
     CommunityItemListAPIView,
     create_inquiry,
-    HackathonRegistrationView,
+    CpuAutocompleteView,
+    HackathonRegistrationCreate,
+    HackathonStatsView,
+    JobStatusView,
+    ExportDownloadView,
+    StatsView,
+    PersonSubmissionsView,
+    UploadCreateView,
+    UploadView,
+    DirectUploadView,
+    BundleView,
+    submission_stream,
+    admission_metrics,
 )
 
 urlpatterns = [
@@ -21,6 +33,18 @@ urlpatterns = [
     path("giveback/", CommunityItemListAPIView.as_view()),
     path("inquiry/", create_inquiry),
     path("inquiry/<int:pk>/", create_inquiry),
-    path("hackathonregister/", HackathonRegistrationView.as_view()),
-    path("hackathonregister/<int:pk>/", HackathonRegistrationView.as_view()),
+    path("cpus/autocomplete/", CpuAutocompleteView.as_view()),
+    path("hackathonregister/", HackathonRegistrationCreate.as_view()),
+    path("hackathonregister/<int:pk>/", HackathonRegistrationCreate.as_view()),
+    path("hackathon/stats/", HackathonStatsView.as_view()),
+    path("jobs/<int:pk>/", JobStatusView.as_view()),
+    path("jobs/<int:pk>/download/", ExportDownloadView.as_view(), name="job-download"),
+    path("stats/", StatsView.as_view()),
+    path("people/<str:email>/", PersonSubmissionsView.as_view()),
+    path("uploads/", UploadCreateView.as_view()),
+    path("uploads/<uuid:pk>/", UploadView.as_view()),
+    path("uploads/direct/", DirectUploadView.as_view()),
+    path("bundle/", BundleView.as_view()),
+    path("submissions/stream/", submission_stream),
+    path("metrics/admission/", admission_metrics),
 ]
@@ -1,11 +1,20 @@
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.generics import ListAPIView
+from rest_framework.generics import ListAPIView, ListCreateAPIView
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.decorators import api_view
 from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import storages
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-import requests
+from django.utils.cache import patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
 
 from .models import (
     CareerApplication,
@@ -16,7 +25,10 @@ from .models import (
     CommunityItem,
     CpuInquiry,
     HackathonParticipant,
+    HackathonEvent,
     HackathonTeam,
+    Job,
+    UploadSession,
 )
 from .serializers import (
     CareerApplicationSerializer,
@@ -27,52 +39,113 @@ from .serializers import (
     CommunityItemSerializer,
     CpuInquirySerializer,
     HackathonTeamSerializer,
-    HackathonRegistrationSerializer
+    HackathonParticipationSerializer,
+    HackathonRegistrationSerializer,
+    JobSerializer,
+    BulkSelectionSerializer,
+    DirectUploadRequestSerializer,
+    StatsQuerySerializer,
 )
+from . import catalog
+from .bulk import SUBMISSION_MODELS, delete_files
+from .admission import metrics_text
+from .bundle import BundleError, build, parse_sections, version_tag
+from .direct_uploads import DirectUploadError, direct_uploads_enabled, presign, staff_only
+from .events import KINDS, latest_id, stream
+from .hackathon import (
+    DuplicateParticipant,
+    EventFull,
+    current_event,
+    event_stats,
+    unregister_team,
+)
+from .jobs import enqueue
+from .normalization import normalize_email
+from .retention import with_archived
+from .rollups import time_series
+from .transactions import write_transaction
+from .uploads import (
+    TUS_VERSION,
+    UploadError,
+    append,
+    create_session,
+    delete_session,
+    parse_metadata,
+)
+
 
-#send messages to telegram 
+def include_archived(request):
+    return request.query_params.get("include_archived", "").lower() in ("1", "true")
 
-def send_telegram(bot_token, chat_id, text):
+
+def archived_listing(request, queryset, serializer_class, headers):
+    """A page of live and archived rows.
+
+    Continued with ``?before=<X-Next-Before>&before_id=<X-Next-Before-Id>``:
+    rows sharing a date across the page boundary are told apart by pk.
+    """
     try:
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        requests.post(url, data={"chat_id": chat_id, "text": text}, timeout=5)
-    except:
-        pass
+        before = parse_datetime(request.query_params.get("before", ""))
+        before_pk = request.query_params.get("before_id")
+        before_pk = int(before_pk) if before_pk else None
+    except ValueError:
+        return Response({"message": "Invalid before cursor"}, status=status.HTTP_400_BAD_REQUEST)
+    if request.query_params.get("before") and before is None:
+        return Response({"message": "Invalid before cursor"}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = with_archived(queryset, before=before, before_pk=before_pk)
+    if len(rows) == settings.ARCHIVE_PAGE_SIZE:
+        date_field, _ = SUBMISSION_MODELS[queryset.model._meta.label]
+        headers["X-Next-Before"] = getattr(rows[-1], date_field).isoformat()
+        headers["X-Next-Before-Id"] = str(rows[-1].pk)
+    return Response(serializer_class(rows, many=True).data, headers=headers)
+
+
+def queue_bulk_delete(request, model):
+    serializer = BulkSelectionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    selection = {
+        key: value.isoformat() if hasattr(value, "isoformat") else value
+        for key, value in serializer.validated_data.items()
+    }
+    job = enqueue("bulk.run", operation="delete", model=model, **selection)
+    return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
-class CareerApplicationCreate(APIView):
+
+class StaffBulkDeleteMixin:
+    """A DELETE without a pk deletes rows in bulk, so only staff may send one."""
+
+    def get_permissions(self):
+        if self.request.method == "DELETE" and self.kwargs.get("pk") is None:
+            return [IsAdminUser()]
+        return super().get_permissions()
+
+
+class CareerApplicationCreate(StaffBulkDeleteMixin, APIView):
 
     def get(self, request):
+        cursor = latest_id()
         qs = CareerApplication.objects.all().order_by("-applied_at")
+        if include_archived(request):
+            return archived_listing(
+                request, qs, CareerApplicationSerializer, {"X-Last-Event-Id": cursor}
+            )
         serializer = CareerApplicationSerializer(qs, many=True)
-        return Response(serializer.data)
+        return Response(serializer.data, headers={"X-Last-Event-Id": cursor})
 
     def post(self, request):
         serializer = CareerApplicationSerializer(data=request.data)
         if serializer.is_valid():
-            obj = serializer.save()
-
-            resume_url = ""
-            if obj.resume:
-                resume_url = request.build_absolute_uri(
-                    settings.MEDIA_URL + obj.resume.name
+            with write_transaction():
+                obj = serializer.save()
+                enqueue(
+                    "notify.career_application",
+                    pk=obj.pk,
+                    base_url=request.build_absolute_uri("/"),
                 )
 
-            send_telegram(
-                settings.TELEGRAM_CAREER_BOT_TOKEN,
-                settings.TELEGRAM_CAREER_CHAT_ID,
-                f"Career Application\n\n"
-                f"Name: {obj.full_name}\n"
-                f"Email: {obj.email}\n"
-                f"Phone: {obj.phone}\n"
-                f"College: {obj.college}\n"
-                f"CGPA: {obj.cgpa}\n"
-                f"Year: {obj.year_of_passing}\n"
-                f"Experience: {obj.experience}\n"
-                f"Skills: {obj.skills}\n\n"
-                f"Resume:\n{resume_url}"
-            )
-
             return Response(
                 {"message": "Application submitted successfully"},
                 status=status.HTTP_201_CREATED,
@@ -80,37 +153,37 @@ class CareerApplicationCreate(APIView):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    def delete(self, request, pk):
+    def delete(self, request, pk=None):
+        if pk is None:
+            return queue_bulk_delete(request, "api.CareerApplication")
+
         obj = get_object_or_404(CareerApplication, pk=pk)
         obj.delete()
+        delete_files([obj.resume.name])
         return Response(
             {"message": "Career application deleted"},
             status=status.HTTP_204_NO_CONTENT,
         )
 
 
-class ContactMessageCreate(APIView):
+class ContactMessageCreate(StaffBulkDeleteMixin, APIView):
 
     def get(self, request):
+        cursor = latest_id()
         qs = ContactMessage.objects.all().order_by("-created_at")
+        if include_archived(request):
+            return archived_listing(
+                request, qs, ContactMessageSerializer, {"X-Last-Event-Id": cursor}
+            )
         serializer = ContactMessageSerializer(qs, many=True)
-        return Response(serializer.data)
+        return Response(serializer.data, headers={"X-Last-Event-Id": cursor})
 
     def post(self, request):
         serializer = ContactMessageSerializer(data=request.data)
         if serializer.is_valid():
-            obj = serializer.save()
-
-            send_telegram(
-                settings.TELEGRAM_CONTACT_BOT_TOKEN,
-                settings.TELEGRAM_CONTACT_CHAT_ID,
-                f"Contact Message\n\n"
-                f"Name: {obj.name}\n"
-                f"Email: {obj.email}\n"
-                f"Phone: {obj.phone}\n"
-                f"Subject: {obj.subject}\n"
-                f"Message: {obj.message}"
-            )
+            with write_transaction():
+                obj = serializer.save()
+                enqueue("notify.contact_message", pk=obj.pk)
 
             return Response(
                 {"message": "Contact saved"},
@@ -119,7 +192,10 @@ class ContactMessageCreate(APIView):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    def delete(self, request, pk):
+    def delete(self, request, pk=None):
+        if pk is None:
+            return queue_bulk_delete(request, "api.ContactMessage")
+
         obj = get_object_or_404(ContactMessage, pk=pk)
         obj.delete()
         return Response(
@@ -132,28 +208,21 @@ class ContactMessageCreate(APIView):
 def create_inquiry(request, pk=None):
 
     if request.method == "GET":
+        cursor = latest_id()
         qs = CpuInquiry.objects.all().order_by("-created_at")
+        if include_archived(request):
+            return archived_listing(
+                request, qs, CpuInquirySerializer, {"X-Last-Event-Id": cursor}
+            )
         serializer = CpuInquirySerializer(qs, many=True)
-        return Response(serializer.data)
+        return Response(serializer.data, headers={"X-Last-Event-Id": cursor})
 
     if request.method == "POST":
         serializer = CpuInquirySerializer(data=request.data)
         if serializer.is_valid():
-            obj = serializer.save()
-
-            send_telegram(
-                settings.TELEGRAM_CPU_BOT_TOKEN,
-                settings.TELEGRAM_CPU_CHAT_ID,
-                f"CPU Inquiry\n\n"
-                f"Name: {obj.full_name}\n"
-                f"Email: {obj.email}\n"
-                f"Phone: {obj.phone}\n"
-                f"CPU: {obj.cpu_model}\n"
-                f"Quantity: {obj.quantity}\n"
-                f"RAM: {obj.ram}\n"
-                f"Storage: {obj.storage}\n"
-                f"Message: {obj.message}"
-            )
+            with write_transaction():
+                obj = serializer.save()
+                enqueue("notify.cpu_inquiry", pk=obj.pk)
 
             return Response(
                 {"message": "Inquiry submitted successfully"},
@@ -171,14 +240,40 @@ def create_inquiry(request, pk=None):
         )
 
 
-class MOUListAPIView(ListAPIView):
+class CpuAutocompleteView(APIView):
+    """Catalog CPUs with a word starting with ?q=, answered from memory (api/catalog.py)."""
+
+    authentication_classes = ()
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", catalog.DEFAULT_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= catalog.MAX_LIMIT:
+            return Response(
+                {"message": f"limit must be between 1 and {catalog.MAX_LIMIT}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(catalog.search(request.query_params.get("q", ""), limit))
+
+
+class MOUListAPIView(ListCreateAPIView):
     serializer_class = MOUSerializer
 
+    def get_permissions(self):
+        # Anyone can list; only staff add MOUs (e.g. from a resumable upload).
+        if self.request.method == "POST":
+            return [IsAdminUser()]
+        return [AllowAny()]
+
     def get_queryset(self):
         return MOU.objects.filter(is_active=True)
 
 
 class GalleryImageListAPIView(ListAPIView):
+    # Public read-only views: no DRF authentication to run.
+    authentication_classes = ()
     serializer_class = GalleryImageSerializer
     queryset = GalleryImage.objects.all().order_by("-created_at")
 
@@ -189,6 +284,8 @@ class GalleryImageListAPIView(ListAPIView):
 
 
 class ProjectListAPIView(APIView):
+    authentication_classes = ()
+
     def get(self, request):
         qs = Project.objects.all()
         serializer = ProjectSerializer(qs, many=True)
@@ -196,6 +293,7 @@ class ProjectListAPIView(APIView):
 
 
 class CommunityItemListAPIView(ListAPIView):
+    authentication_classes = ()
     serializer_class = CommunityItemSerializer
 
     def get_queryset(self):
@@ -205,14 +303,31 @@ class CommunityItemListAPIView(ListAPIView):
 class HackathonRegistrationCreate(APIView):
 
     def get(self, request):
+        cursor = latest_id()
         teams = HackathonTeam.objects.all().order_by("-created_at")
         serializer = HackathonTeamSerializer(teams, many=True)
-        return Response(serializer.data)
+        return Response(serializer.data, headers={"X-Last-Event-Id": cursor})
 
     def post(self, request):
         serializer = HackathonRegistrationSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            try:
+                team = serializer.save()
+            except EventFull:
+                return Response(
+                    {"message": "Hackathon registrations are full"},
+                    status=status.HTTP_409_CONFLICT
+                )
+            except DuplicateParticipant as exc:
+                return Response(
+                    {
+                        "message": "Some participants are already registered",
+                        "emails": exc.emails,
+                        "phones": exc.phones,
+                    },
+                    status=status.HTTP_409_CONFLICT
+                )
+            enqueue("notify.hackathon_registration", pk=team.pk)
             return Response(
                 {"message": "Hackathon registration successful"},
                 status=status.HTTP_201_CREATED
@@ -221,8 +336,278 @@ class HackathonRegistrationCreate(APIView):
 
     def delete(self, request, pk):
         team = get_object_or_404(HackathonTeam, pk=pk)
-        team.delete()
+        unregister_team(team)
         return Response(
             {"message": "Hackathon registration deleted"},
             status=status.HTTP_204_NO_CONTENT
-        )
\ No newline at end of file
+        )
+
+
+class HackathonStatsView(APIView):
+    authentication_classes = ()
+
+    def get(self, request):
+        try:
+            event = current_event(request.query_params.get("event"))
+        except HackathonEvent.DoesNotExist:
+            return Response(
+                {"message": "Unknown or closed hackathon event"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(event_stats(event))
+
+
+class JobStatusView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, pk):
+        job = get_object_or_404(Job, pk=pk)
+        return Response(JobSerializer(job).data)
+
+
+class ExportDownloadView(APIView):
+    """The CSV written by a finished bulk export job, for staff only."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, pk):
+        job = get_object_or_404(
+            Job, pk=pk, name="bulk.run", status="done", payload__operation="export"
+        )
+        name = job.progress.get("result")
+        storage = storages["exports"]
+        if not name or not storage.exists(name):
+            return Response({"message": "Export file not found"}, status=status.HTTP_404_NOT_FOUND)
+        response = FileResponse(storage.open(name), as_attachment=True, filename=name)
+        response["Cache-Control"] = "private, no-store"
+        return response
+
+
+class StatsView(APIView):
+
+    def get(self, request):
+        serializer = StatsQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(time_series(**serializer.validated_data))
+
+
+class PersonSubmissionsView(APIView):
+    """Everything submitted with one email address, across all forms."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, email):
+        email = normalize_email(email)
+        # One query per model, each on its email_normalized index.
+        return Response({
+            "email": email,
+            "career_applications": CareerApplicationSerializer(
+                CareerApplication.objects.filter(email_normalized=email).order_by("-applied_at"),
+                many=True,
+            ).data,
+            "contact_messages": ContactMessageSerializer(
+                ContactMessage.objects.filter(email_normalized=email).order_by("-created_at"),
+                many=True,
+            ).data,
+            "cpu_inquiries": CpuInquirySerializer(
+                CpuInquiry.objects.filter(email_normalized=email).order_by("-created_at"),
+                many=True,
+            ).data,
+            "hackathon_participations": HackathonParticipationSerializer(
+                HackathonParticipant.objects.filter(email_normalized=email)
+                .select_related("team")
+                .order_by("-id"),
+                many=True,
+            ).data,
+        })
+
+
+def tus_response(status_code, headers=None):
+    response = Response(status=status_code)
+    response["Tus-Resumable"] = TUS_VERSION
+    response["Cache-Control"] = "no-store"
+    for name, value in (headers or {}).items():
+        response[name] = str(value)
+    return response
+
+
+def tus_error(error):
+    response = Response({"message": str(error)}, status=error.status)
+    response["Tus-Resumable"] = TUS_VERSION
+    return response
+
+
+def header_int(request, name):
+    try:
+        return int(request.headers[name])
+    except (KeyError, ValueError):
+        raise UploadError(f"Missing or invalid {name} header")
+
+
+class UploadCreateView(APIView):
+
+    def options(self, request):
+        return tus_response(status.HTTP_204_NO_CONTENT, {
+            "Tus-Version": TUS_VERSION,
+            "Tus-Max-Size": settings.UPLOAD_MAX_SIZE,
+            "Tus-Extension": "creation,termination",
+        })
+
+    def post(self, request):
+        try:
+            session = create_session(
+                header_int(request, "Upload-Length"),
+                parse_metadata(request.headers.get("Upload-Metadata")),
+            )
+        except UploadError as error:
+            return tus_error(error)
+        return tus_response(status.HTTP_201_CREATED, {
+            "Location": request.build_absolute_uri(f"{session.pk}/"),
+            "Upload-Offset": session.offset,
+        })
+
+
+class UploadView(APIView):
+
+    def head(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk)
+        return tus_response(status.HTTP_200_OK, {
+            "Upload-Offset": session.offset,
+            "Upload-Length": session.length,
+        })
+
+    def patch(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk)
+        if request.content_type != "application/offset+octet-stream":
+            return tus_response(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        try:
+            # The body is streamed from the request into the part file,
+            # never parsed or held in memory.
+            offset = append(
+                session,
+                header_int(request, "Upload-Offset"),
+                request,
+                header_int(request, "Content-Length"),
+            )
+        except UploadError as error:
+            return tus_error(error)
+        return tus_response(status.HTTP_204_NO_CONTENT, {"Upload-Offset": offset})
+
+    def delete(self, request, pk):
+        delete_session(get_object_or_404(UploadSession, pk=pk))
+        return tus_response(status.HTTP_204_NO_CONTENT)
+
+
+class DirectUploadView(APIView):
+    """Presigned POST for sending a file straight to storage (api/direct_uploads.py)."""
+
+    def post(self, request):
+        if not direct_uploads_enabled():
+            return Response(
+                {"message": "Direct uploads need S3 storage; use /api/uploads/ instead"},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+        serializer = DirectUploadRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        if staff_only(data["target"]) and not request.user.is_staff:
+            return Response({"message": "Staff only"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            upload = presign(data["target"], data["filename"], data["content_type"], data["size"])
+        except DirectUploadError as error:
+            return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(upload)
+
+
+class BundleView(APIView):
+    """Several public feeds in one request: ?sections=mous,gallery:20,projects"""
+
+    authentication_classes = ()
+
+    def get(self, request):
+        try:
+            sections = parse_sections(request.query_params.get("sections", ""))
+        except BundleError as error:
+            return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        tag = version_tag(sections, request.get_host())
+        if not_modified(request, tag):
+            return etag_response(Response(status=status.HTTP_304_NOT_MODIFIED), tag)
+
+        cache_key = f"bundle:{tag}"
+        data = cache.get(cache_key)
+        if data is None:
+            data = build(sections, request)
+            cache.set(cache_key, data, settings.BUNDLE_CACHE_SECONDS)
+        return etag_response(Response(data), tag)
+
+
+def not_modified(request, tag):
+    etags = parse_etags(request.headers.get("If-None-Match", ""))
+    return f'"{tag}"' in etags or "*" in etags
+
+
+def etag_response(response, tag):
+    response["ETag"] = f'"{tag}"'
+    patch_cache_control(response, public=True, max_age=settings.BUNDLE_MAX_AGE)
+    return response
+
+
+async def submission_stream(request):
+    """Server-Sent Events for new submissions, for staff.
+
+    Starts after ``Last-Event-ID`` (or ``?last_event_id=``, the
+    ``X-Last-Event-Id`` of a listing), else at the newest event.
+    ``?kinds=career,cpu`` limits the kinds streamed.
+
+    Only served by the ASGI app: a sync worker would hold a thread per
+    open stream and buffer an async body it can never finish sending.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"message": "The submission stream is only served by the ASGI app (backend/asgi.py)"},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    user = await request.auser()
+    if not user.is_staff:
+        return JsonResponse({"message": "Staff only"}, status=status.HTTP_403_FORBIDDEN)
+
+    kinds = [kind for kind in request.GET.get("kinds", "").split(",") if kind] or list(KINDS)
+    unknown = set(kinds) - set(KINDS)
+    if unknown:
+        return JsonResponse(
+            {"message": f"Unknown kinds: {', '.join(sorted(unknown))}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    cursor = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    if cursor is None:
+        cursor = await sync_to_async(latest_id)()
+    else:
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            return JsonResponse(
+                {"message": "Last-Event-ID must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    response = StreamingHttpResponse(stream(cursor, set(kinds)), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Don't let nginx-style proxies buffer the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def admission_metrics(request):
+    """Admission control counters for all worker processes, for Prometheus."""
+    token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    authorized = request.user.is_staff or (
+        settings.METRICS_TOKEN and constant_time_compare(token, settings.METRICS_TOKEN)
+    )
+    if not authorized:
+        return JsonResponse({"message": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+    return HttpResponse(metrics_text(), content_type="text/plain; version=0.0.4")
@@ -0,0 +1,116 @@
+"""
+Per-process warmup, so a worker is ready before it is sent traffic.
+
+A fresh worker otherwise pays for its first database connection, first
+queries and lazily imported modules on real requests. ``start()`` runs
+the steps below once per process in a background thread (gunicorn
+starts it from ``post_worker_init``), and the readiness endpoint
+(/readyz) answers 503 until they have completed, so the platform's
+health check only routes traffic to warm workers. A failed warmup is
+retried on the next readiness check.
+
+Database connections belong to the thread that opened them, so the
+``database`` step proves the database is reachable and pays the
+driver's one-off setup; request threads then keep their own connection
+(CONN_MAX_AGE).
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_TEMPLATES = [
+    "career_application",
+    "contact_message",
+    "cpu_inquiry",
+    "digest",
+    "hackathon_registration",
+]
+
+_lock = threading.Lock()
+_thread = None
+_state = {"ready": False, "steps": {}, "error": None}
+
+
+def warm_database():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def warm_imports():
+    # The URLconf pulls in the views, serializers and DRF.
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+
+
+def warm_feeds():
+    """Render the public feeds through their views; the bundle caches its data."""
+    from .snapshots import FEEDS, render_path
+
+    for path in [*FEEDS.values(), "/api/bundle/"]:
+        render_path(path)
+
+
+def warm_catalog():
+    from . import catalog
+
+    catalog.get_index()
+
+
+def warm_notifier():
+    # Submissions only notify from the web process when jobs run inline;
+    # otherwise `manage.py runworker` does.
+    if not settings.JOBS_RUN_INLINE:
+        return
+    from django.template.loader import get_template
+
+    import requests  # noqa: F401  imported lazily by the HTTP backends
+
+    for template in NOTIFICATION_TEMPLATES:
+        get_template(f"notifications/{template}.txt")
+
+
+STEPS = [
+    ("database", warm_database),
+    ("imports", warm_imports),
+    ("feeds", warm_feeds),
+    ("catalog", warm_catalog),
+    ("notifier", warm_notifier),
+]
+
+
+def run():
+    """Run every step, recording how long each took in milliseconds."""
+    steps = {}
+    try:
+        for name, step in STEPS:
+            started = time.perf_counter()
+            step()
+            steps[name] = round((time.perf_counter() - started) * 1000, 1)
+    except Exception as exc:
+        logger.exception("Warmup failed")
+        _state.update(steps=steps, error=f"{name}: {exc}")
+    else:
+        _state.update(ready=True, steps=steps, error=None)
+        logger.info("Warmed up: %s", steps)
+    finally:
+        connections.close_all()
+
+
+def start():
+    """Start the warmup in the background unless it is running or done."""
+    global _thread
+    with _lock:
+        if _state["ready"] or (_thread is not None and _thread.is_alive()):
+            return
+        _thread = threading.Thread(target=run, name="warmup", daemon=True)
+        _thread.start()
+
+
+def status():
+    return dict(_state, warming=_thread is not None and _thread.is_alive())
@@ -3,6 +3,10 @@ ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The submission stream (/api/submissions/stream/) holds its connection
+open, so serve it from this app (e.g. ``uvicorn backend.asgi:application``)
+rather than from the sync gunicorn workers.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -1,11 +1,17 @@
 from pathlib import Path
 import os
-import dj_database_url
-from dotenv import load_dotenv
+import tempfile
+
+from corsheaders.defaults import default_headers
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-load_dotenv()
+# Only pay for python-dotenv when there is a .env file (local development);
+# on Render the environment is set by the platform.
+if (BASE_DIR / ".env").exists():
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / ".env")
 
 SECRET_KEY = os.environ.get(
     "SECRET_KEY",
@@ -34,15 +40,32 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoise, plus the published feed snapshots (api/snapshots.py)
+    "api.middleware.SnapshotWhiteNoiseMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    # Fast 503s instead of slow failures under bursts (api/admission.py)
+    "api.middleware.AdmissionControlMiddleware",
     "django.middleware.common.CommonMiddleware",
+    # SESSION_STACK_MIDDLEWARE, skipped by anonymous API requests
+    "api.middleware.SessionStackMiddleware",
+    # Staff-only, on request: X-Profile: 1 or ?_profile=1 (api/profiling.py)
+    "api.middleware.ProfilingMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+# Run by api.middleware.SessionStackMiddleware, in this order, except for
+# anonymous requests (no session cookie or Authorization header) under
+# LEAN_PATH_PREFIXES. Compare with `manage.py bench_middleware`.
+SESSION_STACK_MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+LEAN_PATH_PREFIXES = ["/api/"]
+# The admin checks look for these middleware in MIDDLEWARE itself; they
+# run inside SessionStackMiddleware instead.
+SILENCED_SYSTEM_CHECKS = ["admin.E408", "admin.E409", "admin.E410"]
 
 ROOT_URLCONF = "backend.urls"
 
@@ -66,8 +89,11 @@ TEMPLATES = [
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
 IS_RENDER = os.environ.get("RENDER") == "true"
+SQLITE_IMMEDIATE_WRITES = False  # see the "tuned" SQLite profile below
 
 if IS_RENDER and DATABASE_URL:
+    import dj_database_url
+
     DATABASES = {
         "default": dj_database_url.parse(
             DATABASE_URL,
@@ -79,9 +105,31 @@ else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
         }
     }
+    # "tuned" lets several gunicorn workers write concurrently: WAL so
+    # readers don't block the writer, a busy timeout instead of instant
+    # "database is locked", and blocks that write take the write lock up
+    # front with BEGIN IMMEDIATE (api/transactions.py) rather than failing
+    # when they upgrade from a read. Transactions that only read keep the
+    # default BEGIN.
+    # Compare with `manage.py bench_sqlite`; "default" is Django's stock setup.
+    if os.environ.get("SQLITE_PROFILE", "tuned") == "tuned":
+        # Reused across requests, so the pragmas run once per thread
+        # rather than on every request.
+        DATABASES["default"]["CONN_MAX_AGE"] = 600
+        SQLITE_IMMEDIATE_WRITES = True
+        DATABASES["default"]["OPTIONS"] = {
+            "timeout": 20,  # seconds to wait for the write lock
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA mmap_size=134217728;"  # 128 MB
+                "PRAGMA cache_size=-20000;"  # 20 MB
+                "PRAGMA temp_store=MEMORY;"
+            ),
+        }
 
 
 REST_FRAMEWORK = {
@@ -106,6 +154,156 @@ TELEGRAM_CPU_CHAT_ID = os.environ.get("TELEGRAM_CPU_CHAT_ID")
 TELEGRAM_HACKATHON_TOKEN = os.environ.get("TELEGRAM_HACKATHON_TOKEN")
 TELEGRAM_HACKATHON_ID = os.environ.get("TELEGRAM_HACKATHON_ID")
 
+# Notifications (api/notifier.py): every channel is sent to each of its
+# destinations. Email and the webhook, when configured, get all channels.
+NOTIFY_EMAIL_TO = [a for a in os.environ.get("NOTIFY_EMAIL_TO", "").split(",") if a]
+NOTIFY_WEBHOOK_URL = os.environ.get("NOTIFY_WEBHOOK_URL")
+NOTIFY_FILE_PATH = os.environ.get("NOTIFY_FILE_PATH")  # local development
+
+
+def _notification_destinations(telegram_token, telegram_chat_id):
+    destinations = []
+    if telegram_token and telegram_chat_id:
+        destinations.append({"backend": "telegram", "token": telegram_token, "chat_id": telegram_chat_id})
+    if NOTIFY_EMAIL_TO:
+        destinations.append({"backend": "email", "to": NOTIFY_EMAIL_TO})
+    if NOTIFY_WEBHOOK_URL:
+        destinations.append({"backend": "webhook", "url": NOTIFY_WEBHOOK_URL})
+    if NOTIFY_FILE_PATH:
+        destinations.append({"backend": "file", "path": NOTIFY_FILE_PATH})
+    return destinations
+
+
+NOTIFICATION_CHANNELS = {
+    "career": _notification_destinations(TELEGRAM_CAREER_BOT_TOKEN, TELEGRAM_CAREER_CHAT_ID),
+    "contact": _notification_destinations(TELEGRAM_CONTACT_BOT_TOKEN, TELEGRAM_CONTACT_CHAT_ID),
+    "cpu": _notification_destinations(TELEGRAM_CPU_BOT_TOKEN, TELEGRAM_CPU_CHAT_ID),
+    "hackathon": _notification_destinations(TELEGRAM_HACKATHON_TOKEN, TELEGRAM_HACKATHON_ID),
+}
+
+# After this many messages on a channel within the window (seconds), hold
+# further ones and send them as a single digest at the end of the window.
+# 0 disables digests.
+NOTIFY_DIGEST_THRESHOLD = int(os.environ.get("NOTIFY_DIGEST_THRESHOLD", 10))
+NOTIFY_DIGEST_WINDOW = int(os.environ.get("NOTIFY_DIGEST_WINDOW", 300))
+
+# SMTP for email notifications
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", 25))
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "False").lower() == "true"
+EMAIL_TIMEOUT = 10
+DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "webmaster@localhost")
+
+# Participant limit for the hackathon event created automatically when no
+# event has been set up in the admin; empty means unlimited.
+HACKATHON_DEFAULT_CAPACITY = int(os.environ["HACKATHON_CAPACITY"]) if os.environ.get("HACKATHON_CAPACITY") else None
+
+# Background jobs (api/jobs.py, run by `manage.py runworker`)
+JOBS_RUN_INLINE = os.environ.get("JOBS_RUN_INLINE", "False").lower() == "true"
+JOBS_MAX_ATTEMPTS = int(os.environ.get("JOBS_MAX_ATTEMPTS", 5))
+JOBS_RETRY_BACKOFF = int(os.environ.get("JOBS_RETRY_BACKOFF", 30))  # seconds, doubled per attempt
+JOBS_TIMEOUT = int(os.environ.get("JOBS_TIMEOUT", 600))  # seconds before a running job is requeued
+
+# Retention (api/retention.py, run by `manage.py archive_submissions`)
+RETENTION_POLICIES = {
+    "api.CareerApplication": {"days": int(os.environ.get("RETAIN_CAREER_DAYS", 730))},
+    "api.ContactMessage": {"days": int(os.environ.get("RETAIN_CONTACT_DAYS", 365))},
+    "api.CpuInquiry": {"days": int(os.environ.get("RETAIN_CPU_DAYS", 365))},
+}
+ARCHIVE_BACKEND = os.environ.get("ARCHIVE_BACKEND", "table")  # "table" or "jsonl"
+ARCHIVE_ROOT = Path(os.environ.get("ARCHIVE_ROOT", BASE_DIR / "archive"))
+ARCHIVE_COLD_MEDIA_DIR = "cold"  # storage prefix for files of archived rows
+ARCHIVE_PAGE_SIZE = 100  # rows per ?include_archived=1 listing page
+
+# Resumable uploads (api/uploads.py). Keep the part files on the same
+# filesystem as MEDIA_ROOT so finished uploads are moved, not copied.
+UPLOAD_TEMP_DIR = Path(os.environ.get("UPLOAD_TEMP_DIR", BASE_DIR / "upload_parts"))
+UPLOAD_MAX_SIZE = int(os.environ.get("UPLOAD_MAX_SIZE", 25 * 1024 * 1024))  # bytes
+UPLOAD_EXPIRE_HOURS = int(os.environ.get("UPLOAD_EXPIRE_HOURS", 24))  # since the last chunk
+
+# Feed snapshots (api/snapshots.py), served by api.middleware. Absolute
+# URLs inside them are built for SNAPSHOT_BASE_URL.
+SNAPSHOT_ROOT = Path(os.environ.get("SNAPSHOT_ROOT", BASE_DIR / "snapshots"))
+SNAPSHOT_URL = "/snapshots/"
+SNAPSHOT_BASE_URL = os.environ.get(
+    "SNAPSHOT_BASE_URL", os.environ.get("RENDER_EXTERNAL_URL", "http://localhost:8000")
+)
+SNAPSHOT_KEEP = 5  # versions kept per feed for clients holding an older manifest
+SNAPSHOT_MANIFEST_MAX_AGE = 10  # seconds
+SNAPSHOT_CHECK_INTERVAL = 10  # seconds between checks for changes made by other processes
+SNAPSHOT_PUBLISH_ON_SAVE = os.environ.get("SNAPSHOT_PUBLISH_ON_SAVE", "True").lower() == "true"
+
+# /api/bundle/: browser/CDN freshness, and how long a rendered bundle is
+# reused for the same feed versions.
+BUNDLE_MAX_AGE = int(os.environ.get("BUNDLE_MAX_AGE", 60))  # seconds
+BUNDLE_CACHE_SECONDS = 300
+
+# CPU catalog index (api/catalog.py): how stale another process's edits
+# may be before a lookup notices them.
+CPU_CATALOG_REFRESH = 30  # seconds
+
+# Live submission feed (api/events.py). Streams poll the database every
+# SSE_POLL_INTERVAL seconds only when LISTEN/NOTIFY isn't available.
+SSE_HEARTBEAT = 15  # seconds between keepalive comments
+SSE_POLL_INTERVAL = 1  # seconds
+SUBMISSION_EVENT_RETENTION_DAYS = 7  # pruned by `manage.py archive_submissions`
+
+# Admission control (api/admission.py): route classes matched in order,
+# with limits per worker process. Heavy requests (uploads, registrations)
+# get at most half a worker's threads and other API writes most of the
+# rest, so reads always find a thread. Admin writes match no class, so a
+# burst of public submissions doesn't turn staff away. max_wait is how
+# long a request may hold its thread waiting for a slot; max_queue_age
+# applies only when the proxy sends X-Request-Start.
+ADMISSION_CONTROL = os.environ.get("ADMISSION_CONTROL", "True").lower() == "true"
+_worker_threads = int(os.environ.get("GUNICORN_THREADS", 4))
+_heavy_limit = max(1, _worker_threads // 2)
+ADMISSION_CLASSES = [
+    {
+        "name": "heavy",
+        "methods": ["POST", "PUT", "PATCH"],
+        "path": r"^/api/(apply|mous|hackathonregister|uploads/(?!direct/))",
+        "limit": _heavy_limit,
+        "max_wait": 2,
+        "retry_after": 10,
+        "max_queue_age": 20,
+    },
+    {
+        "name": "writes",
+        "methods": ["POST", "PUT", "PATCH", "DELETE"],
+        "path": r"^/api/",
+        "limit": max(1, _worker_threads - _heavy_limit - 1),
+        "max_wait": 1,
+        "retry_after": 3,
+        "max_queue_age": 20,
+    },
+    {
+        "name": "reads",
+        "methods": ["GET", "HEAD", "OPTIONS"],
+        "path": r"^/",
+        "max_queue_age": 30,
+    },
+]
+ADMISSION_METRICS_DIR = Path(
+    os.environ.get("ADMISSION_METRICS_DIR", Path(tempfile.gettempdir()) / "admission-metrics")
+)
+# Bearer token for scraping /api/metrics/admission/ without a staff login.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# On-demand request profiles for staff (api/profiling.py); the newest
+# PROFILING_KEEP are kept.
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "True").lower() == "true"
+PROFILING_KEEP = 200
+
+# Checked by `manage.py startupprofile --check`: one fresh process importing
+# the WSGI app and serving GET /. Measured at roughly 0.3 s / 60 MB locally.
+STARTUP_BUDGET = {
+    "first_response_ms": 1000,
+    "rss_mb": 90,
+}
+
 LANGUAGE_CODE = "en-us"
 
 TIME_ZONE = "UTC"
@@ -124,8 +322,70 @@ MEDIA_URL = "/media/"
 
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Media in S3-compatible object storage (AWS S3, R2, MinIO...), which
+# survives redeploys and lets clients upload straight to the bucket
+# (api/direct_uploads.py). Enabled by AWS_STORAGE_BUCKET_NAME; credentials
+# come from AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY. For a local MinIO set
+# AWS_S3_ENDPOINT_URL=http://localhost:9000 and AWS_S3_ADDRESSING_STYLE=path.
+AWS_STORAGE_BUCKET_NAME = os.environ.get("AWS_STORAGE_BUCKET_NAME")
+# Bulk exports (api/bulk.py) hold every column of the selected rows, so
+# they get their own private storage, never served under MEDIA_URL: a
+# directory outside MEDIA_ROOT, or a private prefix of the bucket. Staff
+# download them from /api/jobs/<id>/download/.
+EXPORT_ROOT = Path(os.environ.get("EXPORT_ROOT", BASE_DIR / "exports"))
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+    "exports": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": EXPORT_ROOT, "base_url": None},
+    },
+}
+if AWS_STORAGE_BUCKET_NAME:
+    _s3_options = {
+        "bucket_name": AWS_STORAGE_BUCKET_NAME,
+        "endpoint_url": os.environ.get("AWS_S3_ENDPOINT_URL"),
+        "region_name": os.environ.get("AWS_S3_REGION_NAME"),
+        "addressing_style": os.environ.get("AWS_S3_ADDRESSING_STYLE"),
+        "file_overwrite": False,
+    }
+    STORAGES["default"] = {
+        "BACKEND": "storages.backends.s3.S3Storage",
+        "OPTIONS": {
+            **_s3_options,
+            "custom_domain": os.environ.get("AWS_S3_CUSTOM_DOMAIN"),
+            # Plain URLs: snapshots and the bundle embed media URLs, and
+            # signed ones would expire inside them.
+            "querystring_auth": os.environ.get("AWS_QUERYSTRING_AUTH", "False").lower() == "true",
+        },
+    }
+    STORAGES["exports"] = {
+        "BACKEND": "storages.backends.s3.S3Storage",
+        "OPTIONS": {
+            **_s3_options,
+            # Keep this prefix out of any public-read bucket policy.
+            "location": os.environ.get("AWS_EXPORTS_LOCATION", "private/exports"),
+            "default_acl": "private",
+            "querystring_auth": True,
+        },
+    }
+DIRECT_UPLOAD_EXPIRES = 15 * 60  # seconds the presigned POST is valid
+DIRECT_UPLOAD_TOKEN_MAX_AGE = 24 * 3600  # seconds to submit the form afterwards
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Headers of the resumable upload protocol (api/uploads.py).
+TUS_HEADERS = ["tus-resumable", "upload-length", "upload-metadata", "upload-offset"]
+CORS_ALLOW_HEADERS = (*default_headers, *TUS_HEADERS, "last-event-id")
+CORS_EXPOSE_HEADERS = [
+    "location", "tus-version", "tus-max-size", "tus-extension", *TUS_HEADERS,
+    "x-last-event-id", "x-next-before", "x-next-before-id",
+]
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
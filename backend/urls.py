@@ -18,14 +18,42 @@ from django.contrib import admin
 from django.urls import path,include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.http import HttpResponse
+from django.db import DatabaseError, connection
+from django.http import HttpResponse, JsonResponse
+
+from api import warmup
 
 
 def home(request):
     return HttpResponse("Backend is running")
 
+
+def liveness(request):
+    """The process is up and serving; no dependencies are checked."""
+    return JsonResponse({"status": "alive"})
+
+
+def readiness(request):
+    """200 once this worker has warmed up (api/warmup.py) and the database answers."""
+    warmup.start()
+    state = warmup.status()
+    body = {"status": "ready", "steps": state["steps"]}
+    if not state["ready"]:
+        body.update(status="warming" if state["warming"] else "failed", error=state["error"])
+        return JsonResponse(body, status=503)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except DatabaseError as exc:
+        body.update(status="unavailable", error=str(exc))
+        return JsonResponse(body, status=503)
+    return JsonResponse(body)
+
+
 urlpatterns = [
     path("", home),
+    path("healthz", liveness),
+    path("readyz", readiness),
     path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
 ]
@@ -0,0 +1,144 @@
+"""
+Gunicorn configuration, read automatically from the project root.
+
+Worker count, worker class and threads are derived from the CPUs and
+memory actually available to the container; every value can be
+overridden from the environment (see ``manage.py bench_gunicorn`` for
+picking them from measurements).
+"""
+import gc
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+MEMINFO = "/proc/meminfo"
+
+
+def available_cpus(cgroup_root=CGROUP_ROOT):
+    """CPUs this process may use, honouring a cgroup v2 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open(os.path.join(cgroup_root, "cpu.max")) as handle:
+            quota, period = handle.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def available_memory_mb(cgroup_root=CGROUP_ROOT, meminfo=MEMINFO):
+    """Memory limit of the container (cgroup v2), else total RAM."""
+    try:
+        with open(os.path.join(cgroup_root, "memory.max")) as handle:
+            limit = handle.read().strip()
+        if limit != "max":
+            return int(limit) // (1024 * 1024)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(meminfo) as handle:
+            for line in handle:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def default_workers(cpus, memory_mb, worker_memory_mb):
+    workers = 2 * cpus + 1
+    if memory_mb:
+        # Leave room for the master and the rest of the container.
+        workers = min(workers, max(1, (memory_mb - 100) // worker_memory_mb))
+    return workers
+
+
+def worker_count(environ, cgroup_root=CGROUP_ROOT, meminfo=MEMINFO):
+    """WEB_CONCURRENCY if set, else what the container's CPUs and memory allow.
+
+    Reads only ``environ``, the CPU affinity and the given files, so it
+    can be checked against any container layout.
+    """
+    if environ.get("WEB_CONCURRENCY"):
+        return int(environ["WEB_CONCURRENCY"])
+    worker_memory_mb = environ.get("GUNICORN_WORKER_MEMORY_MB")
+    return default_workers(
+        available_cpus(cgroup_root),
+        available_memory_mb(cgroup_root, meminfo),
+        int(worker_memory_mb) if worker_memory_mb else 120,
+    )
+
+
+wsgi_app = "backend.wsgi:application"
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# "gthread" suits the I/O-bound upload and notification paths without
+# extra dependencies; "sync", "gevent" or any importable worker class
+# can be selected per environment.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = _env_int("GUNICORN_THREADS", 4 if worker_class == "gthread" else 1)
+worker_connections = _env_int("GUNICORN_WORKER_CONNECTIONS", 100)
+
+workers = worker_count(os.environ)
+
+# Uploads from slow clients can take a while; keep the hard kill well
+# above that, and let in-flight requests finish on restarts.
+timeout = _env_int("GUNICORN_TIMEOUT", 60)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+# Render's proxy keeps connections open; reusing them saves a handshake
+# per request.
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+# Recycle workers periodically to bound slow memory growth, with jitter
+# so they don't all restart together.
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+
+# Load Django once in the master and fork workers from it, so the
+# imported code is shared copy-on-write instead of loaded per worker and
+# a restarted worker is ready as soon as it is forked.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+
+
+def when_ready(server):
+    server.log.info(
+        "Using %s %s worker(s), %s thread(s) each",
+        server.cfg.workers, server.cfg.worker_class_str, server.cfg.threads,
+    )
+    if not server.cfg.preload_app:
+        return
+
+    # The URLconf pulls in the views, serializers and DRF; importing it
+    # here, before the first fork, moves that cost out of every worker's
+    # first request.
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+
+    # Objects created so far live for the whole process. Freezing them
+    # keeps the garbage collector from touching (and so copying) their
+    # pages in the workers.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Never share a database connection opened in the master.
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    # Warm this worker in the background; /readyz reports 503 until done.
+    from api import warmup
+
+    warmup.start()